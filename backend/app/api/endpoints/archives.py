@@ -1,48 +1,65 @@
 from fastapi import APIRouter, HTTPException, status
-from typing import List, Optional
+from fastapi.responses import ORJSONResponse
+from typing import Dict, List, Optional
 from datetime import datetime, timezone
 from app.db.database import supabase
+from app.db.pagination import scan_chunks
+from app.core.bus import bus
 
 router = APIRouter()
 
+# Candidate ids per votes scan, kept small enough for the in.(...) filter in the URL
+VOTE_COUNT_BATCH = 100
+
+async def _vote_counts(candidate_ids: List[str]) -> Dict[str, int]:
+    """Number of votes of each candidate, read in keyset chunks."""
+    counts: Dict[str, int] = {}
+    for start in range(0, len(candidate_ids), VOTE_COUNT_BATCH):
+        batch = candidate_ids[start:start + VOTE_COUNT_BATCH]
+        async for votes in scan_chunks(lambda: supabase.table("votes").select("id, candidate_id").in_("candidate_id", batch)):
+            for vote in votes:
+                counts[vote["candidate_id"]] = counts.get(vote["candidate_id"], 0) + 1
+    return counts
+
 @router.get("/candidates")
 async def get_archived_candidates(
     year: Optional[int] = None
 ):
     """Get archived candidates with optional filtering by year"""
     try:
-        # Update the select to use correct table name - partylist (singular) instead of partylists
-        query = supabase.table("candidates")\
-            .select("id, name, position, organization_id, photo_url, created_at, is_archived, partylist_id, organizations(name), partylist(id, name)")\
-            .eq("is_archived", True)
-        
-        # Apply year filter if provided
-        if year:
-            # Filter by created_at year
-            start_date = f"{year}-01-01"
-            end_date = f"{year+1}-01-01"
-            query = query.gte("created_at", start_date).lt("created_at", end_date)
+        def archived_candidates():
+            # Update the select to use correct table name - partylist (singular) instead of partylists
+            query = supabase.table("candidates")\
+                .select("id, name, position, organization_id, photo_url, created_at, is_archived, partylist_id, organizations(name), partylist(id, name)")\
+                .eq("is_archived", True)
+            
+            # Apply year filter if provided
+            if year:
+                # Filter by created_at year
+                start_date = f"{year}-01-01"
+                end_date = f"{year+1}-01-01"
+                query = query.gte("created_at", start_date).lt("created_at", end_date)
+            return query
         
-        response = query.execute()
+        candidates = []
+        async for chunk in scan_chunks(archived_candidates):
+            candidates.extend(chunk)
         
-        if not response.data:
+        if not candidates:
             return []
         
-        # Get votes for each candidate
+        # Count votes for all of them with chunked scans instead of one query per candidate
+        vote_counts = await _vote_counts([candidate["id"] for candidate in candidates])
+        
         result = []
-        for candidate in response.data:
+        for candidate in candidates:
             # Get organization name
             org_name = candidate["organizations"]["name"] if candidate["organizations"] else "Unknown"
             
             # Get partylist name - changed to use partylist (singular)
             partylist_name = candidate["partylist"]["name"] if candidate["partylist"] else None
             
-            # Count votes for this candidate
-            votes_query = supabase.table("votes")\
-                .select("id")\
-                .eq("candidate_id", candidate["id"])\
-                .execute()
-            vote_count = len(votes_query.data) if votes_query.data else 0
+            vote_count = vote_counts.get(candidate["id"], 0)
             
             # Extract year from created_at
             created_at = candidate["created_at"]
@@ -62,7 +79,7 @@ async def get_archived_candidates(
                 "photoUrl": candidate["photo_url"]
             })
         
-        return result
+        return ORJSONResponse(result)
     
     except Exception as e:
         print(f"Error getting archived candidates: {str(e)}")
@@ -72,30 +89,33 @@ async def get_archived_candidates(
 async def get_archive_statistics():
     """Get archive statistics"""
     try:
-        # Get total archived candidates
-        candidates_query = supabase.table("candidates")\
-            .select("id, organization_id, created_at")\
-            .eq("is_archived", True)\
-            .execute()
-        
-        total_candidates = len(candidates_query.data)
-        
-        # Group candidates by organization
+        # Get archived candidates in chunks, keeping only the counts
+        total_candidates = 0
         candidates_by_org = {}
-        for candidate in candidates_query.data:
-            org_id = candidate["organization_id"]
-            candidates_by_org[org_id] = candidates_by_org.get(org_id, 0) + 1
+        years = set()
+        archived = scan_chunks(
+            lambda: supabase.table("candidates").select("id, organization_id, created_at").eq("is_archived", True)
+        )
+        async for chunk in archived:
+            total_candidates += len(chunk)
+            for candidate in chunk:
+                org_id = candidate["organization_id"]
+                candidates_by_org[org_id] = candidates_by_org.get(org_id, 0) + 1
+                
+                # Get unique years
+                created_at = candidate.get("created_at")
+                if created_at:
+                    years.add(datetime.fromisoformat(created_at.replace("Z", "+00:00")).year)
         
-        # Get organization names
+        # Get organization names in one query
         org_names = {}
-        for org_id in candidates_by_org.keys():
+        if candidates_by_org:
             org_query = supabase.table("organizations")\
                 .select("id, name")\
-                .eq("id", org_id)\
+                .in_("id", list(candidates_by_org.keys()))\
                 .execute()
-            
-            if org_query.data:
-                org_names[org_id] = org_query.data[0]["name"]
+            for org in org_query.data or []:
+                org_names[org["id"]] = org["name"]
         
         # Format candidates by organization
         candidates_by_org_name = {}
@@ -103,14 +123,6 @@ async def get_archive_statistics():
             name = org_names.get(org_id, "Unknown")
             candidates_by_org_name[name] = count
         
-        # Get unique years
-        years = set()
-        for candidate in candidates_query.data:
-            created_at = candidate.get("created_at")
-            if created_at:
-                year = datetime.fromisoformat(created_at.replace("Z", "+00:00")).year
-                years.add(year)
-        
         return {
             "totalCandidates": total_candidates,
             "candidates": candidates_by_org_name,
@@ -129,7 +141,7 @@ async def unarchive_candidate(candidate_id: str):
     try:
         # Check if candidate exists
         candidate_check = supabase.table("candidates")\
-            .select("id, name, is_archived")\
+            .select("id, name, is_archived, organization_id")\
             .eq("id", candidate_id)\
             .execute()
         
@@ -151,6 +163,8 @@ async def unarchive_candidate(candidate_id: str):
                 detail="Failed to unarchive candidate"
             )
         
+        bus.publish("candidates", {"organization_ids": [candidate_check.data[0]["organization_id"]]})
+        
         # Return success response
         return {
             "success": True,
@@ -1,31 +1,47 @@
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, BackgroundTasks
 from fastapi.security import OAuth2PasswordRequestForm
 from app.core.config import settings
+from app.core import passwords
 from app.core.security import verify_password, create_access_token, get_password_hash
+from app.core.rate_limit import client_ip, login_ip_limiter, login_account_limiter
 from app.db.database import supabase
-from app.models.schemas import Token, UserLogin, StudentCreate, AdminCreate
+from app.services import refresh_tokens, student_profiles
+from app.models.schemas import Token, UserLogin, StudentCreate, AdminCreate, RefreshRequest, RefreshedToken
+from starlette.concurrency import run_in_threadpool
 
 router = APIRouter()
 
+def rehash_password(table: str, user_id: str, password: str):
+    """Store a user's password under the current hashing policy (runs after the login response)."""
+    try:
+        supabase.table(table)\
+            .update({"password_hash": get_password_hash(password)})\
+            .eq("id", user_id)\
+            .execute()
+    except Exception as e:
+        print(f"Failed to rehash password for {table} {user_id}: {e}")
+
 @router.post("/login", response_model=Token)
-async def login(user_data: UserLogin, request: Request):
+async def login(user_data: UserLogin, request: Request, background_tasks: BackgroundTasks):
     # Add debug logging to track the request
     print(f"Login attempt: {user_data.user_type} - ID: {user_data.student_no if user_data.user_type == 'student' else user_data.username}")
     
     # Get client IP for login attempt logging
-    client_ip = request.client.host
+    ip_address = client_ip(request)
+    
+    # Reject bursts before paying for bcrypt and the database lookups
+    await login_ip_limiter.hit(ip_address)
+    await login_account_limiter.hit(f"{user_data.user_type}:{user_data.student_no if user_data.user_type == 'student' else user_data.username}")
     
     # Authenticate based on user type
     if user_data.user_type == "student":
         # For students, use student_no instead of username
         response = supabase.table("students").select("*").eq("student_no", user_data.student_no).execute()
-        print(f"Student query result: {response.data}")
         user = response.data[0] if response.data else None
     else:
         # For admins, use username
         response = supabase.table("administrators").select("*").eq("username", user_data.username).execute()
-        print(f"Admin query result: {response.data}")
         user = response.data[0] if response.data else None
     
     # If no user found, return error
@@ -35,7 +51,7 @@ async def login(user_data: UserLogin, request: Request):
         try:
             supabase.table("login_attempts").insert({
                 "username": user_data.student_no if user_data.user_type == "student" else user_data.username,
-                "ip_address": client_ip,
+                "ip_address": ip_address,
                 "success": False,
                 "user_type": user_data.user_type
             }).execute()
@@ -48,11 +64,8 @@ async def login(user_data: UserLogin, request: Request):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Verify password
-    print(f"Checking password for user: {user.get('first_name')} {user.get('last_name')}")
-    print(f"Stored hash: {user['password_hash']}")
-    
-    password_valid = verify_password(user_data.password, user["password_hash"])
+    # Verify password (off the event loop: a verify is calibrated to take a few hundred ms)
+    password_valid = await run_in_threadpool(verify_password, user_data.password, user["password_hash"])
     print(f"Password verification result: {password_valid}")
     
     if not password_valid:
@@ -60,7 +73,7 @@ async def login(user_data: UserLogin, request: Request):
         try:
             supabase.table("login_attempts").insert({
                 "username": user_data.student_no if user_data.user_type == "student" else user_data.username,
-                "ip_address": client_ip,
+                "ip_address": ip_address,
                 "success": False,
                 "user_type": user_data.user_type
             }).execute()
@@ -73,11 +86,19 @@ async def login(user_data: UserLogin, request: Request):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Upgrade plaintext, weaker or other-scheme hashes now that we know the password
+    if passwords.needs_rehash(user["password_hash"]):
+        background_tasks.add_task(
+            rehash_password,
+            "students" if user_data.user_type == "student" else "administrators",
+            user["id"], user_data.password
+        )
+    
     # Record successful login with error handling
     try:
         supabase.table("login_attempts").insert({
             "username": user_data.student_no if user_data.user_type == "student" else user_data.username,
-            "ip_address": client_ip,
+            "ip_address": ip_address,
             "success": True,
             "user_type": user_data.user_type
         }).execute()
@@ -92,20 +113,70 @@ async def login(user_data: UserLogin, request: Request):
         expires_delta=access_token_expires
     )
     
+    # Later access tokens come from /auth/refresh, without another password check
+    try:
+        refresh_token = refresh_tokens.issue(user["id"], user_data.user_type)
+    except Exception as e:
+        print(f"Failed to issue refresh token (continuing without): {e}")
+        refresh_token = None
+    
     # Prepare response data based on user type
     response_data = {
         "access_token": access_token,
         "token_type": "bearer",
         "user_type": user_data.user_type,
         "user_id": user["id"],
-        "full_name": f"{user.get('first_name', '')} {user.get('last_name', '')}"
+        "full_name": f"{user.get('first_name', '')} {user.get('last_name', '')}",
+        "refresh_token": refresh_token,
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
     }
     
     # Add student_no for student users
     if user_data.user_type == "student":
         response_data["student_no"] = user["student_no"]
+        # The dashboard asks for this profile right after login
+        student_profiles.remember(user)
     else:
         response_data["username"] = user["username"]
     
     print("Login successful!")
-    return response_data    
\ No newline at end of file
+    return response_data
+
+@router.post("/refresh", response_model=RefreshedToken)
+async def refresh(req: RefreshRequest):
+    """
+    Trade a refresh token for a new access token and a new refresh token. The old
+    refresh token stops working; presenting it again ends the session.
+    """
+    try:
+        refresh_token, user_id, user_type = await run_in_threadpool(refresh_tokens.rotate, req.refresh_token)
+    except refresh_tokens.RefreshTokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    access_token = create_access_token(
+        subject=user_id,
+        user_type=user_type,
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "user_type": user_type,
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+@router.post("/logout")
+async def logout(req: RefreshRequest):
+    """End the device session of a refresh token; its access token runs out on its own."""
+    try:
+        await run_in_threadpool(refresh_tokens.revoke, req.refresh_token)
+    except refresh_tokens.RefreshTokenError:
+        # Already unusable: nothing left to revoke
+        pass
+    return {"message": "Logged out"}
+
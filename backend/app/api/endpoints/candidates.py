@@ -1,6 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Response
 from fastapi.security import OAuth2PasswordBearer
+from fastapi.responses import ORJSONResponse
 from app.db.database import supabase
+from app.core.bus import bus
+from app.services import candidate_archive, candidate_import, jobs
+from starlette.concurrency import run_in_threadpool
+from app.db.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, apply_keyset, encode_cursor, parse_fields, select_for_fields
+)
 from typing import Dict, List, Optional
 import uuid
 import datetime
@@ -13,8 +20,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 # Define the upload directory with absolute path to avoid path issues
 BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
-UPLOAD_DIR = BASE_DIR / "uploads" / "candidates"
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+UPLOAD_DIR = BASE_DIR / "uploads" / "candidates"  # Created at startup by app.core.startup
 
 @router.post("/with-position")
 async def create_candidate_with_position(
@@ -115,6 +121,8 @@ async def create_candidate_with_position(
                 os.remove(file_path)
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
         
+        bus.publish("candidates", {"organization_ids": [organization_id]})
+        
         # Add group information to response
         response_data = candidate_resp.data[0]
         response_data["group"] = org_resp.data[0]["name"] if org_resp.data else "Unknown"
@@ -129,6 +137,43 @@ async def create_candidate_with_position(
         print(f"Error in create_candidate: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error creating candidate: {str(e)}")
 
+@router.post("/import")
+async def import_candidates(
+    response: Response,
+    candidates_csv: UploadFile = File(...),
+    photos: UploadFile = File(...),
+    dry_run: bool = Form(False),
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Create many candidates from a CSV (name, position, organization, partylist, photo)
+    and a zip archive holding the photos. A dry run validates the rows and answers with
+    the report of every row right away; a real import runs as a background job (202)
+    whose result is that report.
+    """
+    try:
+        csv_bytes = await candidates_csv.read()
+        if dry_run:
+            return await run_in_threadpool(candidate_import.import_candidates, csv_bytes, photos.file, True)
+        # The upload is gone once this request ends, so the job gets its own copy
+        photos_path = await run_in_threadpool(candidate_import.spool_upload, photos.file)
+        try:
+            job = await run_in_threadpool(
+                jobs.submit, "import_candidates", candidate_import.import_candidates_job, csv_bytes, photos_path
+            )
+        except Exception:
+            os.remove(photos_path)
+            raise
+        response.status_code = 202
+        return jobs.reference(job)
+    except candidate_import.CandidateImportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except jobs.JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Too many background jobs, try again shortly: {str(e)}")
+    except Exception as e:
+        print(f"Error importing candidates: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error importing candidates: {str(e)}")
+
 # Add this new endpoint for archiving candidates
 @router.put("/{candidate_id}/archive")
 async def archive_candidate(
@@ -150,6 +195,8 @@ async def archive_candidate(
         if not archive_resp.data:
             raise HTTPException(status_code=500, detail="Failed to archive candidate")
         
+        bus.publish("candidates", {"organization_ids": [candidate_resp.data[0]["organization_id"]]})
+        
         return {"message": "Candidate archived successfully"}
     
     except HTTPException as e:
@@ -159,17 +206,15 @@ async def archive_candidate(
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 # Add this endpoint for archiving all candidates
-@router.put("/archive-all")
+@router.put("/archive-all", status_code=202)
 async def archive_all_candidates(token: str = Depends(oauth2_scheme)):
+    """Archive every active candidate in a background job; poll status_url for progress."""
     try:
-        # Update all non-archived candidates
-        archive_resp = supabase.table("candidates")\
-            .update({"is_archived": True})\
-            .eq("is_archived", False)\
-            .execute()
-        
-        return {"message": "All candidates archived successfully"}
+        job = await run_in_threadpool(jobs.submit, "archive_candidates", candidate_archive.archive_candidates)
+        return {"message": "Archiving all candidates", **jobs.reference(job)}
     
+    except jobs.JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Too many background jobs, try again shortly: {str(e)}")
     except Exception as e:
         print(f"Error archiving all candidates: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
@@ -210,37 +255,74 @@ async def get_recent_candidates(token: str = Depends(oauth2_scheme)):
         print(f"Error in get_recent_candidates: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Fields offered by GET /candidates/ and the select fragment each one needs
+CANDIDATE_LIST_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "position": "position",
+    "organization_id": "organization_id",
+    "photo_url": "photo_url",
+    "created_at": "created_at",
+    "partylist_id": "partylist_id",
+    "partylist": "partylist(name)",
+    "group": "organizations(name)"
+}
+
 # Update get_all_candidates to include partylist
 @router.get("/")
-async def get_all_candidates(token: str = Depends(oauth2_scheme)):
+async def get_all_candidates(
+    organization_id: Optional[str] = None,
+    position: Optional[str] = None,
+    partylist_id: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Get active candidates ordered by name, one page at a time.
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
     try:
-        # Get all non-archived candidates
-        candidates_resp = supabase.table("candidates")\
-            .select("id, name, position, organization_id, photo_url, created_at, partylist_id, partylist(name), organizations(name)")\
-            .eq("is_archived", False)\
-            .order("name", desc=False)\
-            .execute()
-        
-        if not candidates_resp.data:
-            return []
+        selected_fields = parse_fields(fields, CANDIDATE_LIST_FIELDS, CANDIDATE_LIST_FIELDS.keys())
+
+        # Get non-archived candidates
+        query = supabase.table("candidates")\
+            .select(select_for_fields(selected_fields, CANDIDATE_LIST_FIELDS, ["id", "name"]))\
+            .eq("is_archived", False)
+        if organization_id:
+            query = query.eq("organization_id", organization_id)
+        if position:
+            query = query.eq("position", position)
+        if partylist_id:
+            query = query.eq("partylist_id", partylist_id)
+
+        # Fetch one extra row to know whether another page exists
+        candidates_resp = apply_keyset(query, "name", cursor).limit(limit + 1).execute()
+        rows = candidates_resp.data or []
+
+        headers = {}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = encode_cursor([rows[-1]["name"], rows[-1]["id"]])
         
         # Format response for frontend
         candidates = []
-        for c in candidates_resp.data:
-            candidate = {
-                "id": c["id"],
-                "name": c["name"],
-                "position": c["position"],
-                "partylist": c["partylist"]["name"] if c["partylist"] else None,  # Get name from joined table
-                "partylist_id": c["partylist_id"],  # Include ID too
-                "photo_url": c["photo_url"],
-                "created_at": c["created_at"],
-                "group": c["organizations"]["name"] if c["organizations"] else "Unknown"
-            }
+        for c in rows:
+            candidate = {}
+            for field in selected_fields:
+                if field == "partylist":
+                    candidate["partylist"] = c["partylist"]["name"] if c["partylist"] else None  # Get name from joined table
+                elif field == "group":
+                    candidate["group"] = c["organizations"]["name"] if c["organizations"] else "Unknown"
+                else:
+                    candidate[field] = c[field]
             candidates.append(candidate)
         
-        return candidates
+        return ORJSONResponse(candidates, headers=headers)
     
+    except HTTPException as e:
+        raise e
     except Exception as e:
         print(f"Error in get_all_candidates: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -306,6 +388,11 @@ async def update_candidate(
         if not update_resp.data:
             raise HTTPException(status_code=500, detail="Failed to update candidate")
         
+        # The candidate may have moved between organizations
+        bus.publish("candidates", {
+            "organization_ids": [candidate_resp.data[0]["organization_id"], organization_id]
+        })
+        
         # Get the organization name for the response
         org_resp = supabase.table("organizations").select("name").eq("id", organization_id).execute()
         org_name = org_resp.data[0]["name"] if org_resp.data else "Unknown"
@@ -1,13 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, Body, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Response, Body, BackgroundTasks, Query, Request
 from fastapi.security import OAuth2PasswordBearer
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from app.db.database import supabase
+from app.db.pagination import scan_chunks
+from app.core.cache import TTLCache
+from app.services import analytics, ballots, deadlines, election_statistics, eligibility, results as election_results
+from app.core.bus import bus
 from typing import Dict, Optional
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+# Short-lived cache for the polled statistics endpoint
+STATISTICS_TTL_SECONDS = 5
+_statistics_cache = TTLCache(maxsize=1, ttl=STATISTICS_TTL_SECONDS)
+for _topic in ("elections", "candidates"):
+    bus.subscribe(_topic, lambda message: _statistics_cache.clear())
+
+# Upper bound on the length of a turnout series (one week of minutes)
+MAX_TURNOUT_BUCKETS = 7 * 24 * 60
+
 class StartElectionRequest(BaseModel):
     organization_name: str
     duration_hours: int
@@ -21,27 +36,14 @@ class NewElectionRequest(BaseModel):
     duration_hours: int
     eligible_voters: str
 
-# Update the get_election_status function to handle timezone-aware datetimes properly
 def get_election_status(election: dict) -> str:
     """Determine the current status of an election based on its data."""
     if election["status"] == "finished":
         return "finished"
     
     if election["status"] == "ongoing":
-        # Parse start_time and ensure it has timezone info
-        start_time = datetime.fromisoformat(election["created_at"])
-        
-        # If start_time is naive, add timezone (UTC)
-        if start_time.tzinfo is None:
-            start_time = start_time.replace(tzinfo=timezone.utc)
-        
-        # Calculate end_time with the same timezone
-        end_time = start_time + timedelta(hours=election["duration_hours"])
-        
-        # Get current time with the same timezone
-        now = datetime.now(timezone.utc)
-        
-        if now > end_time:
+        # Past its deadline an election counts as finished even before the expiry sweep
+        if deadlines.is_expired(election):
             return "finished"
         return "ongoing"
     
@@ -66,148 +68,34 @@ def validate_election_eligibility(organization_name: str) -> None:
 
 def auto_finish_expired_elections():
     """
-    This function checks all ongoing elections and finishes those whose timer has expired.
-    Should be called before returning election status or statistics.
+    Finish every ongoing election whose deadline has passed, in one set-based UPDATE
+    (see sql/007_election_deadlines.sql). Called before returning election status or statistics.
     """
     try:
-        # Philippine Timezone (UTC+8)
-        PHT = timezone(timedelta(hours=8))
-        ongoing_resp = supabase.table("elections")\
-            .select("id, organization_id, created_at, duration_hours, status")\
-            .eq("status", "ongoing")\
-            .execute()
-        now = datetime.now(PHT)
-        if ongoing_resp.data:
-            for election in ongoing_resp.data:
-                # Parse created_at as aware datetime in PHT
-                start_time = datetime.fromisoformat(election["created_at"])
-                if start_time.tzinfo is None:
-                    start_time = start_time.replace(tzinfo=PHT)
-                else:
-                    start_time = start_time.astimezone(PHT)
-                end_time = start_time + timedelta(hours=election["duration_hours"])
-                if now >= end_time:
-                    # Set election as finished
-                    supabase.table("elections")\
-                        .update({"status": "finished"})\
-                        .eq("id", election["id"])\
-                        .execute()
-                    # Set organization as inactive
-                    supabase.table("organizations")\
-                        .update({"is_active": False})\
-                        .eq("id", election["organization_id"])\
-                        .execute()
+        finished_resp = supabase.rpc("finish_expired_elections").execute()
+        for election in finished_resp.data or []:
+            bus.publish("elections", {"election_id": election["election_id"], "organization_id": election["organization_id"]})
+            election_results.finalize_election(election["election_id"])
     except Exception as e:
         print(f"Error in auto_finish_expired_elections: {str(e)}")
 
 @router.get("/statistics")
-async def get_election_statistics(token: str = Depends(oauth2_scheme)) -> Dict:
+async def get_election_statistics(
+    response: Response,
+    token: str = Depends(oauth2_scheme)
+) -> Dict:
+    # The admin dashboard polls this endpoint, so serve a recent result when we have one
+    response.headers["Cache-Control"] = f"private, max-age={STATISTICS_TTL_SECONDS}"
+    cached = _statistics_cache.get("statistics")
+    if cached is not None:
+        return cached
+
     auto_finish_expired_elections()
     try:
-        # Get total eligible voters
-        voters_resp = supabase.table("students").select("id, program").execute()
-        total_voters = len(voters_resp.data) if voters_resp.data else 0
-        
-        # Count voters by program for eligibility calculation
-        voters_by_program = {"BSIT": 0, "BSCS": 0, "BSEMC": 0}
-        if voters_resp.data:
-            for voter in voters_resp.data:
-                program = voter["program"]
-                if program in voters_by_program:
-                    voters_by_program[program] += 1
-        
-        # Get candidates by organization
-        candidates_by_org = {
-            "CCS Student Council": 0,
-            "ELITES": 0,
-            "SPECS": 0,
-            "IMAGES": 0
-        }
-        
-        candidates_resp = supabase.table("candidates")\
-            .select("organization_id, organizations(name)")\
-            .eq("is_archived", False)\
-            .execute()
-        
-        if candidates_resp.data:
-            for candidate in candidates_resp.data:
-                org_name = candidate["organizations"]["name"]
-                if org_name in candidates_by_org:
-                    candidates_by_org[org_name] += 1
-        
-        # Get organization-specific vote counts
-        org_voted_counts = {
-            "CCS Student Council": 0,
-            "ELITES": 0,
-            "SPECS": 0,
-            "IMAGES": 0
-        }
-        
-        # Get all active elections with their organization info
-        active_elections_resp = supabase.table("elections")\
-            .select("id, organization_id, organizations(name)")\
-            .eq("status", "ongoing")\
-            .execute()
-        
-        if active_elections_resp.data:
-            for election in active_elections_resp.data:
-                org_name = election["organizations"]["name"]
-                election_id = election["id"]
-                
-                # Count unique voters for this specific election
-                votes_resp = supabase.table("votes")\
-                    .select("student_id")\
-                    .eq("election_id", election_id)\
-                    .execute()
-                
-                # Get unique student IDs who voted in this election
-                unique_voters = set()
-                if votes_resp.data:
-                    for vote in votes_resp.data:
-                        unique_voters.add(vote["student_id"])
-                
-                if org_name in org_voted_counts:
-                    org_voted_counts[org_name] = len(unique_voters)
-        
-        # Get votes by program for overall statistics
-        voted_by_program = {"BSIT": 0, "BSCS": 0, "BSEMC": 0}
-        
-        if active_elections_resp.data:
-            election_ids = [e["id"] for e in active_elections_resp.data]
-            
-            # Get all votes for active elections with student program info
-            votes_resp = supabase.table("votes")\
-                .select("student_id, students(program)")\
-                .in_("election_id", election_ids)\
-                .execute()
-            
-            # Track unique voters per program across all active elections
-            program_voters = {"BSIT": set(), "BSCS": set(), "BSEMC": set()}
-            
-            if votes_resp.data:
-                for vote in votes_resp.data:
-                    program = vote["students"]["program"]
-                    student_id = vote["student_id"]
-                    if program in program_voters:
-                        program_voters[program].add(student_id)
-            
-            # Convert sets to counts
-            for program in voted_by_program:
-                voted_by_program[program] = len(program_voters[program])
-        
-        return {
-            "totalVoters": total_voters,
-            "candidates": candidates_by_org,
-            "voted": voted_by_program,
-            "votersByProgram": voters_by_program,
-            "orgVoted": org_voted_counts,
-            "orgVoters": {
-                "CCS Student Council": total_voters,  # All students can vote for CCS SC
-                "ELITES": voters_by_program["BSIT"],  # Only BSIT for ELITES
-                "SPECS": voters_by_program["BSCS"],   # Only BSCS for SPECS
-                "IMAGES": voters_by_program["BSEMC"] # Only BSEMC for IMAGES
-            }
-        }
+        # Counts are aggregated in the database (see sql/001_election_turnout_statistics.sql)
+        result = election_statistics.load_statistics()
+        _statistics_cache.set("statistics", result)
+        return result
     except Exception as e:
         print(f"Error in get_election_statistics: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to get election statistics")
@@ -251,10 +139,22 @@ async def start_election(
         if not election_resp.data:
             raise HTTPException(status_code=500, detail="Failed to start election")
         
+        # Fix who may vote before the election is announced to other workers
+        eligibility.materialize(election_resp.data[0]["id"])
+
         # Set organization as active
         supabase.table("organizations").update({"is_active": True}).eq("id", org_id).execute()
+        bus.publish("elections", {"election_id": election_resp.data[0]["id"], "organization_id": org_id})
+
+        # Every voter gets the same ballot, so compile it once now
+        await run_in_threadpool(ballots.compile_ballot, election_resp.data[0]["id"])
+        await run_in_threadpool(eligibility.eligible_voters, election_resp.data[0]["id"])
         
-        return {"status": "ongoing", "message": "Election started successfully"}
+        return {
+            "status": "ongoing",
+            "message": "Election started successfully",
+            "ends_at": election_resp.data[0].get("ends_at")
+        }
     except HTTPException as he:
         raise he
     except Exception as e:
@@ -287,7 +187,7 @@ async def stop_election(
         
         # Get ongoing election
         election_resp = supabase.table("elections")\
-            .select("id, created_at, duration_hours")\
+            .select("id, created_at, duration_hours, ends_at")\
             .eq("organization_id", org_id)\
             .eq("status", "ongoing")\
             .single()\
@@ -296,10 +196,6 @@ async def stop_election(
         if not election_resp.data:
             raise HTTPException(status_code=400, detail="No ongoing election found")
         
-        # Calculate end time based on created_at and duration_hours
-        start_time = datetime.fromisoformat(election_resp.data["created_at"])
-        end_time = start_time + timedelta(hours=election_resp.data["duration_hours"])
-        
         # Set election as finished
         supabase.table("elections")\
             .update({
@@ -310,13 +206,17 @@ async def stop_election(
         
         # Set organization as inactive
         supabase.table("organizations").update({"is_active": False}).eq("id", org_id).execute()
+        bus.publish("elections", {"election_id": election_resp.data["id"], "organization_id": org_id})
+
+        # Final results never change again, so count them once now
+        election_results.finalize_election(election_resp.data["id"])
         
         return {
             "status": "finished",
             "message": "Election stopped successfully",
             "duration": election_resp.data["duration_hours"],
             "started_at": election_resp.data["created_at"],
-            "ended_at": end_time.isoformat()
+            "ended_at": election_resp.data["ends_at"]
         }
     except HTTPException as he:
         raise he
@@ -338,7 +238,7 @@ async def get_election_status_endpoint(
         
         # Get latest election
         election_resp = supabase.table("elections")\
-            .select("id, status, created_at, duration_hours")\
+            .select("id, status, created_at, duration_hours, ends_at")\
             .eq("organization_id", org_resp.data["id"])\
             .order("created_at", desc=True)\
             .limit(1)\
@@ -356,27 +256,61 @@ async def get_election_status_endpoint(
         }
         
         if status == "ongoing":
-            # Parse start_time and ensure it has timezone info
-            start_time = datetime.fromisoformat(election["created_at"])
-            
-            # If start_time is naive, add timezone (UTC)
-            if start_time.tzinfo is None:
-                start_time = start_time.replace(tzinfo=timezone.utc)
-            
-            # Calculate end_time with the same timezone
-            end_time = start_time + timedelta(hours=election["duration_hours"])
-            
-            # Get current time with the same timezone
-            now = datetime.now(timezone.utc)
-            
-            response["end_time"] = end_time.isoformat()
-            response["remaining_time"] = (end_time - now).total_seconds()
+            response["end_time"] = election["ends_at"]
+            response["remaining_time"] = deadlines.remaining_seconds(election)
         
         return response
     except Exception as e:
         print(f"Error in get_election_status: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get election status: {str(e)}")
 
+ELECTION_STATUSES = ("not_started", "ongoing", "finished")
+
+@router.get("")
+async def list_elections(
+    status: Optional[str] = Query(None),
+    organization_id: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Elections, newest first, filtered in the database by effective status: an
+    ongoing election past its ends_at is listed as finished even before the expiry sweep.
+    """
+    if status and status not in ELECTION_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Status must be one of: {', '.join(ELECTION_STATUSES)}")
+    try:
+        now = deadlines.utc_now()
+        cutoff = now.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        query = supabase.table("elections")\
+            .select("id, organization_id, status, created_at, duration_hours, ends_at, organizations(name)")
+        if organization_id:
+            query = query.eq("organization_id", organization_id)
+        if status == "ongoing":
+            query = query.eq("status", "ongoing").gt("ends_at", cutoff)
+        elif status == "finished":
+            query = query.or_(f"status.eq.finished,and(status.eq.ongoing,ends_at.lte.{cutoff})")
+        elif status == "not_started":
+            query = query.eq("status", "not_started")
+        elections_resp = query.order("created_at", desc=True).limit(limit).execute()
+
+        return ORJSONResponse([
+            {
+                "id": election["id"],
+                "organization_id": election["organization_id"],
+                "organization_name": election["organizations"]["name"] if election["organizations"] else None,
+                "status": get_election_status(election),
+                "created_at": election["created_at"],
+                "duration_hours": election["duration_hours"],
+                "ends_at": election["ends_at"],
+                "remaining_time": deadlines.remaining_seconds(election, now) if election["status"] == "ongoing" else None
+            }
+            for election in elections_resp.data or []
+        ])
+    except Exception as e:
+        print(f"Error listing elections: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to list elections: {str(e)}")
+
 @router.post("/new")
 async def create_new_election(
     req: NewElectionRequest = Body(...),
@@ -473,7 +407,7 @@ async def get_election_results(token: str = Depends(oauth2_scheme)):
             
             # Get the most recent election for this organization (ongoing OR finished)
             election_resp = supabase.table("elections")\
-                .select("id, status, created_at, duration_hours")\
+                .select("id, status, created_at, duration_hours, ends_at")\
                 .eq("organization_id", org_id)\
                 .in_("status", ["ongoing", "finished"])\
                 .order("created_at", desc=True)\
@@ -487,60 +421,57 @@ async def get_election_results(token: str = Depends(oauth2_scheme)):
             election = election_resp.data[0]
             election_id = election["id"]
             election_status = election["status"]
-            
-            # Get all candidates for this organization
-            candidates_resp = supabase.table("candidates")\
-                .select("id, name, position")\
-                .eq("organization_id", org_id)\
-                .eq("is_archived", False)\
-                .execute()
-            
-            if not candidates_resp.data:
+
+            # Finished elections are served from their immutable snapshot
+            if election_status == "finished":
+                snapshot = election_results.get_snapshot(election_id)
+                if snapshot is not None:
+                    if not snapshot["results"]["positions"]:
+                        continue
+                    results.append({
+                        "organization_id": org_id,
+                        "organization_name": org_name,
+                        "election_status": election_status,
+                        "remaining_time": None,
+                        "positions": [
+                            {
+                                "name": position["name"],
+                                "candidates": [
+                                    {"name": candidate["name"], "vote_count": candidate["vote_count"]}
+                                    for candidate in position["candidates"]
+                                ]
+                            }
+                            for position in snapshot["results"]["positions"]
+                        ],
+                        "turnout": snapshot["results"]["turnout"],
+                        "by_program": snapshot["results"]["by_program"],
+                        "results_hash": snapshot["results_hash"]
+                    })
+                    continue
+
+            # Votes are counted in the database; only the tally per candidate comes back
+            tally_resp = await run_in_threadpool(
+                lambda: supabase.rpc("election_final_tally", {"p_election_id": election_id}).execute()
+            )
+            tally = tally_resp.data or {}
+            if not tally.get("positions"):
                 continue
-                
-            # Group candidates by position
-            positions_dict = {}
-            for candidate in candidates_resp.data:
-                position = candidate["position"]
-                
-                if position not in positions_dict:
-                    positions_dict[position] = []
-                
-                # Get vote count for this candidate
-                votes_resp = supabase.table("votes")\
-                    .select("id")\
-                    .eq("election_id", election_id)\
-                    .eq("candidate_id", candidate["id"])\
-                    .execute()
-                
-                vote_count = len(votes_resp.data) if votes_resp.data else 0
-                
-                # Add candidate with vote count
-                positions_dict[position].append({
-                    "name": candidate["name"],
-                    "vote_count": vote_count
-                })
-            
-            # Convert positions dictionary to list for the response
-            positions_list = []
-            for position_name, candidates in positions_dict.items():
-                positions_list.append({
-                    "name": position_name,
-                    "candidates": candidates
-                })
+
+            positions_list = [
+                {
+                    "name": position["name"],
+                    "candidates": [
+                        {"name": candidate["name"], "vote_count": candidate["vote_count"]}
+                        for candidate in position["candidates"]
+                    ]
+                }
+                for position in tally["positions"]
+            ]
             
             # Calculate remaining time for ongoing elections
             remaining_time = None
             if election_status == "ongoing":
-                start_time = datetime.fromisoformat(election["created_at"])
-                if start_time.tzinfo is None:
-                    start_time = start_time.replace(tzinfo=timezone.utc)
-                
-                end_time = start_time + timedelta(hours=election["duration_hours"])
-                now = datetime.now(timezone.utc)
-                
-                if now < end_time:
-                    remaining_time = (end_time - now).total_seconds()
+                remaining_time = deadlines.remaining_seconds(election) or None
             
             # Add organization results to the response
             results.append({
@@ -551,8 +482,201 @@ async def get_election_results(token: str = Depends(oauth2_scheme)):
                 "positions": positions_list
             })
         
-        return results
+        return ORJSONResponse(results)
     
     except Exception as e:
         print(f"Error getting election results: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to get election results: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to get election results: {str(e)}")
+
+@router.get("/{election_id}/turnout")
+async def get_election_turnout(
+    election_id: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    bucket_minutes: int = Query(1, ge=1, le=1440),
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Get the turnout curve of an election as a compact series.
+    Each array holds ballots per bucket starting at `start`, per program and in total.
+    """
+    try:
+        def buckets_query():
+            query = supabase.table("election_turnout_buckets")\
+                .select("bucket_start, program, ballots")\
+                .eq("election_id", election_id)
+            if start:
+                query = query.gte("bucket_start", deadlines.parse_timestamp(start).isoformat())
+            if end:
+                query = query.lt("bucket_start", deadlines.parse_timestamp(end).isoformat())
+            return query
+
+        # One row per minute and program, so a long election passes the PostgREST row cap
+        rows = []
+        async for chunk in scan_chunks(buckets_query, key="bucket_start", tiebreak="program"):
+            rows.extend(chunk)
+
+        bucket_seconds = bucket_minutes * 60
+        if start:
+            window_start = deadlines.parse_timestamp(start)
+        elif rows:
+            window_start = deadlines.parse_timestamp(rows[0]["bucket_start"])
+        else:
+            window_start = None
+
+        # Without an end the window stops at the last bucket, so no buckets means no window
+        if window_start is None or (not rows and not end):
+            return {
+                "election_id": election_id,
+                "start": None,
+                "bucket_seconds": bucket_seconds,
+                "total": [],
+                "programs": {},
+                "ballots": 0,
+                "peak": None
+            }
+
+        # Align the window to whole minutes so bucket indexes are stable
+        window_start = window_start.replace(second=0, microsecond=0)
+        if end:
+            window_end = deadlines.parse_timestamp(end)
+        else:
+            window_end = deadlines.parse_timestamp(rows[-1]["bucket_start"]) + timedelta(minutes=1)
+        bucket_count = max(1, -(-int((window_end - window_start).total_seconds()) // bucket_seconds))
+        if bucket_count > MAX_TURNOUT_BUCKETS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Window too large: use a bucket size that yields at most {MAX_TURNOUT_BUCKETS} buckets"
+            )
+
+        total = [0] * bucket_count
+        programs = {}
+        for row in rows:
+            index = int((deadlines.parse_timestamp(row["bucket_start"]) - window_start).total_seconds()) // bucket_seconds
+            if index < 0 or index >= bucket_count:
+                continue
+            series = programs.setdefault(row["program"], [0] * bucket_count)
+            series[index] += row["ballots"]
+            total[index] += row["ballots"]
+
+        # Peak ballots per minute always comes from the per-minute buckets
+        per_minute = {}
+        for row in rows:
+            per_minute[row["bucket_start"]] = per_minute.get(row["bucket_start"], 0) + row["ballots"]
+        peak = None
+        if per_minute:
+            peak_at = max(per_minute, key=per_minute.get)
+            peak = {
+                "at": deadlines.parse_timestamp(peak_at).isoformat(),
+                "ballots_per_minute": per_minute[peak_at]
+            }
+
+        return {
+            "election_id": election_id,
+            "start": window_start.isoformat(),
+            "bucket_seconds": bucket_seconds,
+            "total": total,
+            "programs": programs,
+            "ballots": sum(total),
+            "peak": peak
+        }
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        print(f"Error getting election turnout: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get election turnout: {str(e)}")
+
+@router.post("/{election_id}/turnout/rebuild")
+async def rebuild_election_turnout(
+    election_id: str,
+    token: str = Depends(oauth2_scheme)
+):
+    """Rebuild the turnout buckets of an election from votes.created_at."""
+    try:
+        rebuild_resp = supabase.rpc("rebuild_turnout_buckets", {"p_election_id": election_id}).execute()
+        return {
+            "election_id": election_id,
+            "buckets": rebuild_resp.data or 0,
+            "message": "Turnout rebuilt successfully"
+        }
+    except Exception as e:
+        print(f"Error rebuilding election turnout: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to rebuild election turnout: {str(e)}")
+
+@router.get("/{election_id}/ballot")
+async def get_election_ballot(
+    election_id: str,
+    request: Request,
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Get the ballot of an election as one document: positions in order, candidates
+    with photo variants and partylists, and the deadline. Supports If-None-Match.
+    """
+    try:
+        ballot = await run_in_threadpool(ballots.get_ballot, election_id)
+        if ballot is None:
+            raise HTTPException(status_code=404, detail="Election not found")
+
+        headers = {"ETag": ballot["etag"], "Cache-Control": "private, no-cache"}
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            if "*" in tags or ballot["etag"] in tags:
+                return Response(status_code=304, headers=headers)
+
+        return Response(content=ballot["body"], media_type="application/json", headers=headers)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        print(f"Error getting election ballot: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get election ballot: {str(e)}")
+
+@router.get("/{election_id}/results/verify")
+async def verify_election_results(
+    election_id: str,
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Audit the results snapshot of a finished election: recompute its hash and
+    recount every candidate in it against the votes table.
+    """
+    try:
+        verification = election_results.verify_snapshot(election_id)
+        if verification is None:
+            raise HTTPException(status_code=404, detail="No results snapshot for this election")
+        verification["valid"] = (
+            verification["results_hash"] == verification["computed_hash"]
+            and verification["mismatched_candidates"] == 0
+        )
+        return verification
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        print(f"Error verifying election results: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to verify election results: {str(e)}")
+
+@router.get("/{election_id}/crosstab")
+async def get_election_crosstab(
+    election_id: str,
+    by: str = Query("program,candidate"),
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Break results down by voter demographics, e.g. by=block,candidate.
+    Dimensions: program, year_level, block, candidate, position. Counts are votes
+    when grouping by candidate or position and ballots otherwise.
+    """
+    dimensions = [dimension.strip() for dimension in by.split(",") if dimension.strip()]
+    unknown = [dimension for dimension in dimensions if dimension not in analytics.DIMENSIONS]
+    if not dimensions or unknown or len(set(dimensions)) != len(dimensions):
+        raise HTTPException(
+            status_code=400,
+            detail=f"by must list distinct dimensions from: {', '.join(analytics.DIMENSIONS)}"
+        )
+    try:
+        # Loading an election's columns scans its votes, so keep it off the event loop
+        return ORJSONResponse(await run_in_threadpool(analytics.crosstab, election_id, dimensions))
+    except Exception as e:
+        print(f"Error computing election crosstab: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to compute election crosstab: {str(e)}")
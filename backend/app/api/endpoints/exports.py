@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.core.security import require_admin
+from app.services import exports, jobs
+
+router = APIRouter()
+
+def _check_request(dataset: str, format: str) -> None:
+    if dataset not in exports.DATASET_COLUMNS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown dataset. Available: {', '.join(exports.DATASET_COLUMNS)}"
+        )
+    if format not in exports.FORMATS:
+        raise HTTPException(status_code=400, detail="Format must be csv or parquet")
+    if format == "parquet" and not exports.parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export needs pyarrow installed on the server")
+
+@router.get("/jobs/{job_id}/file")
+async def download_export_file(job_id: str, admin: dict = Depends(require_admin)):
+    """Download the file written by a finished export job."""
+    try:
+        job = await run_in_threadpool(jobs.get_job, job_id)
+    except Exception as e:
+        print(f"Error fetching export job: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch export job: {str(e)}")
+    if not job or job["kind"] != "export":
+        raise HTTPException(status_code=404, detail="Export job not found")
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Export job is {job['status']}")
+
+    result = job["result"]
+    path = exports.export_file(result["file"])
+    if path is None:
+        raise HTTPException(status_code=410, detail="Export file has expired")
+    media_type, _ = exports.FORMATS[result["format"]]
+    return FileResponse(path, media_type=media_type, filename=result["download_name"])
+
+@router.get("/{election_id}/{dataset}")
+async def export_election_dataset(
+    election_id: str,
+    dataset: str,
+    format: str = Query("csv"),
+    admin: dict = Depends(require_admin)
+):
+    """
+    Download election results as CSV or Parquet. Datasets: candidates (tally per
+    candidate), positions, programs (turnout per program) and ledger (every vote
+    with an anonymous ballot token instead of the student).
+    """
+    _check_request(dataset, format)
+
+    try:
+        tally = await run_in_threadpool(exports.election_tally, election_id)
+    except Exception as e:
+        print(f"Error preparing export: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to prepare export: {str(e)}")
+    if tally is None:
+        raise HTTPException(status_code=404, detail="Election not found")
+
+    media_type, extension = exports.FORMATS[format]
+    return StreamingResponse(
+        exports.encode(format, dataset, election_id, tally),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="election-{election_id}-{dataset}.{extension}"'}
+    )
+
+@router.post("/{election_id}/{dataset}", status_code=202)
+async def enqueue_election_export(
+    election_id: str,
+    dataset: str,
+    format: str = Query("csv"),
+    admin: dict = Depends(require_admin)
+):
+    """
+    Write the same export to a file in a background job. Once the job has succeeded
+    the file is downloaded from /exports/jobs/{job_id}/file for a day.
+    """
+    _check_request(dataset, format)
+    try:
+        job = await run_in_threadpool(
+            jobs.submit, "export", exports.write_export, election_id, dataset, format, created_by=admin.get("sub")
+        )
+        return {**jobs.reference(job), "file_url": f"/api/v1/exports/jobs/{job['id']}/file"}
+    except jobs.JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Too many background jobs, try again shortly: {str(e)}")
+    except Exception as e:
+        print(f"Error enqueueing export: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to enqueue export: {str(e)}")
@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
+from app.core import startup
+
+router = APIRouter()
+
+@router.get("/live")
+async def liveness():
+    """The process is up and serving requests; nothing else is checked."""
+    return {"status": "alive"}
+
+@router.get("/ready")
+async def readiness():
+    """
+    Ready once the caches (ongoing ballots, eligible voters, vote validators) have
+    been warmed and a trivial database query answers within the latency threshold.
+    A failed warm-up is retried by the next probe. Answers 503 while not ready.
+    """
+    warm_up = await run_in_threadpool(startup.ensure_warm)
+    database = await run_in_threadpool(startup.probe_database)
+    ready = warm_up["warm"] and database["ok"]
+    return ORJSONResponse(
+        {"status": "ready" if ready else "not_ready", "checks": {"warm_up": warm_up, "database": database}},
+        status_code=200 if ready else 503
+    )
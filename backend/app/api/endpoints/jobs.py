@@ -0,0 +1,34 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.core.security import require_admin
+from app.services import jobs
+
+router = APIRouter()
+
+@router.get("")
+async def list_jobs(
+    kind: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    admin: dict = Depends(require_admin)
+):
+    """Most recent background jobs first."""
+    if status and status not in jobs.STATUSES:
+        raise HTTPException(status_code=400, detail=f"Status must be one of: {', '.join(jobs.STATUSES)}")
+    try:
+        return jobs.list_jobs(kind, status, limit)
+    except Exception as e:
+        print(f"Error listing jobs: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to list jobs: {str(e)}")
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, admin: dict = Depends(require_admin)):
+    """Status, progress (progress_done of progress_total), result and error of a job."""
+    try:
+        job = jobs.get_job(job_id)
+    except Exception as e:
+        print(f"Error fetching job: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch job: {str(e)}")
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+from app.core.security import require_admin
+from app.core.rate_limit import rate_limit_stats
+from app.db.database import pool_stats
+from app.db import query_count
+
+router = APIRouter()
+
+@router.get("/rate-limits")
+async def get_rate_limit_metrics(admin: dict = Depends(require_admin)):
+    """Allowed and rejected request counts per rate limit, for this worker."""
+    return rate_limit_stats()
+
+@router.get("/db-pool")
+async def get_db_pool_metrics(admin: dict = Depends(require_admin)):
+    """Connection usage of the shared Supabase HTTP pool, for this worker."""
+    return pool_stats()
+
+@router.get("/queries")
+async def get_query_metrics(admin: dict = Depends(require_admin)):
+    """Database calls and timings per route, for this worker (see app/db/query_count.py)."""
+    return query_count.snapshot()
@@ -2,8 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
 from app.db.database import supabase
+from app.services import ballots, candidate_archive, eligibility, jobs, results as election_results
+from app.core.bus import bus
+from starlette.concurrency import run_in_threadpool
 from typing import Dict
-from datetime import datetime, timedelta
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
@@ -29,7 +31,7 @@ async def get_organizations(token: str = Depends(oauth2_scheme)):
             for org in orgs_resp.data:
                 # Get latest election for this organization
                 election_resp = supabase.table("elections")\
-                    .select("id, status, created_at, duration_hours")\
+                    .select("id, status, created_at, duration_hours, ends_at")\
                     .eq("organization_id", org["id"])\
                     .order("created_at", desc=True)\
                     .limit(1)\
@@ -42,12 +44,7 @@ async def get_organizations(token: str = Depends(oauth2_scheme)):
                     election = election_resp.data[0]
                     status = election["status"]
                     duration = election.get("duration_hours")
-                    if status == "ongoing":
-                        # Calculate end time based on duration
-                        start_time = datetime.fromisoformat(election["created_at"])
-                        end_time = (start_time + timedelta(hours=duration)).isoformat()
-                    else:
-                        end_time = None
+                    end_time = election["ends_at"] if status == "ongoing" else None
                     orgs.append({
                         "name": org["name"],
                         "status": status,
@@ -109,7 +106,9 @@ async def start_election(
     org_id = org_resp.data["id"]
 
     # Set all ongoing elections for this org to finished
-    supabase.table("elections").update({"status": "finished"}).eq("organization_id", org_id).eq("status", "ongoing").execute()
+    finished_resp = supabase.table("elections").update({"status": "finished"}).eq("organization_id", org_id).eq("status", "ongoing").execute()
+    for finished in finished_resp.data or []:
+        election_results.finalize_election(finished["id"])
 
     # Create new election
     election_resp = supabase.table("elections").insert({
@@ -121,17 +120,23 @@ async def start_election(
     if not election_resp.data:
         raise HTTPException(status_code=500, detail="Failed to start election")
 
+    eligibility.materialize(election_resp.data[0]["id"])
+
     # Set organization as active
     supabase.table("organizations").update({"is_active": True}).eq("id", org_id).execute()
+    # Previous ongoing elections of this organization were finished above
+    bus.publish("elections", {"organization_id": org_id})
+    await run_in_threadpool(ballots.compile_ballot, election_resp.data[0]["id"])
+    await run_in_threadpool(eligibility.eligible_voters, election_resp.data[0]["id"])
 
-    return {"status": "ongoing"}
+    return {"status": "ongoing", "ends_at": election_resp.data[0].get("ends_at")}
 
 @router.post("/new")
 async def create_new_election(
     req: StartElectionRequest,
     token: str = Depends(oauth2_scheme)
 ):
-    """Create a new election and archive all candidates from previous election"""
+    """Create a new election and archive all candidates from previous election (as a background job)"""
     allowed_orgs = [
         "CCS Student Council",
         "ELITES",
@@ -150,8 +155,15 @@ async def create_new_election(
         raise HTTPException(status_code=404, detail="Organization not found")
     org_id = org_resp.data["id"]
 
-    # Archive all candidates from the previous election
-    archive_resp = supabase.table("candidates").update({"is_archived": True}).eq("organization_id", org_id).eq("is_archived", False).execute()
+    # Archive the candidates of the previous election in the background. The ids are
+    # taken now so candidates added for the new election are never archived with them.
+    previous_ids = await run_in_threadpool(candidate_archive.active_candidate_ids, org_id)
+    try:
+        archive_job = await run_in_threadpool(
+            jobs.submit, "archive_candidates", candidate_archive.archive_candidates, previous_ids, org_id
+        )
+    except jobs.JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Too many background jobs, try again shortly: {str(e)}")
     
     # Create new election
     election_resp = supabase.table("elections").insert({
@@ -164,7 +176,11 @@ async def create_new_election(
     if not election_resp.data:
         raise HTTPException(status_code=500, detail="Failed to create new election")
 
-    return {"status": "created", "message": "New election created and previous candidates archived"}
+    return {
+        "status": "created",
+        "message": "New election created; previous candidates are being archived",
+        "archive_job": jobs.reference(archive_job)
+    }
 
 @router.get("/by-name/{name}")
 async def get_organization_by_name(name: str, token: str = Depends(oauth2_scheme)):
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, Body, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Response, Body, BackgroundTasks, Query
 from fastapi.security import OAuth2PasswordBearer
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field, UUID4
 from app.db.database import supabase
+from app.core.bus import bus
+from app.db.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, apply_keyset, encode_cursor, parse_fields, select_for_fields
+)
 from typing import Dict, Optional, List
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
@@ -121,6 +126,9 @@ async def update_partylist(
         if not updated_resp.data or len(updated_resp.data) == 0:
             raise HTTPException(status_code=500, detail="Failed to update partylist")
         
+        # Ballots show partylist names
+        bus.publish("partylists")
+        
         return updated_resp.data[0]
     except HTTPException as he:
         raise he
@@ -152,6 +160,7 @@ async def delete_partylist(
             }) \
             .eq("id", str(partylist_id)) \
             .execute()
+        bus.publish("partylists")
         
         return Response(status_code=204)
     except HTTPException as he:
@@ -160,15 +169,59 @@ async def delete_partylist(
         print(f"Error deleting partylist: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to delete partylist: {str(e)}")
 
+# Fields offered by GET /partylists/candidates and the select fragment each one needs
+PARTYLIST_CANDIDATE_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "position": "position",
+    "organization_id": "organization_id",
+    "partylist_id": "partylist_id",
+    "partylist": "partylist(id, name)"
+}
+DEFAULT_PARTYLIST_CANDIDATE_FIELDS = ["id", "name", "position", "partylist_id", "partylist"]
+
 @router.get("/candidates", response_model=List[Dict])
-async def get_candidates(token: Optional[str] = Depends(oauth2_scheme)):
-    """Get all candidates with their partylist details"""
+async def get_candidates(
+    organization_id: Optional[str] = None,
+    position: Optional[str] = None,
+    partylist_id: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    token: Optional[str] = Depends(oauth2_scheme)
+):
+    """Get active candidates with their partylist details, one page at a time (see X-Next-Cursor)"""
     try:
-        candidates_resp = supabase.table("candidates") \
-            .select("id, name, position, partylist_id, partylist(id, name)") \
-            .execute()
-        
-        return candidates_resp.data
+        selected_fields = parse_fields(fields, PARTYLIST_CANDIDATE_FIELDS, DEFAULT_PARTYLIST_CANDIDATE_FIELDS)
+
+        # Archived candidates belong to past elections and are served by /archives
+        query = supabase.table("candidates") \
+            .select(select_for_fields(selected_fields, PARTYLIST_CANDIDATE_FIELDS, ["id", "name"])) \
+            .eq("is_archived", False)
+        if organization_id:
+            query = query.eq("organization_id", organization_id)
+        if position:
+            query = query.eq("position", position)
+        if partylist_id:
+            query = query.eq("partylist_id", partylist_id)
+
+        candidates_resp = apply_keyset(query, "name", cursor).limit(limit + 1).execute()
+        rows = candidates_resp.data or []
+
+        headers = {}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = encode_cursor([rows[-1]["name"], rows[-1]["id"]])
+
+        candidates = [
+            {field: row[PARTYLIST_CANDIDATE_FIELDS[field].split("(")[0]] for field in selected_fields}
+            for row in rows
+        ]
+
+        # Rows are already shaped; skip re-validating them against List[Dict]
+        return ORJSONResponse(candidates, headers=headers)
+    except HTTPException as he:
+        raise he
     except Exception as e:
         print(f"Error fetching candidates: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to fetch candidates")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to fetch candidates")
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Request
 from fastapi.security import OAuth2PasswordBearer
+from fastapi.responses import ORJSONResponse
 import jwt
 from app.core.config import settings
 from typing import List, Optional
@@ -7,7 +8,11 @@ from pydantic import BaseModel, Field
 import uuid
 from datetime import datetime
 from app.db.database import supabase
+from app.db.pagination import scan_chunks
 from app.core.logging import logger
+from app.core.bus import bus
+from app.services import student_profiles
+from starlette.concurrency import run_in_threadpool
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
@@ -38,29 +43,28 @@ async def get_all_students():
     Get all students.
     """
     try:
-        # Query all students from the database
-        response = supabase.table("students").select("*").execute()
-        
-        if not response.data:
-            return []
-        
-        # Transform the data to include fullName
+        # Query all students from the database in chunks (past the PostgREST row cap)
         students = []
-        for student in response.data:
-            # Create fullName field and exclude password_hash
-            student_data = {
-                "id": student["id"],
-                "student_no": student["student_no"],
-                "first_name": student["first_name"],
-                "last_name": student["last_name"],
-                "program": student["program"],
-                "year_level": student["year_level"],
-                "block": student["block"],
-                "fullName": f"{student['first_name']} {student['last_name']}".upper()
-            }
-            students.append(student_data)
+        async for chunk in scan_chunks(
+            lambda: supabase.table("students").select("id, student_no, first_name, last_name, program, year_level, block")
+        ):
+            # Transform the data to include fullName
+            for student in chunk:
+                # Create fullName field (password_hash is never selected)
+                student_data = {
+                    "id": student["id"],
+                    "student_no": student["student_no"],
+                    "first_name": student["first_name"],
+                    "last_name": student["last_name"],
+                    "program": student["program"],
+                    "year_level": student["year_level"],
+                    "block": student["block"],
+                    "fullName": f"{student['first_name']} {student['last_name']}".upper()
+                }
+                students.append(student_data)
         
-        return students
+        # Already shaped: skip re-validating every row against StudentResponse
+        return ORJSONResponse(students)
         
     except Exception as e:
         logger.error(f"Error getting students: {str(e)}")
@@ -123,6 +127,9 @@ async def update_student(
                 detail="Failed to update student"
             )
         
+        # Drop the cached profile in every worker
+        bus.publish("students", {"student_id": student_id})
+        
         # Format the response
         updated_student = response.data[0]
         return {
@@ -180,17 +187,16 @@ async def get_student_by_id(student_id: str, request: Request):
                     detail="Invalid authentication token"
                 )
         
-        # Query the student with the ID (either from URL or token)
-        response = supabase.table("students").select("*").eq("id", student_id).execute()
+        # Profiles are cached from login until the student is updated
+        student = await run_in_threadpool(student_profiles.get_profile, student_id)
         
-        if not response.data:
+        if student is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Student not found"
             )
         
         # Format the response
-        student = response.data[0]
         return {
             "id": student["id"],
             "student_no": student["student_no"],
@@ -199,7 +205,7 @@ async def get_student_by_id(student_id: str, request: Request):
             "program": student["program"],
             "year_level": student["year_level"],
             "block": student["block"],
-            "fullName": f"{student['first_name']} {student['last_name']}".upper()
+            "fullName": student_profiles.full_name(student)
         }
         
     except HTTPException as e:
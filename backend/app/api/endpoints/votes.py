@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Header, Request
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from app.db.database import supabase
-from datetime import datetime
+from app.core.cache import TTLCache
+from app.core.bus import bus
+from app.services import ballot_validation, eligibility, student_profiles
+from starlette.concurrency import run_in_threadpool
+from app.core.rate_limit import client_ip, vote_ip_limiter, vote_account_limiter
+from datetime import datetime, timezone
 import jwt
 from app.core.config import settings
 
@@ -19,69 +24,110 @@ class VoteSubmission(BaseModel):
     election_id: str
     votes: List[VoteItem]
     student_id: str
+    idempotency_key: Optional[str] = None
+
+# Results of recent submissions by idempotency key, so a retry usually skips the database entirely
+_submission_results = TTLCache(maxsize=10000, ttl=15 * 60)
 
 @router.post("/submit")
 async def submit_votes(
-    vote_data: VoteSubmission
+    vote_data: VoteSubmission,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     try:
         # Use student_id directly from request payload
         student_id = vote_data.student_id
+        key = idempotency_key or vote_data.idempotency_key
         print(f"Processing vote for student ID: {student_id}")
-        
-        # Check if user has already voted in this election
-        existing_vote = supabase.table("votes")\
-            .select("id")\
-            .eq("election_id", vote_data.election_id)\
-            .eq("student_id", student_id)\
-            .execute()
-        
-        if existing_vote.data:
+
+        await vote_ip_limiter.hit(client_ip(request))
+
+        if key:
+            cached = _submission_results.get(key)
+            if cached is not None:
+                if cached["election_id"] != vote_data.election_id or cached["student_id"] != student_id:
+                    raise HTTPException(
+                        status_code=409,
+                        detail="Idempotency key was already used for a different ballot"
+                    )
+                return {**cached["result"], "replayed": True}
+
+        # Replays above are cheap; only new submissions count against the account
+        await vote_account_limiter.hit(student_id)
+
+        if not vote_data.votes:
+            raise HTTPException(status_code=400, detail="No votes submitted")
+
+        # Eligible voters are fixed when the election starts; the database checks again.
+        # A cache miss scans the voter list, so both lookups run in the thread pool
+        if not await run_in_threadpool(eligibility.is_eligible, vote_data.election_id, student_id):
+            raise HTTPException(status_code=403, detail="You are not eligible to vote in this election")
+
+        # One pass over the ballot against the cached candidates of this election
+        validator = await run_in_threadpool(ballot_validation.get_validator, vote_data.election_id)
+        if validator is None:
+            raise HTTPException(status_code=404, detail="Election not found")
+        problem = validator.check(vote.candidate_id for vote in vote_data.votes)
+        if problem:
+            raise HTTPException(status_code=400, detail=problem)
+
+        # The ballot, its votes and the turnout bucket are written in one transaction.
+        # The ballots table rejects a second ballot for the same (election_id, student_id).
+        timestamp = datetime.now(timezone.utc).isoformat()
+        submit_resp = supabase.rpc("submit_ballot", {
+            "p_election_id": vote_data.election_id,
+            "p_student_id": student_id,
+            # The position field is only kept for frontend compatibility
+            "p_candidate_ids": [vote.candidate_id for vote in vote_data.votes],
+            "p_idempotency_key": key,
+            "p_at": timestamp
+        }).execute()
+
+        outcome = submit_resp.data or {}
+        status = outcome.get("status")
+
+        if status == "election_not_found":
+            raise HTTPException(status_code=404, detail="Election not found")
+        if status == "election_inactive":
             raise HTTPException(
                 status_code=400, 
-                detail="You have already voted in this election"
+                detail="This election is not currently active"
             )
-        
-        # Verify the election is ongoing
-        election_resp = supabase.table("elections")\
-            .select("status")\
-            .eq("id", vote_data.election_id)\
-            .single()\
-            .execute()
-        
-        if not election_resp.data:
-            raise HTTPException(status_code=404, detail="Election not found")
-        
-        if election_resp.data["status"] != "ongoing":
+        if status == "already_voted":
             raise HTTPException(
                 status_code=400, 
-                detail="This election is not currently active"
+                detail="You have already voted in this election"
             )
-        
-        # Record the votes
-        timestamp = datetime.now().isoformat()
-        vote_records = []
-        
-        # Remove the 'position' field when creating records for database insertion
-        for vote in vote_data.votes:
-            vote_records.append({
+        if status == "not_eligible":
+            raise HTTPException(status_code=403, detail="You are not eligible to vote in this election")
+        if status == "key_conflict":
+            raise HTTPException(
+                status_code=409,
+                detail="Idempotency key was already used for a different ballot"
+            )
+        if status not in ("recorded", "replayed"):
+            raise HTTPException(
+                status_code=500, 
+                detail="Failed to record votes"
+            )
+
+        if status == "recorded":
+            bus.publish("votes", {"election_id": vote_data.election_id, "student_id": student_id})
+
+        result = {
+            "message": "Votes submitted successfully",
+            "ballot_id": outcome["ballot_id"],
+            "submitted_at": outcome["submitted_at"]
+        }
+        if key:
+            _submission_results.set(key, {
                 "election_id": vote_data.election_id,
-                "candidate_id": vote.candidate_id,
                 "student_id": student_id,
-                # Remove the position field since it doesn't exist in the database
-                "created_at": timestamp
+                "result": result
             })
-        
-        # Insert all votes in a batch
-        if vote_records:
-            votes_resp = supabase.table("votes").insert(vote_records).execute()
-            if not votes_resp.data:
-                raise HTTPException(
-                    status_code=500, 
-                    detail="Failed to record votes"
-                )
-        
-        return {"message": "Votes submitted successfully"}
+
+        return {**result, "replayed": status == "replayed"}
     
     except HTTPException as e:
         raise e
@@ -104,8 +150,8 @@ async def check_if_student_voted(
     try:
         print(f"Checking vote status for election_id: '{election_id}', student_id: '{student_id}'")
         
-        # Check if there are any votes for this student in this election
-        existing_vote = supabase.table("votes")\
+        # Ballots hold one row per (election, student)
+        existing_vote = supabase.table("ballots")\
             .select("id")\
             .eq("election_id", election_id)\
             .eq("student_id", student_id)\
@@ -257,21 +303,17 @@ async def fetch_from_api(endpoint, auth_header):
     # Extract token
     token = auth_header.replace("Bearer ", "")
     
-    # Decode token to get student_no
+    # Decode token to get the student id (the token subject)
     payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-    student_no = payload.get("sub")
+    student_id = payload.get("sub")
     
-    if not student_no:
+    if not student_id:
         raise HTTPException(status_code=401, detail="Invalid token")
     
-    # Query student directly
-    student_resp = supabase.table("students")\
-        .select("*")\
-        .eq("student_no", student_no)\
-        .single()\
-        .execute()
+    # Shared profile cache, filled at login
+    student = await run_in_threadpool(student_profiles.get_profile, student_id)
     
-    if not student_resp.data:
+    if student is None:
         raise HTTPException(status_code=404, detail="Student not found")
     
-    return student_resp.data
\ No newline at end of file
+    return student
\ No newline at end of file
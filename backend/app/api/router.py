@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.endpoints import auth, elections, organizations, candidates, students, votes, archives, partylist
+from app.api.endpoints import auth, elections, organizations, candidates, students, votes, archives, partylist, metrics, exports, jobs
 api_router = APIRouter()
 
 # Include all endpoint routers
@@ -11,3 +11,6 @@ api_router.include_router(students.router, prefix="/students", tags=["students"]
 api_router.include_router(votes.router, prefix="/votes", tags=["votes"])
 api_router.include_router(partylist.router, prefix="/partylists", tags=["partylists"])
 api_router.include_router(archives.router, prefix="/archives", tags=["archives"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+api_router.include_router(exports.router, prefix="/exports", tags=["exports"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
@@ -0,0 +1,201 @@
+"""
+Cache invalidation bus.
+
+Endpoints publish a message on a topic ("candidates", "partylists", "elections",
+"votes", ...) after changing data, and in-memory caches subscribe to the topics
+they depend on. With one process the bus is a plain in-process dispatcher. With
+several gunicorn workers each worker connects to a small broker running in the
+gunicorn master, which relays every message to the other workers.
+"""
+import json
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Callable, Dict, List
+from urllib.parse import urlparse
+
+from app.core.config import settings
+from app.core.logging import logger
+
+Handler = Callable[[dict], None]
+
+# Sent to every handler after a broker reconnect, since messages may have been missed
+RESET_MESSAGE = {"reset": True}
+
+
+class InProcessBus:
+    """Delivers published messages to the subscribers of this process only."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[Handler]] = defaultdict(list)
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        self._subscribers[topic].append(handler)
+
+    def publish(self, topic: str, message: dict = None) -> None:
+        self._deliver(topic, message or {})
+
+    def _deliver(self, topic: str, message: dict) -> None:
+        for handler in list(self._subscribers.get(topic, [])):
+            try:
+                handler(message)
+            except Exception as e:
+                logger.error(f"Cache bus handler for '{topic}' failed: {e}")
+
+    def _deliver_reset(self) -> None:
+        for topic in list(self._subscribers):
+            self._deliver(topic, RESET_MESSAGE)
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class LocalBrokerBus(InProcessBus):
+    """
+    Delivers locally right away and relays through a BrokerServer to other workers.
+    A background thread reads messages from the broker and reconnects when it drops.
+    """
+
+    def __init__(self, host: str, port: int):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.origin = uuid.uuid4().hex
+        self._sock = None
+        self._send_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._connected = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            # Workers forked from a master that imported this module share the object
+            # built there, so each process picks its own origin when it starts
+            self.origin = uuid.uuid4().hex
+            self._thread = threading.Thread(target=self._run, name="cache-bus", daemon=True)
+            self._thread.start()
+            # Give the first connection a moment so early publishes are relayed
+            self._connected.wait(timeout=1)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+
+    def publish(self, topic: str, message: dict = None) -> None:
+        message = message or {}
+        self._deliver(topic, message)
+        line = json.dumps({"topic": topic, "message": message, "origin": self.origin}) + "\n"
+        with self._send_lock:
+            if self._sock is None:
+                logger.warning(f"Cache bus not connected; '{topic}' invalidation stays local")
+                return
+            try:
+                self._sock.sendall(line.encode())
+            except OSError as e:
+                logger.warning(f"Cache bus send failed: {e}")
+
+    def _run(self) -> None:
+        backoff = 0.1
+        first = True
+        while not self._stopped.is_set():
+            try:
+                sock = socket.create_connection((self.host, self.port), timeout=5)
+                sock.settimeout(None)
+            except OSError:
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 5)
+                continue
+            backoff = 0.1
+            reader = sock.makefile("r")
+            try:
+                # The broker greets a client once it will receive relayed messages
+                if not reader.readline():
+                    raise OSError("broker closed the connection")
+            except OSError:
+                sock.close()
+                continue
+            with self._send_lock:
+                self._sock = sock
+            self._connected.set()
+            if not first:
+                self._deliver_reset()
+            first = False
+            try:
+                for line in reader:
+                    try:
+                        envelope = json.loads(line)
+                    except ValueError:
+                        continue
+                    if envelope.get("origin") != self.origin:
+                        self._deliver(envelope["topic"], envelope.get("message") or {})
+            except OSError:
+                pass
+            with self._send_lock:
+                self._sock = None
+            self._connected.clear()
+
+
+class _BrokerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server
+        with server.clients_lock:
+            server.clients.add(self.wfile)
+            self.wfile.write(b'{"topic": "__hello__"}\n')
+        try:
+            for line in self.rfile:
+                # Holding the lock also keeps writes from different senders from interleaving
+                with server.clients_lock:
+                    for client in server.clients:
+                        if client is self.wfile:
+                            continue
+                        try:
+                            client.write(line)
+                            client.flush()
+                        except OSError:
+                            pass
+        finally:
+            with server.clients_lock:
+                server.clients.discard(self.wfile)
+
+
+class BrokerServer(socketserver.ThreadingTCPServer):
+    """Relays each line a client sends to every other connected client."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str, port: int):
+        self.clients = set()
+        self.clients_lock = threading.Lock()
+        super().__init__((host, port), _BrokerHandler)
+
+    def serve_in_thread(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, name="cache-bus-broker", daemon=True)
+        thread.start()
+        return thread
+
+
+def parse_bus_url(url: str):
+    parsed = urlparse(url)
+    if parsed.scheme != "tcp":
+        raise ValueError(f"Unsupported cache bus URL: {url}")
+    return parsed.hostname or "127.0.0.1", parsed.port or 8765
+
+
+def create_bus():
+    if settings.CACHE_BUS_URL:
+        return LocalBrokerBus(*parse_bus_url(settings.CACHE_BUS_URL))
+    return InProcessBus()
+
+
+bus = create_bus()
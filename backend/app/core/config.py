@@ -10,9 +10,69 @@ class Settings(BaseModel):
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    # A password login lasts this long on a device, refreshing its access token as it goes
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "1"))
     SUPABASE_URL: str = os.getenv("SUPABASE_URL")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY")
     SUPABASE_SERVICE_ROLE_KEY: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
+    # Shared HTTP connection pool for Supabase (PostgREST) requests
+    SUPABASE_POOL_SIZE: int = int(os.getenv("SUPABASE_POOL_SIZE", "20"))
+    SUPABASE_POOL_KEEPALIVE: int = int(os.getenv("SUPABASE_POOL_KEEPALIVE", "10"))
+    SUPABASE_KEEPALIVE_EXPIRY: float = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+    SUPABASE_TIMEOUT: float = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+    SUPABASE_CONNECT_TIMEOUT: float = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "5"))
+    SUPABASE_HTTP2: bool = os.getenv("SUPABASE_HTTP2", "false").lower() == "true"
+
+    # Responses smaller than this are sent uncompressed
+    GZIP_MINIMUM_SIZE: int = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+    GZIP_COMPRESS_LEVEL: int = int(os.getenv("GZIP_COMPRESS_LEVEL", "5"))
+
+    # Warn at startup (and fail `python -m app.core.startup`) when importing the app takes longer
+    IMPORT_TIME_BUDGET_MS: int = int(os.getenv("IMPORT_TIME_BUDGET_MS", "1500"))
+
+    # Opt-in count of database calls per request (X-DB-Calls), on in the test suite;
+    # requests over budget are logged. QUERY_BUDGETS overrides per route: "GET /api/v1/elections/results=40,GET /api/v1/students=5"
+    QUERY_COUNT_ENABLED: bool = os.getenv("QUERY_COUNT_ENABLED", "false").lower() == "true"
+    QUERY_BUDGET_DEFAULT: int = int(os.getenv("QUERY_BUDGET_DEFAULT", "30"))
+    QUERY_BUDGETS: str = os.getenv("QUERY_BUDGETS", "")
+
+    # Opt-in request profiling (see app/core/profiling.py); nothing is installed when disabled
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    PROFILING_INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+
+    # /health/ready fails while a trivial database query takes longer than this
+    READINESS_DB_LATENCY_MS: int = int(os.getenv("READINESS_DB_LATENCY_MS", "1000"))
+
+    # Cache invalidation bus; "tcp://host:port" relays through the gunicorn master's broker
+    CACHE_BUS_URL: str = os.getenv("CACHE_BUS_URL", "")
+
+    # Rate limiting ("<requests>/<second|minute|hour>"); a polling station may share one IP
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory | sqlite
+    RATE_LIMIT_SQLITE_PATH: str = os.getenv("RATE_LIMIT_SQLITE_PATH", "/tmp/easyvote-ratelimit.db")
+    # Proxies in front of the app that append to X-Forwarded-For (0 = use the socket address)
+    RATE_LIMIT_PROXY_HOPS: int = int(os.getenv("RATE_LIMIT_PROXY_HOPS", "1"))
+    LOGIN_RATE_LIMIT_PER_IP: str = os.getenv("LOGIN_RATE_LIMIT_PER_IP", "300/minute")
+    LOGIN_RATE_LIMIT_PER_ACCOUNT: str = os.getenv("LOGIN_RATE_LIMIT_PER_ACCOUNT", "10/minute")
+    VOTE_RATE_LIMIT_PER_IP: str = os.getenv("VOTE_RATE_LIMIT_PER_IP", "600/minute")
+    VOTE_RATE_LIMIT_PER_ACCOUNT: str = os.getenv("VOTE_RATE_LIMIT_PER_ACCOUNT", "10/minute")
+
+    # Background jobs (archiving, bulk import, exports) run on a small per-worker thread pool
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_MAX_PENDING: int = int(os.getenv("JOB_MAX_PENDING", "20"))
+    JOB_STALE_MINUTES: int = int(os.getenv("JOB_STALE_MINUTES", "60"))
+
+    # Password hashing (see app/core/passwords.py): a non-zero ROUNDS/TIME_COST pins the work
+    # factor and is the rehash threshold. Unpinned, each worker calibrates the cost of new hashes
+    # to about PASSWORD_VERIFY_TARGET_MS, so pin it when workers run on more than one host
+    PASSWORD_SCHEME: str = os.getenv("PASSWORD_SCHEME", "bcrypt")  # bcrypt | argon2 (needs argon2-cffi)
+    PASSWORD_VERIFY_TARGET_MS: int = int(os.getenv("PASSWORD_VERIFY_TARGET_MS", "250"))
+    PASSWORD_BCRYPT_ROUNDS: int = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", "0"))
+    PASSWORD_ARGON2_TIME_COST: int = int(os.getenv("PASSWORD_ARGON2_TIME_COST", "0"))
+    PASSWORD_ARGON2_MEMORY_KIB: int = int(os.getenv("PASSWORD_ARGON2_MEMORY_KIB", "65536"))
+    PASSWORD_ARGON2_PARALLELISM: int = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", "2"))
+
 
 settings = Settings()
\ No newline at end of file
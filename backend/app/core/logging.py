@@ -16,7 +16,8 @@ console_handler = logging.StreamHandler(sys.stdout)
 file_handler = RotatingFileHandler(
     os.path.join(logs_dir, "app.log"), 
     maxBytes=10485760,  # 10MB
-    backupCount=5
+    backupCount=5,
+    delay=True  # Open the log file on the first record, not at import
 )
 
 # Create formatters
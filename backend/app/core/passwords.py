@@ -0,0 +1,248 @@
+"""
+Password hashing with a work factor pinned per deployment or calibrated to this host.
+
+PASSWORD_BCRYPT_ROUNDS / PASSWORD_ARGON2_TIME_COST pin the cost. Without them
+`calibrate()` times the configured scheme on the current CPU at startup and
+picks the highest cost whose verify stays under PASSWORD_VERIFY_TARGET_MS (never
+below the floors here) for new hashes only. bcrypt is always available;
+PASSWORD_SCHEME=argon2 uses the memory-hard argon2id when argon2-cffi is
+installed and falls back to bcrypt otherwise.
+
+A stored hash that is plaintext, of another scheme or below the rehash threshold
+still verifies, and `needs_rehash` tells the login to replace it. The threshold
+is the pinned cost, or the floor when unpinned: each worker measures its own
+cost, so rehashing against it would make workers on different hosts rewrite
+each other's hashes back and forth. Multi-host deployments should pin the cost.
+
+Run `python -m app.core.passwords` from the backend directory to benchmark verify
+latency for each available scheme at its calibrated cost, and pin the printed
+cost for the deployment.
+"""
+import argparse
+import hmac
+import math
+import statistics
+import threading
+import time
+from typing import Dict, List, Optional
+
+from passlib.context import CryptContext
+from passlib.hash import argon2, bcrypt
+
+from app.core.config import settings
+from app.core.logging import logger
+
+# Costs never calibrated below these, however slow the host
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+ARGON2_MIN_TIME_COST = 2
+ARGON2_MAX_TIME_COST = 20
+_CALIBRATION_PASSWORD = "calibration-password"
+
+
+def argon2_available() -> bool:
+    return argon2.has_backend()
+
+
+def _seconds(handler, samples: int = 3) -> float:
+    """Best of a few hashes, which costs the same as a verify."""
+    best = None
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash(_CALIBRATION_PASSWORD)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def calibrate_bcrypt(target_ms: float) -> int:
+    """bcrypt rounds whose verify stays under target_ms; each round doubles the cost."""
+    if settings.PASSWORD_BCRYPT_ROUNDS:
+        return settings.PASSWORD_BCRYPT_ROUNDS
+    measured_ms = _seconds(bcrypt.using(rounds=BCRYPT_MIN_ROUNDS)) * 1000
+    extra = int(math.floor(math.log2(target_ms / measured_ms))) if measured_ms < target_ms else 0
+    return min(BCRYPT_MIN_ROUNDS + extra, BCRYPT_MAX_ROUNDS)
+
+
+def calibrate_argon2(target_ms: float) -> int:
+    """argon2id time cost (passes over PASSWORD_ARGON2_MEMORY_KIB) under target_ms; cost is linear in it."""
+    if settings.PASSWORD_ARGON2_TIME_COST:
+        return settings.PASSWORD_ARGON2_TIME_COST
+    handler = argon2.using(
+        type="ID",
+        memory_cost=settings.PASSWORD_ARGON2_MEMORY_KIB,
+        parallelism=settings.PASSWORD_ARGON2_PARALLELISM,
+        rounds=1,
+    )
+    measured_ms = _seconds(handler) * 1000
+    return max(ARGON2_MIN_TIME_COST, min(int(target_ms // measured_ms), ARGON2_MAX_TIME_COST))
+
+
+def build_context(
+    scheme: str,
+    bcrypt_rounds: int,
+    argon2_time_cost: Optional[int],
+    bcrypt_min_rounds: int = BCRYPT_MIN_ROUNDS,
+    argon2_min_time_cost: int = ARGON2_MIN_TIME_COST
+) -> CryptContext:
+    """
+    New hashes use `scheme` at the given cost; the other installed scheme still
+    verifies but is deprecated, and hashes below the *_min cost count as outdated.
+    """
+    options = {
+        "bcrypt__default_rounds": bcrypt_rounds,
+        "bcrypt__min_rounds": min(bcrypt_min_rounds, bcrypt_rounds),
+    }
+    schemes = ["bcrypt"]
+    if argon2_time_cost is not None:
+        schemes.append("argon2")
+        options.update({
+            "argon2__type": "ID",
+            "argon2__memory_cost": settings.PASSWORD_ARGON2_MEMORY_KIB,
+            "argon2__parallelism": settings.PASSWORD_ARGON2_PARALLELISM,
+            "argon2__default_rounds": argon2_time_cost,
+            "argon2__min_rounds": min(argon2_min_time_cost, argon2_time_cost),
+        })
+    if scheme == "argon2":
+        schemes.reverse()
+    return CryptContext(schemes=schemes, deprecated="auto", **options)
+
+
+# Until calibrate() runs (and if it fails) hashes use the floors
+_context = build_context("bcrypt", BCRYPT_MIN_ROUNDS, ARGON2_MIN_TIME_COST if argon2_available() else None)
+_policy: Dict[str, object] = {
+    "scheme": "bcrypt",
+    "bcrypt_rounds": BCRYPT_MIN_ROUNDS,
+    "rehash_below": BCRYPT_MIN_ROUNDS,
+    "calibrated": False,
+}
+_calibrate_lock = threading.Lock()
+
+
+def _pinned(scheme: str) -> bool:
+    return bool(settings.PASSWORD_ARGON2_TIME_COST if scheme == "argon2" else settings.PASSWORD_BCRYPT_ROUNDS)
+
+
+def calibrate() -> dict:
+    """
+    Pick the work factors for new hashes (pinned, or measured on this host for
+    PASSWORD_VERIFY_TARGET_MS) and switch to them. Only a pinned cost raises the
+    rehash threshold above the floors.
+    """
+    global _context, _policy
+    target_ms = settings.PASSWORD_VERIFY_TARGET_MS
+    scheme = settings.PASSWORD_SCHEME
+    if scheme == "argon2" and not argon2_available():
+        logger.warning("PASSWORD_SCHEME=argon2 but argon2-cffi is not installed; hashing with bcrypt")
+        scheme = "bcrypt"
+
+    with _calibrate_lock:
+        started = time.perf_counter()
+        bcrypt_rounds = calibrate_bcrypt(target_ms) if scheme == "bcrypt" else BCRYPT_MIN_ROUNDS
+        argon2_time_cost = None
+        if argon2_available():
+            argon2_time_cost = calibrate_argon2(target_ms) if scheme == "argon2" else ARGON2_MIN_TIME_COST
+        pinned = _pinned(scheme)
+        bcrypt_min_rounds = settings.PASSWORD_BCRYPT_ROUNDS or BCRYPT_MIN_ROUNDS
+        argon2_min_time_cost = settings.PASSWORD_ARGON2_TIME_COST or ARGON2_MIN_TIME_COST
+        _context = build_context(scheme, bcrypt_rounds, argon2_time_cost, bcrypt_min_rounds, argon2_min_time_cost)
+        _policy = {
+            "scheme": scheme,
+            "bcrypt_rounds": bcrypt_rounds,
+            "argon2_time_cost": argon2_time_cost,
+            "rehash_below": argon2_min_time_cost if scheme == "argon2" else bcrypt_min_rounds,
+            "pinned": pinned,
+            "target_ms": target_ms,
+            "calibrated": True,
+        }
+        logger.info(
+            f"Password hashing calibrated in {(time.perf_counter() - started) * 1000:.0f} ms: "
+            + (f"argon2id t={argon2_time_cost} m={settings.PASSWORD_ARGON2_MEMORY_KIB} KiB"
+               if scheme == "argon2" else f"bcrypt rounds={bcrypt_rounds}")
+            + (" (pinned)" if pinned else f" (target {target_ms} ms)")
+        )
+        if not pinned:
+            logger.warning(
+                "Password cost measured on this host is used for new hashes only; set "
+                + ("PASSWORD_ARGON2_TIME_COST" if scheme == "argon2" else "PASSWORD_BCRYPT_ROUNDS")
+                + " to pin it (and upgrade older hashes) when workers run on more than one host"
+            )
+        return dict(_policy)
+
+
+def policy() -> dict:
+    return dict(_policy)
+
+
+def _is_plaintext(hashed_password: str) -> bool:
+    return _context.identify(hashed_password) is None
+
+
+def hash_password(password: str) -> str:
+    return _context.hash(password)
+
+
+def verify(plain_password: str, hashed_password: str) -> bool:
+    """Check a password against a stored hash; legacy plaintext passwords compare in constant time."""
+    if not hashed_password:
+        return False
+    if _is_plaintext(hashed_password):
+        return hmac.compare_digest(plain_password.encode(), hashed_password.encode())
+    try:
+        return _context.verify(plain_password, hashed_password)
+    except Exception as e:
+        logger.error(f"Password verification error: {type(e).__name__}")
+        return False
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True for plaintext, a deprecated scheme or a cost below the rehash threshold."""
+    if _is_plaintext(hashed_password):
+        return True
+    try:
+        return _context.needs_update(hashed_password)
+    except Exception:
+        return False
+
+
+def benchmark(iterations: int, target_ms: float) -> List[dict]:
+    """Verify latency of each available scheme at the cost calibrated for target_ms."""
+    rounds = calibrate_bcrypt(target_ms)
+    contexts = {"bcrypt": (build_context("bcrypt", rounds, None), f"rounds={rounds}")}
+    if argon2_available():
+        time_cost = calibrate_argon2(target_ms)
+        contexts["argon2id"] = (
+            build_context("argon2", BCRYPT_MIN_ROUNDS, time_cost),
+            f"t={time_cost} m={settings.PASSWORD_ARGON2_MEMORY_KIB} KiB p={settings.PASSWORD_ARGON2_PARALLELISM}",
+        )
+    rows = []
+    for name, (context, parameters) in contexts.items():
+        stored = context.hash(_CALIBRATION_PASSWORD)
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            context.verify(_CALIBRATION_PASSWORD, stored)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        rows.append({
+            "scheme": name,
+            "parameters": parameters,
+            "mean_ms": statistics.mean(timings),
+            "p50_ms": timings[len(timings) // 2],
+            "max_ms": timings[-1],
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark password verify latency per scheme")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--target-ms", type=float, default=settings.PASSWORD_VERIFY_TARGET_MS)
+    args = parser.parse_args()
+
+    if not argon2_available():
+        print("argon2-cffi is not installed; benchmarking bcrypt only")
+    print(f"{'scheme':<10} {'mean ms':>8} {'p50 ms':>8} {'max ms':>8}  parameters")
+    for row in benchmark(args.iterations, args.target_ms):
+        print(f"{row['scheme']:<10} {row['mean_ms']:8.1f} {row['p50_ms']:8.1f} {row['max_ms']:8.1f}  {row['parameters']}")
+    print("Pin the chosen cost for every host with PASSWORD_BCRYPT_ROUNDS or PASSWORD_ARGON2_TIME_COST")
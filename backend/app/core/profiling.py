@@ -0,0 +1,172 @@
+"""
+Opt-in sampling profiler for single requests.
+
+With PROFILING_ENABLED the app installs a middleware that profiles a request when
+an administrator sends `X-Profile: 1`, or at random with PROFILING_SAMPLE_RATE.
+A background thread samples the stacks of the event loop thread and of the
+threadpool workers running this request's work every PROFILING_INTERVAL_MS (a
+worker belongs to the request when the context it runs the call in, copied by
+run_in_threadpool, carries the request's sampler) and writes them in collapsed-stack
+format (one "frame;frame;frame count" line per stack, as read by flamegraph.pl and
+speedscope) to logs/profiles/. The root frame of every stack is the route, and
+the file name carries the route and the request duration.
+
+When PROFILING_ENABLED is off the middleware is never installed, so requests pay nothing.
+"""
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import Context, ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from fastapi import Request
+from jose import JWTError, jwt
+
+from app.core.config import settings
+from app.core.logging import logger, logs_dir
+
+PROFILES_DIR = Path(logs_dir) / "profiles"
+PROFILE_HEADER = "x-profile"
+# Name of the threads starlette's run_in_threadpool runs on
+WORKER_THREAD_NAME = "AnyIO worker thread"
+# Sampler of the request being profiled, inherited by its threadpool calls
+_current_sampler: ContextVar[Optional["StackSampler"]] = ContextVar("profiling_sampler", default=None)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle(frame) -> bool:
+    """A pool worker waiting for work sits in queue.get / Condition.wait."""
+    filename = os.path.basename(frame.f_code.co_filename)
+    return filename in ("threading.py", "queue.py") and frame.f_code.co_name in ("wait", "get")
+
+
+def _call_context(frame) -> Optional[Context]:
+    """The Context a pool worker runs its current call in, kept as a local by the worker loop."""
+    while frame is not None:
+        context = frame.f_locals.get("context") if frame.f_code.co_name == "run" else None
+        if isinstance(context, Context):
+            return context
+        frame = frame.f_back
+    return None
+
+
+class StackSampler:
+    """Samples the stacks of one thread and of the threadpool workers running its request's calls."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def _owns(self, frame) -> bool:
+        context = _call_context(frame)
+        return context is not None and context.get(_current_sampler) is self
+
+    def sample(self) -> None:
+        workers = {thread.ident for thread in threading.enumerate() if thread.name.startswith(WORKER_THREAD_NAME)}
+        for ident, frame in sys._current_frames().items():
+            if ident == self.thread_id:
+                root = "event loop"
+            elif ident in workers and not _is_idle(frame) and self._owns(frame):
+                root = "threadpool"
+            else:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(root)
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+
+def _is_admin(request: Request) -> bool:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return False
+    return payload.get("type") == "admin"
+
+
+def should_profile(request: Request) -> bool:
+    if request.headers.get(PROFILE_HEADER) == "1":
+        return _is_admin(request)
+    return settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+def write_profile(route: str, duration_ms: float, status_code: int, sampler: StackSampler) -> Optional[Path]:
+    if not sampler.stacks:
+        return None
+    PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+    started = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_")[:80]
+    path = PROFILES_DIR / f"{started}-{slug}-{duration_ms:.0f}ms.folded"
+    root = f"{route} [{status_code}, {duration_ms:.0f} ms]"
+    with open(path, "w") as output:
+        for stack, count in sampler.stacks.most_common():
+            output.write(f"{root};{stack} {count}\n")
+    return path
+
+
+def install(app) -> None:
+    """Add the profiling middleware to the app; call only when PROFILING_ENABLED."""
+    interval = settings.PROFILING_INTERVAL_MS / 1000
+
+    @app.middleware("http")
+    async def profile_request(request: Request, call_next):
+        if not should_profile(request):
+            return await call_next(request)
+
+        sampler = StackSampler(threading.get_ident(), interval)
+        started = time.perf_counter()
+        token = _current_sampler.set(sampler)
+        sampler.start()
+        try:
+            response = await call_next(request)
+        finally:
+            sampler.stop()
+            _current_sampler.reset(token)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else request.url.path
+        path = write_profile(f"{request.method} {route_path}", duration_ms, response.status_code, sampler)
+        if path is not None:
+            response.headers["X-Profile-File"] = path.name
+            logger.info(
+                f"Profiled {request.method} {route_path} in {duration_ms:.0f} ms "
+                f"({sampler.samples} samples) -> {path}"
+            )
+        return response
+
+    logger.info(
+        f"Request profiling enabled (sample rate {settings.PROFILING_SAMPLE_RATE}, "
+        f"interval {settings.PROFILING_INTERVAL_MS} ms)"
+    )
@@ -0,0 +1,192 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+from fastapi import HTTPException, Request, status
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+
+def parse_rate(rate: str) -> Tuple[int, float]:
+    """Parse a rate such as "10/minute" into (capacity, tokens refilled per second)."""
+    periods = {"second": 1, "minute": 60, "hour": 3600}
+    count, _, period = rate.partition("/")
+    seconds = periods[period.strip()] if period.strip() in periods else float(period)
+    capacity = int(count)
+    return capacity, capacity / seconds
+
+
+class MemoryBucketStore:
+    """Token buckets held in this process. Least recently used keys are evicted past `max_keys`."""
+
+    blocking = False
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, refill_rate: float, now: float) -> float:
+        """Take one token. Returns 0 when allowed, otherwise the seconds until a token is available."""
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            if tokens >= 1:
+                wait = 0.0
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / refill_rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+class SQLiteBucketStore:
+    """
+    Token buckets in a SQLite file, shared by every worker process on the host.
+    Each take runs in an immediate transaction so concurrent workers serialize on the bucket;
+    it can wait on the file lock, so callers run it in the thread pool. Rows idle for longer
+    than any bucket takes to refill hold nothing but a full bucket and are pruned now and then.
+    """
+
+    blocking = True
+    PRUNE_INTERVAL = 60
+
+    def __init__(self, path: str):
+        self.path = path
+        self._longest_refill = 0.0
+        self._next_prune = 0.0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, capacity: int, refill_rate: float, now: float) -> float:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated_at = row if row else (capacity, now)
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            if tokens >= 1:
+                wait = 0.0
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / refill_rate
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                (key, tokens, now),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._longest_refill = max(self._longest_refill, capacity / refill_rate)
+        if now >= self._next_prune:
+            self._next_prune = now + self.PRUNE_INTERVAL
+            self.prune(now - self._longest_refill)
+        return wait
+
+    def prune(self, idle_before: float) -> int:
+        """Delete buckets last used before `idle_before`; returns the number removed."""
+        return self._connect().execute("DELETE FROM buckets WHERE updated_at < ?", (idle_before,)).rowcount
+
+
+def _create_store():
+    if settings.RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteBucketStore(settings.RATE_LIMIT_SQLITE_PATH)
+    return MemoryBucketStore()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = _create_store()
+    return _store
+
+
+class RateLimiter:
+    """A named token-bucket limit, e.g. logins per IP, with a count of rejected requests."""
+
+    registry: Dict[str, "RateLimiter"] = {}
+
+    def __init__(self, name: str, rate: str):
+        self.name = name
+        self.rate = rate
+        self.capacity, self.refill_rate = parse_rate(rate)
+        self.allowed = 0
+        self.rejected = 0
+        RateLimiter.registry[name] = self
+
+    async def hit(self, key: str) -> None:
+        """Consume a token for `key` or raise a 429 with Retry-After."""
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        store = get_store()
+        args = (f"{self.name}:{key}", self.capacity, self.refill_rate, time.time())
+        wait = await run_in_threadpool(store.take, *args) if store.blocking else store.take(*args)
+        if wait <= 0:
+            self.allowed += 1
+            return
+        self.rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests. Please try again shortly.",
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
+
+
+def client_ip(request: Request) -> str:
+    """
+    The caller's IP behind RATE_LIMIT_PROXY_HOPS proxies. Each proxy appends the address
+    it saw to X-Forwarded-For, so the entry that many places from the right is the one
+    our own proxy recorded; anything to its left was sent by the client and can be forged.
+    """
+    hops = settings.RATE_LIMIT_PROXY_HOPS
+    if hops > 0:
+        forwarded = [entry.strip() for entry in request.headers.get("X-Forwarded-For", "").split(",") if entry.strip()]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit_stats() -> Dict[str, Dict]:
+    return {
+        name: {
+            "rate": limiter.rate,
+            "allowed": limiter.allowed,
+            "rejected": limiter.rejected,
+        }
+        for name, limiter in RateLimiter.registry.items()
+    }
+
+
+login_ip_limiter = RateLimiter("login_ip", settings.LOGIN_RATE_LIMIT_PER_IP)
+login_account_limiter = RateLimiter("login_account", settings.LOGIN_RATE_LIMIT_PER_ACCOUNT)
+vote_ip_limiter = RateLimiter("vote_ip", settings.VOTE_RATE_LIMIT_PER_IP)
+vote_account_limiter = RateLimiter("vote_account", settings.VOTE_RATE_LIMIT_PER_ACCOUNT)
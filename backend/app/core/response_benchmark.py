@@ -0,0 +1,194 @@
+"""
+Serialization benchmark for the big list routes.
+
+Each route already builds plain dicts and returns them as an ORJSONResponse,
+which goes out gzipped once it passes GZIP_MINIMUM_SIZE. This compares that path
+with FastAPI's default one (response_model validation where the route declares
+one, jsonable_encoder, then the stdlib json encoder) on payloads shaped like each
+route's response.
+
+Run `python -m app.core.response_benchmark [rows]` from the backend directory;
+rows (1,000 by default) is the number of students, candidates or result rows per
+payload. It prints the serialization CPU (and the gzip CPU on top of it) and the
+bytes on the wire, raw and gzipped, for each route.
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+import uuid
+from typing import Callable, Dict, List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+
+PROGRAMS = ["BSIT", "BSCS", "BSEMC"]
+ORGANIZATIONS = ["CCS Student Council", "ELITES", "SPECS", "IMAGES"]
+POSITIONS = ["PRESIDENT", "VICE PRESIDENT", "SECRETARY", "TREASURER", "AUDITOR", "P.R.O", "SENATOR"]
+
+
+def _name() -> str:
+    return f"{random.choice(['JUAN', 'MARIA', 'JOSE', 'ANA', 'PEDRO'])} {random.choice(['SANTOS', 'REYES', 'CRUZ', 'BAUTISTA'])}"
+
+
+def students_payload(rows: int) -> List[dict]:
+    students = []
+    for index in range(rows):
+        first_name, last_name = _name().split()
+        students.append({
+            "id": str(uuid.uuid4()),
+            "student_no": f"2024-{index:05d}",
+            "first_name": first_name,
+            "last_name": last_name,
+            "program": random.choice(PROGRAMS),
+            "year_level": str(random.randint(1, 4)),
+            "block": random.choice("ABCDE"),
+            "fullName": f"{first_name} {last_name}"
+        })
+    return students
+
+
+def candidates_payload(rows: int) -> List[dict]:
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": _name(),
+            "position": random.choice(POSITIONS),
+            "organization_id": str(uuid.uuid4()),
+            "photo_url": f"/uploads/candidates/{uuid.uuid4()}.jpg",
+            "created_at": "2026-03-01T08:00:00.000000+00:00",
+            "partylist_id": str(uuid.uuid4()),
+            "partylist": "PARTY " + random.choice("ABC"),
+            "group": random.choice(ORGANIZATIONS)
+        }
+        for _ in range(rows)
+    ]
+
+
+def archived_candidates_payload(rows: int) -> List[dict]:
+    payload = []
+    for _ in range(rows):
+        candidate_id = str(uuid.uuid4())
+        payload.append({
+            "archiveId": candidate_id,
+            "candidateId": candidate_id,
+            "name": _name(),
+            "group": random.choice(ORGANIZATIONS),
+            "position": random.choice(POSITIONS),
+            "partylist_id": str(uuid.uuid4()),
+            "partylist": "PARTY " + random.choice("ABC"),
+            "archivedYear": 2025,
+            "createdAt": "2025-03-01T08:00:00.000000+00:00",
+            "votes": random.randint(0, 5000),
+            "photoUrl": f"/uploads/candidates/{uuid.uuid4()}.jpg"
+        })
+    return payload
+
+
+def partylist_candidates_payload(rows: int) -> List[dict]:
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": _name(),
+            "position": random.choice(POSITIONS),
+            "partylist_id": str(uuid.uuid4()),
+            "partylist": {"name": "PARTY " + random.choice("ABC")}
+        }
+        for _ in range(rows)
+    ]
+
+
+def results_payload(rows: int) -> List[dict]:
+    per_organization = max(1, rows // len(ORGANIZATIONS))
+    return [
+        {
+            "organization_id": str(uuid.uuid4()),
+            "organization_name": name,
+            "election_status": "ongoing",
+            "remaining_time": 3600.0,
+            "positions": [
+                {
+                    "name": position,
+                    "candidates": [
+                        {"name": _name(), "vote_count": random.randint(0, 5000)}
+                        for _ in range(max(1, per_organization // len(POSITIONS)))
+                    ]
+                }
+                for position in POSITIONS
+            ]
+        }
+        for name in ORGANIZATIONS
+    ]
+
+
+def _default_encoder(response_model=None) -> Callable[[object], bytes]:
+    """FastAPI's path without a response class: validate, jsonable_encoder, JSONResponse.render."""
+    adapter = TypeAdapter(response_model) if response_model is not None else None
+
+    def encode(payload) -> bytes:
+        if adapter is not None:
+            content = adapter.dump_python(adapter.validate_python(payload), mode="json")
+        else:
+            content = jsonable_encoder(payload)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+    return encode
+
+
+def _student_response_model():
+    from app.api.endpoints.students import StudentResponse
+    return List[StudentResponse]
+
+
+# Route, payload builder and the response_model the route declares (if any)
+ROUTES = [
+    ("GET /students", students_payload, _student_response_model),
+    ("GET /candidates/", candidates_payload, None),
+    ("GET /archives/candidates", archived_candidates_payload, None),
+    ("GET /partylists/candidates", partylist_candidates_payload, lambda: List[Dict]),
+    ("GET /elections/results", results_payload, None),
+]
+
+
+def _best_ms(func, payload, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(payload)
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _wire_bytes(body: bytes) -> int:
+    """Bytes sent to a client that accepts gzip, as GZipMiddleware would send them."""
+    if len(body) < settings.GZIP_MINIMUM_SIZE:
+        return len(body)
+    return len(gzip.compress(body, compresslevel=settings.GZIP_COMPRESS_LEVEL))
+
+
+def benchmark(rows: int = 1000, repeat: int = 5) -> None:
+    print(f"{'route':<28} {'default ms':>10} {'orjson ms':>10} {'speedup':>8} {'gzip ms':>8} {'raw bytes':>10} {'gzip bytes':>11}")
+    for route, build, response_model in ROUTES:
+        payload = build(rows)
+        default_encode = _default_encoder(response_model() if response_model else None)
+        default_ms = _best_ms(default_encode, payload, repeat)
+        orjson_ms = _best_ms(orjson.dumps, payload, repeat)
+        body = orjson.dumps(payload)
+        gzip_ms = _best_ms(_wire_bytes, body, repeat)
+        print(
+            f"{route:<28} {default_ms:>10.2f} {orjson_ms:>10.2f} {default_ms / orjson_ms:>7.1f}x {gzip_ms:>8.2f} "
+            f"{len(body):>10} {_wire_bytes(body):>11}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark serialization of the big list routes")
+    parser.add_argument("rows", nargs="?", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    benchmark(args.rows, args.repeat)
@@ -1,36 +1,18 @@
 from datetime import datetime, timedelta
 from typing import Any, Union, Optional
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from app.core.config import settings
+from app.core import passwords
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
-# For temporary direct password comparison
-def simple_verify(plain_password, hashed_password):
-    """Temporary function for direct password comparison"""
-    print(f"Comparing: '{plain_password}' with '{hashed_password}'")
-    return plain_password == hashed_password
-
-# Regular bcrypt verification
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash"""
-    # TEMPORARY: For testing with plaintext passwords
-    if not hashed_password.startswith('$2'):
-        return simple_verify(plain_password, hashed_password)
-    
-    # Normal bcrypt verification
-    try:
-        return pwd_context.verify(plain_password, hashed_password)
-    except Exception as e:
-        print(f"Password verification error: {e}")
-        return False
+    """Verify a password against a stored hash (legacy rows may still hold plaintext)."""
+    return passwords.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    """Generate a bcrypt hash for the password."""
-    return pwd_context.hash(password)
+    """Hash a password with the current (calibrated) policy."""
+    return passwords.hash_password(password)
 
 def create_access_token(
     subject: Union[str, Any], user_type: str, expires_delta: Optional[timedelta] = None
@@ -64,4 +46,13 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
             raise credentials_exception
         return payload  # or fetch user from DB if needed
     except JWTError:
-        raise credentials_exception
\ No newline at end of file
+        raise credentials_exception
+
+def require_admin(payload: dict = Depends(get_current_user)):
+    """Dependency that only lets administrator tokens through."""
+    if payload.get("type") != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator access required",
+        )
+    return payload
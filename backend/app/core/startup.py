@@ -0,0 +1,124 @@
+"""
+Process start-up: directory setup, cache warm-up, readiness checks and the
+import-time budget.
+
+Run `python -m app.core.startup` from the backend directory to print an
+import-time profile of `app.main` and fail when it exceeds the budget;
+tests/test_startup.py holds the same budget in the test suite.
+"""
+import re
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.logging import logger
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent
+UPLOADS_DIR = BACKEND_DIR / "uploads"
+
+
+def prepare_directories() -> None:
+    """Create the upload directories served by the app (kept out of module import)."""
+    (UPLOADS_DIR / "candidates").mkdir(parents=True, exist_ok=True)
+
+
+# Outcome of the last warm-up; readiness fails until one has succeeded
+_warm_state = {"warm": False, "ballots": 0, "duration_ms": None, "error": None}
+_warm_lock = threading.Lock()
+
+
+def warm_up() -> bool:
+    """
+    Open the Supabase connection, compile the ballots of ongoing elections and load
+    their eligible voters so the first voter after an idle spin-down does not pay for them.
+    """
+    from app.db.database import supabase
+    from app.services import ballot_validation, ballots, eligibility
+
+    started = time.perf_counter()
+    try:
+        ongoing_resp = supabase.table("elections")\
+            .select("id")\
+            .eq("status", "ongoing")\
+            .execute()
+        for election in ongoing_resp.data or []:
+            ballots.compile_ballot(election["id"])
+            eligibility.eligible_voters(election["id"])
+            ballot_validation.get_validator(election["id"])
+        duration_ms = (time.perf_counter() - started) * 1000
+        _warm_state.update(warm=True, ballots=len(ongoing_resp.data or []), duration_ms=round(duration_ms), error=None)
+        logger.info(f"Warm-up compiled {len(ongoing_resp.data or [])} ballots in {duration_ms:.0f} ms")
+        return True
+    except Exception as e:
+        _warm_state.update(error=str(e))
+        logger.error(f"Warm-up failed (continuing cold): {e}")
+        return False
+
+
+def ensure_warm() -> dict:
+    """Retry a failed warm-up (one caller at a time) and return the warm-up state."""
+    if not _warm_state["warm"] and _warm_lock.acquire(blocking=False):
+        try:
+            warm_up()
+        finally:
+            _warm_lock.release()
+    return dict(_warm_state)
+
+
+def probe_database() -> dict:
+    """Time a trivial query; it fails when slower than READINESS_DB_LATENCY_MS."""
+    from app.db.database import supabase
+    from app.db.http_pool import db_timeout
+
+    threshold_ms = settings.READINESS_DB_LATENCY_MS
+    started = time.perf_counter()
+    try:
+        with db_timeout(threshold_ms / 1000):
+            supabase.table("organizations").select("id").limit(1).execute()
+    except Exception as e:
+        latency_ms = (time.perf_counter() - started) * 1000
+        return {"ok": False, "latency_ms": round(latency_ms, 1), "threshold_ms": threshold_ms, "error": str(e)}
+    latency_ms = (time.perf_counter() - started) * 1000
+    return {"ok": latency_ms <= threshold_ms, "latency_ms": round(latency_ms, 1), "threshold_ms": threshold_ms}
+
+
+def check_import_budget(import_seconds: float) -> None:
+    import_ms = import_seconds * 1000
+    if import_ms > settings.IMPORT_TIME_BUDGET_MS:
+        logger.warning(f"Importing app.main took {import_ms:.0f} ms (budget {settings.IMPORT_TIME_BUDGET_MS} ms)")
+    else:
+        logger.info(f"Importing app.main took {import_ms:.0f} ms")
+
+
+def profile_imports(top: int = 15) -> int:
+    """Import app.main in a fresh interpreter with -X importtime and report the slowest modules."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        return result.returncode
+
+    # Lines look like: "import time:   self [us] |  cumulative | imported package"
+    rows = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)", line)
+        if match:
+            rows.append((int(match.group(2)), int(match.group(1)), match.group(3)))
+
+    total_ms = sum(self_us for _, self_us, _ in rows) / 1000
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, module in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {module}")
+    print(f"\nTotal import time: {total_ms:.0f} ms (budget {settings.IMPORT_TIME_BUDGET_MS} ms)")
+    return 0 if total_ms <= settings.IMPORT_TIME_BUDGET_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(profile_imports())
@@ -1,10 +1,34 @@
-import os
-from supabase import create_client
-from dotenv import load_dotenv
+import threading
+from app.core.config import settings
 
-load_dotenv()
+_client = None
+_transport = None
+_client_lock = threading.Lock()
 
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_KEY")
+def get_supabase():
+    """Create the Supabase client on first use, so importing the app stays cheap."""
+    global _client, _transport
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from supabase import create_client
+                from app.db.http_pool import install_pool
+                client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+                # Every request goes through one explicitly configured keep-alive pool
+                _transport = install_pool(client)
+                _client = client
+    return _client
 
-supabase = create_client(supabase_url, supabase_key)
\ No newline at end of file
+def pool_stats() -> dict:
+    """Connection pool metrics of the shared Supabase HTTP client."""
+    if _transport is None:
+        return {"open": 0, "in_use": 0, "idle": 0, "waiting": 0, "requests": 0, "new_connections": 0}
+    return _transport.stats()
+
+class _LazySupabase:
+    """Stands in for the Supabase client and forwards to it once it exists."""
+
+    def __getattr__(self, name):
+        return getattr(get_supabase(), name)
+
+supabase = _LazySupabase()
@@ -0,0 +1,152 @@
+"""
+The pooled HTTP client behind every Supabase (PostgREST) call.
+
+Run `python -m app.db.http_pool 1,5,20` from the backend directory to compare
+query throughput at different pool sizes against the configured project.
+"""
+import contextvars
+import sys
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+from app.db import query_count
+
+# Per-call timeout override in seconds, see db_timeout()
+_call_timeout: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("db_call_timeout", default=None)
+
+
+@contextmanager
+def db_timeout(seconds: float):
+    """Apply a different timeout to the Supabase calls made inside the block."""
+    token = _call_timeout.set(seconds)
+    try:
+        yield
+    finally:
+        _call_timeout.reset(token)
+
+
+class PooledTransport(httpx.HTTPTransport):
+    """HTTP transport that applies per-call timeouts and counts pool usage."""
+
+    def __init__(self, pool_size: int, keepalive: int, keepalive_expiry: float, http2: bool):
+        super().__init__(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=keepalive,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+        self.pool_size = pool_size
+        self.keepalive = keepalive
+        self.http2 = http2
+        self._lock = threading.Lock()
+        self._known_connections = weakref.WeakSet()
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.new_connections = 0
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        timeout = _call_timeout.get()
+        if timeout is not None:
+            request.extensions["timeout"] = httpx.Timeout(timeout).as_dict()
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.perf_counter()
+        try:
+            return super().handle_request(request)
+        finally:
+            query_count.record(time.perf_counter() - started)
+            with self._lock:
+                self.in_flight -= 1
+                for connection in self._pool.connections:
+                    if connection not in self._known_connections:
+                        self._known_connections.add(connection)
+                        self.new_connections += 1
+
+    def stats(self) -> dict:
+        connections = list(self._pool.connections)
+        idle = sum(1 for connection in connections if connection.is_idle())
+        # httpcore keeps queued requests without a connection assigned in _requests
+        waiting = sum(1 for queued in getattr(self._pool, "_requests", []) if getattr(queued, "connection", None) is None)
+        return {
+            "pool_size": self.pool_size,
+            "max_keepalive": self.keepalive,
+            "http2": self.http2,
+            "open": len(connections),
+            "in_use": len(connections) - idle,
+            "idle": idle,
+            "waiting": waiting,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+        }
+
+
+def create_session(base_url, headers, pool_size: Optional[int] = None) -> httpx.Client:
+    transport = PooledTransport(
+        pool_size=pool_size or settings.SUPABASE_POOL_SIZE,
+        keepalive=min(settings.SUPABASE_POOL_KEEPALIVE, pool_size or settings.SUPABASE_POOL_SIZE),
+        keepalive_expiry=settings.SUPABASE_KEEPALIVE_EXPIRY,
+        http2=settings.SUPABASE_HTTP2,
+    )
+    return httpx.Client(
+        base_url=base_url,
+        headers=headers,
+        timeout=httpx.Timeout(settings.SUPABASE_TIMEOUT, connect=settings.SUPABASE_CONNECT_TIMEOUT),
+        transport=transport,
+        follow_redirects=True,
+    )
+
+
+def install_pool(client, pool_size: Optional[int] = None) -> PooledTransport:
+    """Replace the PostgREST session of a Supabase client with a pooled one."""
+    postgrest = client.postgrest
+    previous = postgrest.session
+    postgrest.session = create_session(previous.base_url, previous.headers, pool_size)
+    previous.close()
+    return postgrest.session._transport
+
+
+def benchmark(pool_sizes, requests: int = 200, concurrency: int = 20) -> None:
+    """Issue the same small query at fixed concurrency for each pool size and print throughput."""
+    from supabase import create_client
+
+    print(f"{'pool':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'new conns':>10}")
+    for pool_size in pool_sizes:
+        client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+        transport = install_pool(client, pool_size)
+        latencies = []
+
+        def one_call(_):
+            started = time.perf_counter()
+            client.table("organizations").select("id").limit(1).execute()
+            latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(one_call, range(requests)))
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        print(
+            f"{pool_size:>5} {requests / elapsed:>8.1f} "
+            f"{latencies[len(latencies) // 2] * 1000:>8.1f} {latencies[int(len(latencies) * 0.95)] * 1000:>8.1f} "
+            f"{transport.stats()['new_connections']:>10}"
+        )
+        client.postgrest.session.close()
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in (sys.argv[1] if len(sys.argv) > 1 else "1,5,20").split(",")]
+    benchmark(sizes)
@@ -0,0 +1,133 @@
+import base64
+import json
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+# Largest page any listing route will return
+MAX_PAGE_SIZE = 200
+DEFAULT_PAGE_SIZE = 100
+
+# Rows per request when scanning a whole result set (PostgREST caps responses at 1000)
+SCAN_CHUNK_SIZE = 1000
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor."""
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, length: Optional[int] = None) -> List:
+    """Decode a cursor into its sort key values; a malformed cursor (or one of another length) is a 400."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list):
+            raise ValueError("cursor must encode a list")
+        if length is not None and len(values) != length:
+            raise ValueError(f"cursor must hold {length} values")
+        return values
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _quote(value) -> str:
+    """Quote a value for a PostgREST logic filter so commas and parentheses are literal."""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def apply_keyset(query, sort_column: str, cursor: Optional[str], tiebreak_column: str = "id"):
+    """Order by (sort_column, tiebreak_column) and start after the row the cursor points at."""
+    if cursor:
+        last_sort, last_tiebreak = decode_cursor(cursor, length=2)
+        query = query.or_(
+            f"{sort_column}.gt.{_quote(last_sort)},"
+            f"and({sort_column}.eq.{_quote(last_sort)},{tiebreak_column}.gt.{_quote(last_tiebreak)})"
+        )
+    return query.order(sort_column).order(tiebreak_column)
+
+
+def parse_fields(fields: Optional[str], allowed: Dict[str, str], default: Sequence[str]) -> List[str]:
+    """Validate a sparse fieldset such as "id,name,position" against the fields a route offers."""
+    if not fields:
+        return list(default)
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}"
+        )
+    return requested
+
+
+def select_for_fields(fields: Sequence[str], allowed: Dict[str, str], required: Sequence[str]) -> str:
+    """Build the select clause for the requested fields plus the columns the cursor needs."""
+    columns = []
+    for field in list(required) + list(fields):
+        column = allowed.get(field, field)
+        if column not in columns:
+            columns.append(column)
+    return ", ".join(columns)
+
+
+def _chunk_query(query_factory: Callable, key: str, last_row: Optional[dict], chunk_size: int, tiebreak: Optional[str]):
+    # Builders are mutated by filters, so every chunk starts from a fresh query
+    query = query_factory()
+    if last_row is not None:
+        if tiebreak:
+            query = query.or_(
+                f"{key}.gt.{_quote(last_row[key])},"
+                f"and({key}.eq.{_quote(last_row[key])},{tiebreak}.gt.{_quote(last_row[tiebreak])})"
+            )
+        else:
+            query = query.gt(key, last_row[key])
+    query = query.order(key)
+    if tiebreak:
+        query = query.order(tiebreak)
+    return query.limit(chunk_size)
+
+
+async def scan_chunks(
+    query_factory: Callable,
+    key: str = "id",
+    chunk_size: int = SCAN_CHUNK_SIZE,
+    tiebreak: Optional[str] = None
+) -> AsyncIterator[List[dict]]:
+    """
+    Yield every row of a query in chunks ordered by a unique column (or by `key` then
+    `tiebreak` when only the pair is unique), so results are complete past the
+    PostgREST row cap and memory is bounded by the chunk size.
+    query_factory returns a new filtered query, e.g.
+    lambda: supabase.table("votes").select("id, candidate_id").eq("election_id", election_id).
+    Each chunk is fetched in the thread pool so the event loop keeps serving requests.
+    """
+    last_row = None
+    while True:
+        chunk_resp = await run_in_threadpool(_chunk_query(query_factory, key, last_row, chunk_size, tiebreak).execute)
+        rows = chunk_resp.data or []
+        if rows:
+            yield rows
+        if len(rows) < chunk_size:
+            return
+        last_row = rows[-1]
+
+
+def scan_chunks_sync(
+    query_factory: Callable,
+    key: str = "id",
+    chunk_size: int = SCAN_CHUNK_SIZE,
+    tiebreak: Optional[str] = None
+) -> Iterator[List[dict]]:
+    """scan_chunks() for code that already runs outside the event loop."""
+    last_row = None
+    while True:
+        rows = _chunk_query(query_factory, key, last_row, chunk_size, tiebreak).execute().data or []
+        if rows:
+            yield rows
+        if len(rows) < chunk_size:
+            return
+        last_row = rows[-1]
@@ -0,0 +1,178 @@
+"""
+Database calls per request, enabled with QUERY_COUNT_ENABLED=true. Every
+Supabase call made while serving a request is counted (and timed) against that
+request; responses carry X-DB-Calls and X-DB-Time-Ms, and per-route statistics
+are served by GET /metrics/queries. A request over its call budget is logged,
+which is how a new per-row query in a loop shows up.
+
+With counting enabled, save two snapshots of /metrics/queries (before and after
+a change, same seeded data) and run `python -m app.db.query_count before.json
+after.json` from the backend directory: it exits non-zero when a route makes
+more calls than before or than its budget.
+
+`python -m pytest tests` (its conftest enables counting) runs the read routes
+against an in-memory database at several data sizes and fails when a route's
+calls exceed its budget or grow with the data (see tests/test_query_counts.py);
+QUERY_SNAPSHOT=path saves the run's snapshot in the same format.
+"""
+import contextvars
+import json
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+
+
+class QueryCounter:
+    """Calls and time spent in the database for one request, across its threadpool hops."""
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.seconds += seconds
+
+
+# run_in_threadpool copies the context, so calls made on worker threads land here too
+_current: contextvars.ContextVar[Optional[QueryCounter]] = contextvars.ContextVar("query_counter", default=None)
+
+
+def record(seconds: float) -> None:
+    counter = _current.get()
+    if counter is not None:
+        counter.add(seconds)
+
+
+def start_counting() -> Tuple[contextvars.Token, QueryCounter]:
+    counter = QueryCounter()
+    return _current.set(counter), counter
+
+
+def stop_counting(token: contextvars.Token) -> None:
+    _current.reset(token)
+
+
+def parse_budgets(value: str) -> Dict[str, int]:
+    """Parse "GET /api/v1/elections/results=40,GET /api/v1/students=5" into a dict."""
+    budgets = {}
+    for item in value.split(","):
+        route, _, limit = item.rpartition("=")
+        if route.strip() and limit.strip().isdigit():
+            budgets[route.strip()] = int(limit)
+    return budgets
+
+
+_budgets = parse_budgets(settings.QUERY_BUDGETS)
+
+
+def budget_for(route: str) -> int:
+    return _budgets.get(route, settings.QUERY_BUDGET_DEFAULT)
+
+
+class _RouteStats:
+    __slots__ = ("requests", "calls_total", "calls_max", "db_seconds_total", "seconds_total", "over_budget")
+
+    def __init__(self):
+        self.requests = 0
+        self.calls_total = 0
+        self.calls_max = 0
+        self.db_seconds_total = 0.0
+        self.seconds_total = 0.0
+        self.over_budget = 0
+
+
+_routes: Dict[str, _RouteStats] = {}
+_routes_lock = threading.Lock()
+
+
+def observe(route: str, counter: QueryCounter, seconds: float) -> bool:
+    """Add a finished request to the route statistics; False when it was over budget."""
+    within_budget = counter.calls <= budget_for(route)
+    with _routes_lock:
+        stats = _routes.get(route)
+        if stats is None:
+            stats = _routes[route] = _RouteStats()
+        stats.requests += 1
+        stats.calls_total += counter.calls
+        stats.calls_max = max(stats.calls_max, counter.calls)
+        stats.db_seconds_total += counter.seconds
+        stats.seconds_total += seconds
+        if not within_budget:
+            stats.over_budget += 1
+    return within_budget
+
+
+def snapshot() -> Dict[str, dict]:
+    """Per-route call counts and mean timings, for this worker."""
+    with _routes_lock:
+        return {
+            route: {
+                "requests": stats.requests,
+                "calls_mean": round(stats.calls_total / stats.requests, 2),
+                "calls_max": stats.calls_max,
+                "budget": budget_for(route),
+                "over_budget": stats.over_budget,
+                "db_ms_mean": round(stats.db_seconds_total * 1000 / stats.requests, 1),
+                "ms_mean": round(stats.seconds_total * 1000 / stats.requests, 1),
+            }
+            for route, stats in sorted(_routes.items())
+        }
+
+
+def install(app) -> None:
+    """Count the database calls of every request and report them in response headers."""
+    from fastapi import Request
+
+    from app.core.logging import logger
+
+    @app.middleware("http")
+    async def count_database_calls(request: Request, call_next):
+        token, counter = start_counting()
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            stop_counting(token)
+        seconds = time.perf_counter() - started
+
+        route = request.scope.get("route")
+        route_name = f"{request.method} {route.path if route is not None else request.url.path}"
+        if not observe(route_name, counter, seconds):
+            logger.warning(f"{route_name} made {counter.calls} database calls (budget {budget_for(route_name)})")
+        response.headers["X-DB-Calls"] = str(counter.calls)
+        response.headers["X-DB-Time-Ms"] = f"{counter.seconds * 1000:.1f}"
+        return response
+
+
+def compare(before: Dict[str, dict], after: Dict[str, dict], time_tolerance: float = 0.5) -> int:
+    """Print the routes whose call counts grew or broke their budget; returns the number of failures."""
+    failures = 0
+    for route, now in sorted(after.items()):
+        previous = before.get(route)
+        problems = []
+        if now["calls_max"] > now["budget"]:
+            problems.append(f"{now['calls_max']} calls over budget {now['budget']}")
+        if previous is not None and now["calls_max"] > previous["calls_max"]:
+            problems.append(f"calls {previous['calls_max']} -> {now['calls_max']}")
+        if previous is not None and previous["db_ms_mean"] and now["db_ms_mean"] > previous["db_ms_mean"] * (1 + time_tolerance):
+            # Timings are noisy, so they are reported but do not fail the comparison
+            print(f"  slower  {route}: db {previous['db_ms_mean']} -> {now['db_ms_mean']} ms")
+        if problems:
+            failures += 1
+            print(f"  FAIL    {route}: {'; '.join(problems)}")
+    print(f"{len(after)} routes compared, {failures} failed")
+    return failures
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python -m app.db.query_count before.json after.json")
+        sys.exit(2)
+    with open(sys.argv[1]) as before_file, open(sys.argv[2]) as after_file:
+        sys.exit(1 if compare(json.load(before_file), json.load(after_file)) else 0)
@@ -1,11 +1,37 @@
+import time
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
 from app.api.router import api_router
+from app.api.endpoints import health
+from app.core.bus import bus
+from app.core import passwords, startup
+from app.services import jobs, refresh_tokens
 from pathlib import Path
 
-app = FastAPI(title="EasyVote API")
+app = FastAPI(title="EasyVote API", default_response_class=ORJSONResponse)
+
+# Compress large responses for clients that send Accept-Encoding: gzip
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.GZIP_MINIMUM_SIZE,
+    compresslevel=settings.GZIP_COMPRESS_LEVEL,
+)
+
+# Database calls per request, reported in X-DB-Calls and /metrics/queries
+if settings.QUERY_COUNT_ENABLED:
+    from app.db import query_count
+    query_count.install(app)
+
+# Per-request sampling profiler, only present when switched on
+if settings.PROFILING_ENABLED:
+    from app.core import profiling
+    profiling.install(app)
 
 # IMPORTANT: Update CORS to allow your Vercel frontend
 app.add_middleware(
@@ -20,19 +46,41 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Profile-File", "X-DB-Calls", "X-DB-Time-Ms"],
 )
 
 # Set up paths
 BASE_DIR = Path(__file__).resolve().parent.parent
 UPLOADS_DIR = BASE_DIR / "uploads"
-UPLOADS_DIR.mkdir(exist_ok=True)
 
-# Mount the uploads directory
-app.mount("/uploads", StaticFiles(directory=str(UPLOADS_DIR)), name="uploads")
+# Mount the uploads directory (created on startup rather than at import)
+app.mount("/uploads", StaticFiles(directory=str(UPLOADS_DIR), check_dir=False), name="uploads")
 
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
+# Liveness and readiness probes for the hosting platform, outside the versioned API
+app.include_router(health.router, prefix="/health", tags=["health"])
+
+IMPORT_SECONDS = time.perf_counter() - _import_started
+
+@app.on_event("startup")
+async def on_startup():
+    startup.check_import_budget(IMPORT_SECONDS)
+    startup.prepare_directories()
+    bus.start()
+    jobs.recover_interrupted()
+    refresh_tokens.purge_expired()
+    # Pick the password work factor for this host before the first login
+    passwords.calibrate()
+    # Uvicorn only accepts traffic after startup completes, so caches are warm before the first request
+    startup.warm_up()
+
+@app.on_event("shutdown")
+async def stop_background_work():
+    bus.stop()
+    jobs.shutdown()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to EasyVote API"}
@@ -12,6 +12,18 @@ class Token(BaseModel):
     full_name: str
     student_no: Optional[str] = None
     username: Optional[str] = None
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class RefreshedToken(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str
+    user_type: str
+    expires_in: int
 
 class TokenData(BaseModel):
     id: Optional[UUID] = None
@@ -0,0 +1,334 @@
+"""
+Demographic crosstabs of election results (program, year level, block against
+candidate or position), counted with numpy over columnar arrays that are loaded
+once per election and extended as ballots arrive.
+
+Run `python -m app.services.analytics 50000` from the backend directory to time
+crosstabs on synthetic ballots.
+"""
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Set
+
+from app.core.bus import bus
+from app.core.cache import TTLCache
+from app.db.database import supabase
+from app.db.pagination import scan_chunks_sync
+
+# Dimensions a crosstab can group by; the first three describe the voter
+VOTER_DIMENSIONS = ("program", "year_level", "block")
+CANDIDATE_DIMENSIONS = ("candidate", "position")
+DIMENSIONS = VOTER_DIMENSIONS + CANDIDATE_DIMENSIONS
+
+# Above this many new voters a full reload is cheaper than fetching them by id
+MAX_INCREMENTAL_VOTERS = 500
+# Student ids per in.(...) filter when fetching new voters
+VOTER_BATCH = 100
+
+
+class Categories:
+    """Maps labels to dense integer codes in first-seen order."""
+
+    def __init__(self):
+        self.labels: List = []
+        self._codes: Dict = {}
+
+    def code(self, label) -> int:
+        code = self._codes.get(label)
+        if code is None:
+            code = len(self.labels)
+            self._codes[label] = code
+            self.labels.append(label)
+        return code
+
+    def __contains__(self, label) -> bool:
+        return label in self._codes
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+
+class ElectionColumns:
+    """
+    Votes of one election as columnar arrays: each vote has a voter code and a
+    candidate code, and voters and candidates carry categorical attribute codes.
+    """
+
+    def __init__(self):
+        import numpy as np
+
+        self.voters = Categories()
+        self.candidates = Categories()
+        self.categories = {dimension: Categories() for dimension in DIMENSIONS if dimension != "candidate"}
+        self.candidate_names: List[str] = []
+        self.vote_voter = np.zeros(0, dtype=np.int32)
+        self.vote_candidate = np.zeros(0, dtype=np.int32)
+        self.voter_attributes = {dimension: np.zeros(0, dtype=np.int32) for dimension in VOTER_DIMENSIONS}
+        self.candidate_position = np.zeros(0, dtype=np.int32)
+
+    @property
+    def ballots(self) -> int:
+        return len(self.voters)
+
+    @property
+    def votes(self) -> int:
+        return len(self.vote_voter)
+
+    def add_votes(self, votes: Sequence[dict], students: Dict[str, dict], candidates: Dict[str, dict]) -> None:
+        """Append votes ({"student_id", "candidate_id"}) with the attributes of their voters and candidates."""
+        import numpy as np
+
+        new_voter_attributes = {dimension: [] for dimension in VOTER_DIMENSIONS}
+        new_candidate_positions = []
+        vote_voter = np.empty(len(votes), dtype=np.int32)
+        vote_candidate = np.empty(len(votes), dtype=np.int32)
+        for index, vote in enumerate(votes):
+            voters_before = len(self.voters)
+            voter = self.voters.code(vote["student_id"])
+            if voter == voters_before:
+                student = students.get(vote["student_id"]) or {}
+                for dimension in VOTER_DIMENSIONS:
+                    new_voter_attributes[dimension].append(
+                        self.categories[dimension].code(student.get(dimension) or "UNKNOWN")
+                    )
+            candidates_before = len(self.candidates)
+            candidate = self.candidates.code(vote["candidate_id"])
+            if candidate == candidates_before:
+                details = candidates.get(vote["candidate_id"]) or {}
+                self.candidate_names.append(details.get("name") or "Unknown")
+                new_candidate_positions.append(self.categories["position"].code(details.get("position") or "Unknown"))
+            vote_voter[index] = voter
+            vote_candidate[index] = candidate
+
+        self.vote_voter = np.concatenate([self.vote_voter, vote_voter])
+        self.vote_candidate = np.concatenate([self.vote_candidate, vote_candidate])
+        for dimension in VOTER_DIMENSIONS:
+            self.voter_attributes[dimension] = np.concatenate([
+                self.voter_attributes[dimension],
+                np.asarray(new_voter_attributes[dimension], dtype=np.int32)
+            ])
+        self.candidate_position = np.concatenate([
+            self.candidate_position,
+            np.asarray(new_candidate_positions, dtype=np.int32)
+        ])
+
+    def crosstab(self, dimensions: Sequence[str]) -> dict:
+        """
+        Count votes (when grouping by candidate or position) or ballots (voter
+        dimensions only) for every combination of the given dimensions.
+        """
+        import numpy as np
+
+        per_vote = any(dimension in CANDIDATE_DIMENSIONS for dimension in dimensions)
+        columns = []
+        labels = []
+        for dimension in dimensions:
+            if dimension == "candidate":
+                columns.append(self.vote_candidate)
+                labels.append(self.candidate_names)
+            elif dimension == "position":
+                columns.append(self.candidate_position[self.vote_candidate])
+                labels.append(self.categories["position"].labels)
+            elif per_vote:
+                columns.append(self.voter_attributes[dimension][self.vote_voter])
+                labels.append(self.categories[dimension].labels)
+            else:
+                columns.append(self.voter_attributes[dimension])
+                labels.append(self.categories[dimension].labels)
+
+        sizes = [max(len(dimension_labels), 1) for dimension_labels in labels]
+        count = self.votes if per_vote else self.ballots
+        combined = np.zeros(count, dtype=np.int64)
+        for column, size in zip(columns, sizes):
+            combined = combined * size + column
+        counts = np.bincount(combined, minlength=int(np.prod(sizes)))
+
+        cells = np.nonzero(counts)[0]
+        indexes = np.unravel_index(cells, sizes)
+        rows = []
+        for position, cell in enumerate(cells.tolist()):
+            row = {dimension: labels[axis][int(indexes[axis][position])] for axis, dimension in enumerate(dimensions)}
+            if "candidate" in dimensions:
+                row["candidate_id"] = self.candidates.labels[int(indexes[dimensions.index("candidate")][position])]
+            row["count"] = int(counts[cell])
+            rows.append(row)
+        rows.sort(key=lambda row: -row["count"])
+        return {
+            "dimensions": list(dimensions),
+            "measure": "votes" if per_vote else "ballots",
+            "total": count,
+            "rows": rows
+        }
+
+
+def _load_students(student_ids: Optional[Set[str]] = None) -> Dict[str, dict]:
+    columns = "id, program, year_level, block"
+    students = {}
+    if student_ids is None:
+        for chunk in scan_chunks_sync(lambda: supabase.table("students").select(columns)):
+            students.update((student["id"], student) for student in chunk)
+        return students
+    ids = list(student_ids)
+    for start in range(0, len(ids), VOTER_BATCH):
+        batch = ids[start:start + VOTER_BATCH]
+        students_resp = supabase.table("students").select(columns).in_("id", batch).execute()
+        students.update((student["id"], student) for student in students_resp.data or [])
+    return students
+
+
+def _load_candidates(candidate_ids: Set[str]) -> Dict[str, dict]:
+    candidates = {}
+    ids = list(candidate_ids)
+    for start in range(0, len(ids), VOTER_BATCH):
+        candidates_resp = supabase.table("candidates")\
+            .select("id, name, position")\
+            .in_("id", ids[start:start + VOTER_BATCH])\
+            .execute()
+        candidates.update((candidate["id"], candidate) for candidate in candidates_resp.data or [])
+    return candidates
+
+
+def _build(election_id: str, student_ids: Optional[Set[str]] = None, columns: Optional[ElectionColumns] = None) -> ElectionColumns:
+    """Load the votes of an election, or only those of the given voters, into columns chunk by chunk."""
+    columns = columns or ElectionColumns()
+    students = _load_students(student_ids)
+    candidates: Dict[str, dict] = {}
+    if student_ids is None:
+        batches = [None]
+    else:
+        ids = list(student_ids)
+        batches = [ids[start:start + VOTER_BATCH] for start in range(0, len(ids), VOTER_BATCH)]
+
+    for batch in batches:
+        def votes_query():
+            query = supabase.table("votes").select("id, candidate_id, student_id").eq("election_id", election_id)
+            return query.in_("student_id", batch) if batch is not None else query
+
+        for chunk in scan_chunks_sync(votes_query):
+            unseen = {
+                vote["candidate_id"] for vote in chunk
+                if vote["candidate_id"] not in columns.candidates and vote["candidate_id"] not in candidates
+            }
+            if unseen:
+                candidates.update(_load_candidates(unseen))
+            columns.add_votes(chunk, students, candidates)
+    return columns
+
+
+class _ElectionState:
+    def __init__(self):
+        self.columns: Optional[ElectionColumns] = None
+        # Voters whose ballots arrived since the columns were last extended
+        self.pending: Set[str] = set()
+        self.lock = threading.Lock()
+
+
+_elections: Dict[str, _ElectionState] = {}
+_elections_lock = threading.Lock()
+# Finished crosstabs by (election_id, dimensions); cleared for an election when votes arrive
+_crosstabs = TTLCache(maxsize=512, ttl=60 * 60)
+
+
+def _state(election_id: str) -> _ElectionState:
+    with _elections_lock:
+        state = _elections.get(election_id)
+        if state is None:
+            state = _elections[election_id] = _ElectionState()
+        return state
+
+
+def election_columns(election_id: str) -> ElectionColumns:
+    """The columns of an election, loaded on first use and extended with new ballots."""
+    state = _state(election_id)
+    with state.lock:
+        pending, state.pending = state.pending, set()
+        if state.columns is None or len(pending) > MAX_INCREMENTAL_VOTERS:
+            state.columns = _build(election_id)
+        elif pending:
+            # Ballots are written whole, so a voter's votes are all new or all present
+            known = {voter for voter in pending if voter in state.columns.voters}
+            new_voters = pending - known
+            if new_voters:
+                _build(election_id, new_voters, state.columns)
+        return state.columns
+
+
+def crosstab(election_id: str, dimensions: Sequence[str]) -> dict:
+    key = (election_id, tuple(dimensions))
+    cached = _crosstabs.get(key)
+    if cached is not None:
+        return cached
+    columns = election_columns(election_id)
+    result = {"election_id": election_id, "ballots": columns.ballots, **columns.crosstab(dimensions)}
+    # Ballots that arrived while counting make this result stale already
+    if not _state(election_id).pending:
+        _crosstabs.set(key, result)
+    return result
+
+
+def _drop_crosstabs(election_id: Optional[str]) -> None:
+    if election_id is None:
+        _crosstabs.clear()
+        return
+    _crosstabs.invalidate_where(lambda key: key[0] == election_id)
+
+
+def _on_votes(message: dict) -> None:
+    if message.get("reset"):
+        # Ballots may have been missed while disconnected: reload everything
+        with _elections_lock:
+            _elections.clear()
+        _drop_crosstabs(None)
+        return
+    election_id = message.get("election_id")
+    state = _state(election_id)
+    with state.lock:
+        state.pending.add(message.get("student_id"))
+    _drop_crosstabs(election_id)
+
+
+bus.subscribe("votes", _on_votes)
+
+
+def benchmark(ballots: int = 50000, votes_per_ballot: int = 8, repeat: int = 5) -> None:
+    """Time crosstabs over synthetic ballots."""
+    import random
+
+    programs = ["BSIT", "BSCS", "BSEMC"]
+    students = {
+        f"s{index}": {
+            "program": random.choice(programs),
+            "year_level": str(random.randint(1, 4)),
+            "block": random.choice("ABCDEFG")
+        }
+        for index in range(ballots)
+    }
+    positions = [f"POSITION {index}" for index in range(votes_per_ballot)]
+    candidates = {
+        f"c{position}-{slot}": {"name": f"Candidate {position}-{slot}", "position": positions[position]}
+        for position in range(votes_per_ballot)
+        for slot in range(3)
+    }
+    votes = [
+        {"student_id": student_id, "candidate_id": f"c{position}-{random.randint(0, 2)}"}
+        for student_id in students
+        for position in range(votes_per_ballot)
+    ]
+
+    started = time.perf_counter()
+    columns = ElectionColumns()
+    columns.add_votes(votes, students, candidates)
+    print(f"Loaded {ballots} ballots / {len(votes)} votes in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    for dimensions in (["program"], ["program", "year_level", "block"], ["block", "candidate"], ["program", "year_level", "block", "candidate"]):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = columns.crosstab(dimensions)
+            timings.append(time.perf_counter() - started)
+        print(f"{','.join(dimensions):<36} {len(result['rows']):>5} cells  best {min(timings) * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
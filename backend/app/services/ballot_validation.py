@@ -0,0 +1,122 @@
+import threading
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from app.core.bus import bus
+from app.core.cache import TTLCache
+from app.core.logging import logger
+from app.db.database import supabase
+from app.db.pagination import scan_chunks_sync
+
+
+class CandidateEntry(NamedTuple):
+    organization_id: str
+    position: str
+    is_archived: bool
+
+
+class BallotValidator:
+    """Checks a whole ballot of one election in a single pass over its candidate ids."""
+
+    def __init__(self, election_id: str, organization_id: str, candidates: Dict[str, CandidateEntry]):
+        self.election_id = election_id
+        self.organization_id = organization_id
+        self._candidates = candidates
+        self._positions = {
+            candidate_id: entry.position.strip().upper()
+            for candidate_id, entry in candidates.items()
+            if entry.organization_id == organization_id and not entry.is_archived
+        }
+
+    def check(self, candidate_ids: Iterable[str]) -> Optional[str]:
+        """Return why the ballot is invalid, or None when it is valid."""
+        voted_positions = set()
+        for candidate_id in candidate_ids:
+            position = self._positions.get(candidate_id)
+            if position is None:
+                entry = self._candidates.get(candidate_id)
+                if entry is None:
+                    return f"Unknown candidate: {candidate_id}"
+                if entry.is_archived:
+                    return f"Candidate {candidate_id} is archived"
+                return f"Candidate {candidate_id} is not running in this election"
+            if position in voted_positions:
+                return f"Only one vote is allowed for {self._candidates[candidate_id].position.strip()}"
+            voted_positions.add(position)
+        return None
+
+
+# Candidate id -> (organization, position, archived), shared by every election
+_candidates: Optional[Dict[str, CandidateEntry]] = None
+# Compiled validators by election id, and the organization of recent elections
+_validators = TTLCache(maxsize=64, ttl=60 * 60)
+_election_organizations = TTLCache(maxsize=1024, ttl=24 * 60 * 60)
+_lock = threading.Lock()
+# Bumped by every invalidation so a map loaded concurrently with one is not kept
+_generation = 0
+
+
+def _load_candidates() -> Dict[str, CandidateEntry]:
+    candidates = {}
+    for rows in scan_chunks_sync(lambda: supabase.table("candidates").select("id, organization_id, position, is_archived")):
+        for row in rows:
+            candidates[row["id"]] = CandidateEntry(row["organization_id"], row["position"], bool(row["is_archived"]))
+    logger.info(f"Loaded {len(candidates)} candidates for ballot validation")
+    return candidates
+
+
+def _election_organization(election_id: str) -> Optional[str]:
+    organization_id = _election_organizations.get(election_id)
+    if organization_id is None:
+        election_resp = supabase.table("elections")\
+            .select("organization_id")\
+            .eq("id", election_id)\
+            .limit(1)\
+            .execute()
+        if not election_resp.data:
+            return None
+        organization_id = election_resp.data[0]["organization_id"]
+        _election_organizations.set(election_id, organization_id)
+    return organization_id
+
+
+def get_validator(election_id: str) -> Optional[BallotValidator]:
+    """The validator of an election, or None if the election does not exist."""
+    global _candidates
+    validator = _validators.get(election_id)
+    if validator is not None:
+        return validator
+
+    organization_id = _election_organization(election_id)
+    if organization_id is None:
+        return None
+    generation = _generation
+    candidates = _candidates
+    if candidates is None:
+        candidates = _load_candidates()
+    validator = BallotValidator(election_id, organization_id, candidates)
+    with _lock:
+        if generation == _generation:
+            _candidates = candidates
+            _validators.set(election_id, validator)
+    return validator
+
+
+def invalidate() -> None:
+    """Drop the candidate map and every validator built from it."""
+    global _candidates, _generation
+    with _lock:
+        _generation += 1
+        _candidates = None
+        _validators.clear()
+
+
+def _on_election_changed(message: dict) -> None:
+    # A finished (or restarted) election takes no more ballots through this validator
+    if message.get("election_id"):
+        _validators.invalidate(message["election_id"])
+    else:
+        _validators.clear()
+
+
+bus.subscribe("candidates", lambda message: invalidate())
+bus.subscribe("elections", _on_election_changed)
@@ -0,0 +1,157 @@
+import hashlib
+import threading
+from typing import Dict, Optional
+
+import orjson
+
+from app.core.bus import bus
+from app.core.cache import TTLCache
+from app.db.database import supabase
+from app.services import deadlines
+from app.utils.file_upload import photo_variants
+
+# Ballot order of positions, shared with the voter and admin UIs
+POSITION_ORDER = {
+    "PRESIDENT": 1,
+    "VICE PRESIDENT": 2,
+    "SECRETARY": 3,
+    "TREASURER": 4,
+    "AUDITOR": 5,
+    "BUSINESS MANAGER": 6,
+    "P.R.O": 7,
+    "PRO": 7,
+    "PUBLIC RELATIONS OFFICER": 7,
+    "SENATOR": 8,
+    "REPRESENTATIVE": 9,
+    "GOVERNOR": 10,
+    "COUNCILOR": 11,
+    "SERGEANT AT ARMS": 12,
+    "MUSE": 13,
+    "ESCORT": 14
+}
+
+# Compiled ballots of open elections by election id: {"document", "body", "etag", "organization_id"}
+_ballots = TTLCache(maxsize=128, ttl=6 * 60 * 60)
+_lock = threading.Lock()
+# Bumped by every invalidation so a ballot compiled concurrently with one is not kept
+_generation = 0
+
+
+def _position_rank(position: str) -> int:
+    return POSITION_ORDER.get(position.strip().upper(), 999)
+
+
+def compile_ballot(election_id: str) -> Optional[dict]:
+    """
+    Build the ballot document of an election and store it in memory. Blocks on the
+    database and on thumbnail generation, so async callers run it in the thread pool.
+    """
+    generation = _generation
+    election_resp = supabase.table("elections")\
+        .select("id, status, ends_at, organization_id, organizations(name)")\
+        .eq("id", election_id)\
+        .limit(1)\
+        .execute()
+    if not election_resp.data:
+        return None
+    election = election_resp.data[0]
+
+    candidates_resp = supabase.table("candidates")\
+        .select("id, name, position, photo_url, partylist_id, partylist(name)")\
+        .eq("organization_id", election["organization_id"])\
+        .eq("is_archived", False)\
+        .execute()
+
+    positions: Dict[str, list] = {}
+    for candidate in candidates_resp.data or []:
+        positions.setdefault(candidate["position"], []).append({
+            "id": candidate["id"],
+            "name": candidate["name"],
+            "partylist_id": candidate["partylist_id"],
+            "partylist": candidate["partylist"]["name"] if candidate["partylist"] else None,
+            "photo": photo_variants(candidate["photo_url"])
+        })
+
+    deadline = deadlines.election_deadline(election)
+
+    document = {
+        "election_id": election["id"],
+        "organization_id": election["organization_id"],
+        "organization_name": election["organizations"]["name"] if election["organizations"] else None,
+        "status": election["status"],
+        "deadline": deadline.isoformat() if deadline else None,
+        "positions": [
+            {
+                "name": position,
+                "order": _position_rank(position),
+                "candidates": sorted(candidates, key=lambda c: c["name"])
+            }
+            for position, candidates in sorted(positions.items(), key=lambda item: (_position_rank(item[0]), item[0]))
+        ]
+    }
+
+    body = orjson.dumps(document)
+    ballot = {
+        "document": document,
+        "body": body,
+        "etag": f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        "organization_id": election["organization_id"]
+    }
+    # A finished election's ballot is no longer served to voters, so it is not kept
+    with _lock:
+        if generation == _generation and election["status"] != "finished":
+            _ballots.set(election_id, ballot)
+    return ballot
+
+
+def get_ballot(election_id: str) -> Optional[dict]:
+    """The compiled ballot of an election, compiling it on first use."""
+    ballot = _ballots.get(election_id)
+    if ballot is None:
+        ballot = compile_ballot(election_id)
+    return ballot
+
+
+def invalidate_election(election_id: str) -> None:
+    global _generation
+    with _lock:
+        _generation += 1
+        _ballots.invalidate(election_id)
+
+
+def invalidate_organization(organization_id: str) -> None:
+    """Drop the ballots of an organization after one of its candidates changed."""
+    global _generation
+    with _lock:
+        _generation += 1
+        for election_id, ballot in _ballots.items():
+            if ballot["organization_id"] == organization_id:
+                _ballots.invalidate(election_id)
+
+
+def invalidate_all() -> None:
+    global _generation
+    with _lock:
+        _generation += 1
+        _ballots.clear()
+
+
+def _on_candidates_changed(message: dict) -> None:
+    organization_ids = message.get("organization_ids")
+    if not organization_ids:
+        invalidate_all()
+        return
+    for organization_id in organization_ids:
+        invalidate_organization(organization_id)
+
+
+def _on_election_changed(message: dict) -> None:
+    if message.get("election_id"):
+        invalidate_election(message["election_id"])
+    else:
+        invalidate_all()
+
+
+bus.subscribe("candidates", _on_candidates_changed)
+bus.subscribe("partylists", lambda message: invalidate_all())
+bus.subscribe("elections", _on_election_changed)
@@ -0,0 +1,51 @@
+"""
+Archiving candidates in bulk, in id batches so a large archive reports progress
+and never sends one unbounded UPDATE.
+"""
+from typing import List, Optional
+
+from app.core.bus import bus
+from app.db.database import supabase
+from app.db.pagination import scan_chunks_sync
+
+# Candidate ids per in.(...) filter of one UPDATE
+ARCHIVE_BATCH = 100
+
+
+def active_candidate_ids(organization_id: Optional[str] = None) -> List[str]:
+    """Ids of the candidates that are not archived yet, optionally of one organization."""
+    def query():
+        query = supabase.table("candidates").select("id").eq("is_archived", False)
+        return query.eq("organization_id", organization_id) if organization_id else query
+
+    return [candidate["id"] for chunk in scan_chunks_sync(query) for candidate in chunk]
+
+
+def archive_candidates(
+    candidate_ids: Optional[List[str]] = None,
+    organization_id: Optional[str] = None,
+    progress=None
+) -> dict:
+    """
+    Archive the given candidates, or every active candidate (of organization_id,
+    if given) when no ids are passed. Runs as a background job.
+    """
+    if candidate_ids is None:
+        candidate_ids = active_candidate_ids(organization_id)
+    total = len(candidate_ids)
+    if progress:
+        progress(0, total)
+
+    archived = 0
+    for start in range(0, total, ARCHIVE_BATCH):
+        batch = candidate_ids[start:start + ARCHIVE_BATCH]
+        archive_resp = supabase.table("candidates")\
+            .update({"is_archived": True})\
+            .in_("id", batch)\
+            .execute()
+        archived += len(archive_resp.data or [])
+        if progress:
+            progress(start + len(batch), total)
+
+    bus.publish("candidates", {"organization_ids": [organization_id]} if organization_id else {})
+    return {"archived": archived, "organization_id": organization_id}
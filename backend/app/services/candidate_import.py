@@ -0,0 +1,228 @@
+"""
+Bulk candidate import from a CSV file and a zip archive of their photos.
+
+CSV columns: name, position, organization, partylist, photo. organization and
+partylist take a name or an id; photo is a file name inside the zip archive.
+"""
+import csv
+import io
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.core.bus import bus
+from app.db.database import supabase
+from app.db.pagination import scan_chunks_sync
+from app.utils.file_upload import remove_photo, save_photo_bytes
+
+REQUIRED_COLUMNS = ("name", "position", "organization", "partylist", "photo")
+PHOTO_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif")
+MAX_IMPORT_ROWS = 500
+MAX_PHOTO_BYTES = 10 * 1024 * 1024
+PHOTO_WORKERS = 4
+
+
+class CandidateImportError(ValueError):
+    """The upload as a whole cannot be imported (bad CSV or archive)."""
+
+
+def _read_rows(csv_bytes: bytes) -> List[Dict[str, str]]:
+    try:
+        text = csv_bytes.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise CandidateImportError("The CSV file must be UTF-8 encoded")
+    reader = csv.DictReader(io.StringIO(text))
+    columns = [column.strip().lower() for column in reader.fieldnames or []]
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise CandidateImportError(f"Missing CSV columns: {', '.join(missing)}")
+    reader.fieldnames = columns
+    rows = [{key: (value or "").strip() for key, value in row.items() if key} for row in reader]
+    if not rows:
+        raise CandidateImportError("The CSV file has no rows")
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise CandidateImportError(f"At most {MAX_IMPORT_ROWS} candidates can be imported at once")
+    return rows
+
+
+def _lookup(rows: List[dict], key_column: str = "name") -> Dict[str, str]:
+    """Index rows by id and by upper-cased name so the CSV may use either."""
+    index = {}
+    for row in rows:
+        index[row["id"]] = row["id"]
+        index[row[key_column].strip().upper()] = row["id"]
+    return index
+
+
+def _reference_data():
+    """Everything the rows are validated against, loaded once per import."""
+    organizations = supabase.table("organizations").select("id, name").execute().data or []
+    partylists = supabase.table("partylist").select("id, name").eq("is_archived", False).execute().data or []
+    # Active candidate names per organization, for the duplicate checks
+    existing: Dict[str, Dict[str, str]] = {}
+    chunks = scan_chunks_sync(
+        lambda: supabase.table("candidates").select("id, name, position, organization_id").eq("is_archived", False)
+    )
+    for chunk in chunks:
+        for candidate in chunk:
+            existing.setdefault(candidate["organization_id"], {})[candidate["name"].strip().upper()] = candidate["position"]
+    return _lookup(organizations), _lookup(partylists), existing
+
+
+def _validate(rows, photo_names, organizations, partylists, existing) -> List[dict]:
+    report = []
+    for number, row in enumerate(rows, start=2):  # row 1 is the header
+        errors = []
+        name = row["name"].upper()
+        position = row["position"]
+        organization_id = organizations.get(row["organization"]) or organizations.get(row["organization"].upper())
+        partylist_id = partylists.get(row["partylist"]) or partylists.get(row["partylist"].upper())
+        photo = row["photo"]
+
+        if not name:
+            errors.append("name is required")
+        if not position:
+            errors.append("position is required")
+        if organization_id is None:
+            errors.append(f"Organization not found: {row['organization']}")
+        if partylist_id is None:
+            errors.append(f"Invalid partylist: {row['partylist']}")
+        if os.path.splitext(photo)[1].lower() not in PHOTO_EXTENSIONS:
+            errors.append("Only JPG, PNG and GIF files are allowed")
+        elif photo not in photo_names:
+            errors.append(f"Photo not found in archive: {photo}")
+
+        if name and organization_id:
+            names = existing.setdefault(organization_id, {})
+            if name in names:
+                errors.append(
+                    f"A candidate named '{name}' already exists in this organization (position: {names[name]})"
+                )
+            elif not errors:
+                # Later rows of the same file count as existing candidates too
+                names[name] = position
+
+        report.append({
+            "row": number,
+            "name": name,
+            "position": position,
+            "organization_id": organization_id,
+            "partylist_id": partylist_id,
+            "photo": photo,
+            "status": "error" if errors else "valid",
+            "errors": errors
+        })
+    return report
+
+
+def _store_photo(archive: zipfile.ZipFile, info: zipfile.ZipInfo, archive_lock: threading.Lock) -> str:
+    if info.file_size > MAX_PHOTO_BYTES:
+        raise ValueError(f"larger than {MAX_PHOTO_BYTES // (1024 * 1024)} MB")
+    # Decompression shares the archive's file handle; decoding and resizing run in parallel
+    with archive_lock:
+        data = archive.read(info)
+    return save_photo_bytes(data, os.path.splitext(info.filename)[1])
+
+
+def import_candidates(csv_bytes: bytes, photos_zip, dry_run: bool = False, progress=None) -> dict:
+    """
+    Validate every row, store the photos of the valid ones in parallel and insert
+    them in one batch. Returns a report with one entry per CSV row.
+    progress, if given, is called with (done, total) as photos are stored.
+    """
+    rows = _read_rows(csv_bytes)
+    try:
+        archive = zipfile.ZipFile(photos_zip)
+    except zipfile.BadZipFile:
+        raise CandidateImportError("The photo archive must be a zip file")
+
+    with archive:
+        # Photos are matched by file name, wherever they sit inside the archive
+        photos: Dict[str, zipfile.ZipInfo] = {}
+        for info in archive.infolist():
+            if not info.is_dir():
+                photos.setdefault(os.path.basename(info.filename), info)
+
+        report = _validate(rows, photos, *_reference_data())
+        valid = [entry for entry in report if entry["status"] == "valid"]
+
+        if not dry_run and valid:
+            archive_lock = threading.Lock()
+
+            def store(entry: dict) -> Optional[str]:
+                try:
+                    return _store_photo(archive, photos[entry["photo"]], archive_lock)
+                except Exception as e:
+                    entry["status"] = "error"
+                    entry["errors"].append(f"Photo {entry['photo']} is not usable: {e}")
+                    return None
+
+            with ThreadPoolExecutor(max_workers=PHOTO_WORKERS) as executor:
+                photo_urls = []
+                for done, photo_url in enumerate(executor.map(store, valid), start=1):
+                    photo_urls.append(photo_url)
+                    if progress:
+                        progress(done, len(valid))
+            for entry, photo_url in zip(valid, photo_urls):
+                entry["photo_url"] = photo_url
+            valid = [entry for entry in valid if entry["status"] == "valid"]
+
+    imported = 0
+    if not dry_run and valid:
+        created_at = datetime.now().isoformat()
+        try:
+            insert_resp = supabase.table("candidates").insert([
+                {
+                    "name": entry["name"],
+                    "position": entry["position"],
+                    "organization_id": entry["organization_id"],
+                    "partylist_id": entry["partylist_id"],
+                    "photo_url": entry["photo_url"],
+                    "is_archived": False,
+                    "created_at": created_at
+                }
+                for entry in valid
+            ]).execute()
+        except Exception as e:
+            for entry in valid:
+                remove_photo(entry["photo_url"])
+                entry["status"] = "error"
+                entry["errors"].append(f"Database error: {e}")
+        else:
+            for entry, candidate in zip(valid, insert_resp.data or []):
+                entry["status"] = "imported"
+                entry["candidate_id"] = candidate["id"]
+            imported = len(insert_resp.data or [])
+            bus.publish("candidates", {"organization_ids": sorted({entry["organization_id"] for entry in valid})})
+
+    for entry in report:
+        entry.pop("photo_url", None)
+    return {
+        "dry_run": dry_run,
+        "total": len(report),
+        "imported": imported,
+        "valid": sum(1 for entry in report if entry["status"] in ("valid", "imported")),
+        "failed": sum(1 for entry in report if entry["status"] == "error"),
+        "rows": report
+    }
+
+
+def spool_upload(upload) -> str:
+    """Copy an uploaded photo archive to a temporary file that outlives the request."""
+    with tempfile.NamedTemporaryFile(prefix="candidate-import-", suffix=".zip", delete=False) as spooled:
+        shutil.copyfileobj(upload, spooled)
+    return spooled.name
+
+
+def import_candidates_job(csv_bytes: bytes, photos_path: str, progress=None) -> dict:
+    """Background-job entry point: import from a spooled archive, then remove it."""
+    try:
+        with open(photos_path, "rb") as photos_zip:
+            return import_candidates(csv_bytes, photos_zip, progress=progress)
+    finally:
+        os.remove(photos_path)
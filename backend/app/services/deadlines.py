@@ -0,0 +1,39 @@
+"""
+Election deadlines. All times are handled as aware UTC datetimes; the deadline
+itself is the elections.ends_at column, which the database sets when an election
+starts (see sql/007_election_deadlines.sql).
+"""
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO timestamp from the database or a query string as an aware UTC datetime."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        # Timestamps without a zone are written by Supabase sessions, which run in UTC
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def election_deadline(election: dict) -> Optional[datetime]:
+    """When an election closes, or None for one that has not started."""
+    ends_at = election.get("ends_at")
+    return parse_timestamp(ends_at) if ends_at else None
+
+
+def remaining_seconds(election: dict, now: Optional[datetime] = None) -> Optional[float]:
+    """Seconds until an election closes (never negative), or None without a deadline."""
+    deadline = election_deadline(election)
+    if deadline is None:
+        return None
+    return max((deadline - (now or utc_now())).total_seconds(), 0.0)
+
+
+def is_expired(election: dict, now: Optional[datetime] = None) -> bool:
+    deadline = election_deadline(election)
+    return deadline is not None and (now or utc_now()) >= deadline
@@ -0,0 +1,208 @@
+"""
+Turnout statistics for GET /elections/statistics.
+
+The counts are aggregated in the database by election_turnout_statistics()
+(see sql/001_election_turnout_statistics.sql), so one small JSON document comes
+back however many students and votes there are. This module shapes that document
+into the response the admin dashboard reads.
+
+Run `python -m app.services.election_statistics` from the backend directory to
+time both against the configured database: the election_turnout_statistics() call
+and the per-row reads and counting the endpoint used to do, with the round trips,
+rows and bytes each one downloads.
+
+`--parse-only [students]` runs without a database instead: a microbenchmark of
+the API-side JSON parsing and counting on synthetic rows (10,000 students by
+default). It does not run the aggregate, so it says nothing about the speed of
+the database call and its numbers are not the speedup of the endpoint.
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+import uuid
+from typing import Dict, List
+
+from app.db.database import supabase
+from app.db.pagination import SCAN_CHUNK_SIZE, scan_chunks_sync
+
+PROGRAMS = ["BSIT", "BSCS", "BSEMC"]
+ORGANIZATIONS = ["CCS Student Council", "ELITES", "SPECS", "IMAGES"]
+# Default program rule of each organization when it has no materialized voters
+ORGANIZATION_PROGRAMS = {"ELITES": "BSIT", "SPECS": "BSCS", "IMAGES": "BSEMC"}
+
+
+def shape_statistics(stats: dict) -> dict:
+    """Turn the election_turnout_statistics() document into the dashboard response."""
+    total_voters = stats.get("total_students", 0)
+    students_by_program = stats.get("students_by_program", {})
+    candidates_by_org = stats.get("candidates_by_org", {})
+    voted_by_org = stats.get("voted_by_org", {})
+    voted_by_program = stats.get("voted_by_program", {})
+    eligible_by_org = stats.get("eligible_by_org", {})
+
+    voters_by_program = {program: students_by_program.get(program, 0) for program in PROGRAMS}
+    return {
+        "totalVoters": total_voters,
+        "candidates": {name: candidates_by_org.get(name, 0) for name in ORGANIZATIONS},
+        "voted": {program: voted_by_program.get(program, 0) for program in PROGRAMS},
+        "votersByProgram": voters_by_program,
+        "orgVoted": {name: voted_by_org.get(name, 0) for name in ORGANIZATIONS},
+        # Ongoing elections report the voters materialized when they started,
+        # the others fall back to the default program rule of the organization
+        "orgVoters": {
+            name: eligible_by_org.get(
+                name,
+                voters_by_program[ORGANIZATION_PROGRAMS[name]] if name in ORGANIZATION_PROGRAMS else total_voters
+            )
+            for name in ORGANIZATIONS
+        }
+    }
+
+
+def load_statistics() -> dict:
+    stats_resp = supabase.rpc("election_turnout_statistics").execute()
+    return shape_statistics(stats_resp.data or {})
+
+
+def count_rows(students: List[dict], votes_by_election: Dict[str, List[dict]], votes_with_program: List[dict]) -> dict:
+    """The per-row counting the endpoint did before the aggregate, kept as the benchmark baseline."""
+    voters_by_program = {program: 0 for program in PROGRAMS}
+    for student in students:
+        if student["program"] in voters_by_program:
+            voters_by_program[student["program"]] += 1
+    org_voted = {name: len({vote["student_id"] for vote in votes}) for name, votes in votes_by_election.items()}
+    program_voters = {program: set() for program in PROGRAMS}
+    for vote in votes_with_program:
+        if vote["students"]["program"] in program_voters:
+            program_voters[vote["students"]["program"]].add(vote["student_id"])
+    return {
+        "total_students": len(students),
+        "students_by_program": voters_by_program,
+        "voted_by_org": org_voted,
+        "voted_by_program": {program: len(voters) for program, voters in program_voters.items()}
+    }
+
+
+def load_per_row() -> tuple:
+    """The reads the endpoint did before the aggregate: (counts, round trips, rows, bytes)."""
+    requests, rows, size = 0, 0, 0
+
+    def scan(query_factory) -> List[dict]:
+        nonlocal requests, rows, size
+        scanned = []
+        for chunk in scan_chunks_sync(query_factory):
+            scanned.extend(chunk)
+            size += len(json.dumps(chunk))
+        requests += len(scanned) // SCAN_CHUNK_SIZE + 1
+        rows += len(scanned)
+        return scanned
+
+    students = scan(lambda: supabase.table("students").select("id, program"))
+    ongoing_resp = supabase.table("elections")\
+        .select("id, organizations(name)")\
+        .eq("status", "ongoing")\
+        .execute()
+    requests += 1
+    votes_by_election = {}
+    for election in ongoing_resp.data or []:
+        name = election["organizations"]["name"] if election["organizations"] else election["id"]
+        votes_by_election[name] = scan(
+            lambda: supabase.table("votes").select("id, student_id").eq("election_id", election["id"])
+        )
+    ongoing_ids = [election["id"] for election in ongoing_resp.data or []]
+    votes_with_program = scan(
+        lambda: supabase.table("votes").select("id, student_id, students(program)").in_("election_id", ongoing_ids)
+    ) if ongoing_ids else []
+    return count_rows(students, votes_by_election, votes_with_program), requests, rows, size
+
+
+def _synthetic_tables(students: int, turnout: float, votes_per_ballot: int):
+    """Students and the vote rows PostgREST would return for four ongoing elections."""
+    student_rows = [{"id": str(uuid.uuid4()), "program": random.choice(PROGRAMS)} for _ in range(students)]
+    votes_by_election = {}
+    votes_with_program = []
+    for name in ORGANIZATIONS:
+        program = ORGANIZATION_PROGRAMS.get(name)
+        voters = [s for s in student_rows if program is None or s["program"] == program]
+        voters = random.sample(voters, int(len(voters) * turnout))
+        votes_by_election[name] = [{"student_id": s["id"]} for s in voters for _ in range(votes_per_ballot)]
+        votes_with_program.extend(
+            {"student_id": s["id"], "students": {"program": s["program"]}} for s in voters for _ in range(votes_per_ballot)
+        )
+    return student_rows, votes_by_election, votes_with_program
+
+
+def _best_ms(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+def parse_benchmark(students: int = 10000, turnout: float = 0.7, votes_per_ballot: int = 8, repeat: int = 5) -> None:
+    """
+    API-side parse and count CPU on synthetic rows, without a database. The
+    aggregate is never run here, so this is not the speedup of the endpoint.
+    """
+    student_rows, votes_by_election, votes_with_program = _synthetic_tables(students, turnout, votes_per_ballot)
+
+    # What each approach receives over the wire, as PostgREST would encode it
+    row_payloads = [json.dumps(student_rows).encode(), json.dumps(votes_with_program).encode()]
+    row_payloads += [json.dumps(votes).encode() for votes in votes_by_election.values()]
+    rows_downloaded = len(student_rows) + len(votes_with_program) + sum(len(v) for v in votes_by_election.values())
+    aggregate_payload = json.dumps(count_rows(student_rows, votes_by_election, votes_with_program)).encode()
+
+    def per_row():
+        parsed = [json.loads(payload) for payload in row_payloads]
+        count_rows(parsed[0], dict(zip(votes_by_election, parsed[2:])), parsed[1])
+
+    def aggregated():
+        shape_statistics(json.loads(aggregate_payload))
+
+    print("Parse-only microbenchmark: API CPU to decode and count, no database time included")
+    print(f"{students} students, {rows_downloaded - students} vote rows across {len(ORGANIZATIONS)} ongoing elections")
+    print(f"{'payload':<12} {'rows':>9} {'bytes':>11} {'parse+count ms':>15}")
+    print(f"{'per-row':<12} {rows_downloaded:>9} {sum(map(len, row_payloads)):>11} {_best_ms(per_row, repeat):>15.1f}")
+    print(f"{'aggregate':<12} {1:>9} {len(aggregate_payload):>11} {_best_ms(aggregated, repeat):>15.2f}")
+
+
+def _timed(func, repeat: int) -> tuple:
+    """(median ms, best ms, last result) of repeated calls."""
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), min(timings), result
+
+
+def benchmark(repeat: int = 5) -> None:
+    """End-to-end time of the aggregate and of the per-row reads against the configured database."""
+    aggregate_p50, aggregate_best, _ = _timed(load_statistics, repeat)
+    stats = supabase.rpc("election_turnout_statistics").execute().data or {}
+    per_row_p50, per_row_best, (_, requests, rows, size) = _timed(load_per_row, repeat)
+
+    print(f"{stats.get('total_students', 0)} students in the configured database")
+    print(f"{'approach':<12} {'requests':>8} {'rows':>9} {'bytes':>11} {'p50 ms':>9} {'best ms':>9}")
+    print(f"{'per-row':<12} {requests:>8} {rows:>9} {size:>11} {per_row_p50:>9.1f} {per_row_best:>9.1f}")
+    print(f"{'aggregate':<12} {1:>8} {1:>9} {len(json.dumps(stats)):>11} {aggregate_p50:>9.1f} {aggregate_best:>9.1f}")
+    print(f"aggregate is {per_row_p50 / aggregate_p50:.1f}x faster at the median")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark GET /elections/statistics counting")
+    parser.add_argument("students", nargs="?", type=int, default=10000, help="synthetic students for --parse-only")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--parse-only", action="store_true",
+        help="time only the API-side parsing of synthetic rows, without a database"
+    )
+    args = parser.parse_args()
+    if args.parse_only:
+        parse_benchmark(args.students, repeat=args.repeat)
+    else:
+        benchmark(repeat=args.repeat)
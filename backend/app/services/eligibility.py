@@ -0,0 +1,77 @@
+from typing import FrozenSet, Optional
+
+from app.core.bus import bus
+from app.core.cache import TTLCache
+from app.core.logging import logger
+from app.db.database import supabase
+from app.db.pagination import scan_chunks_sync
+
+# Eligible student ids by election id
+_eligible = TTLCache(maxsize=64, ttl=60 * 60)
+# Existing elections started before eligibility was materialized, where the
+# database makes the decision; kept apart so they never evict a voter set.
+# Ids of elections that do not exist are not cached at all.
+_not_materialized = TTLCache(maxsize=256, ttl=60 * 60)
+_NOT_MATERIALIZED = object()
+
+
+def materialize(election_id: str) -> Optional[int]:
+    """Write the eligible voters of a starting election and return their count."""
+    count_resp = supabase.rpc("materialize_election_eligibility", {"p_election_id": election_id}).execute()
+    _eligible.invalidate(election_id)
+    _not_materialized.invalidate(election_id)
+    return count_resp.data
+
+
+def _load(election_id: str):
+    """The election's eligible ids, _NOT_MATERIALIZED, or None if there is no such election."""
+    election_resp = supabase.table("elections")\
+        .select("eligible_count")\
+        .eq("id", election_id)\
+        .limit(1)\
+        .execute()
+    if not election_resp.data:
+        return None
+    if election_resp.data[0]["eligible_count"] is None:
+        return _NOT_MATERIALIZED
+
+    student_ids = set()
+    chunks = scan_chunks_sync(
+        lambda: supabase.table("election_eligible_voters").select("student_id").eq("election_id", election_id),
+        key="student_id"
+    )
+    for rows in chunks:
+        student_ids.update(row["student_id"] for row in rows)
+    logger.info(f"Loaded {len(student_ids)} eligible voters for election {election_id}")
+    return frozenset(student_ids)
+
+
+def eligible_voters(election_id: str) -> Optional[FrozenSet[str]]:
+    """The eligible student ids of an election, or None if it has no materialized set."""
+    eligible = _eligible.get(election_id)
+    if eligible is not None or election_id in _not_materialized:
+        return eligible
+    eligible = _load(election_id)
+    if eligible is _NOT_MATERIALIZED:
+        _not_materialized.set(election_id, True)
+        return None
+    if eligible is not None:
+        _eligible.set(election_id, eligible)
+    return eligible
+
+
+def is_eligible(election_id: str, student_id: str) -> bool:
+    eligible = eligible_voters(election_id)
+    return eligible is None or student_id in eligible
+
+
+def _on_election_changed(message: dict) -> None:
+    if message.get("election_id"):
+        _eligible.invalidate(message["election_id"])
+        _not_materialized.invalidate(message["election_id"])
+    else:
+        _eligible.clear()
+        _not_materialized.clear()
+
+
+bus.subscribe("elections", _on_election_changed)
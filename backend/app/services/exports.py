@@ -0,0 +1,285 @@
+"""
+Results exports as CSV or Parquet, produced chunk by chunk so a response never
+holds more than one chunk of rows. Parquet needs the optional pyarrow package.
+Exports can also be written to a file by a background job and downloaded later.
+"""
+import csv
+import hashlib
+import hmac
+import io
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.db.database import supabase
+from app.db.pagination import scan_chunks
+from app.services import results as election_results
+
+# Column name and type ("string", "int" or "float") of every dataset
+DATASET_COLUMNS: Dict[str, List[Tuple[str, str]]] = {
+    "candidates": [
+        ("position", "string"),
+        ("candidate_id", "string"),
+        ("candidate_name", "string"),
+        ("vote_count", "int"),
+    ],
+    "positions": [
+        ("position", "string"),
+        ("candidates", "int"),
+        ("total_votes", "int"),
+        ("leading_candidate", "string"),
+        ("leading_votes", "int"),
+    ],
+    "programs": [
+        ("program", "string"),
+        ("eligible", "int"),
+        ("voted", "int"),
+        ("turnout_percent", "float"),
+    ],
+    # One row per vote; the ballot column groups the votes of one voter without identifying them
+    "ledger": [
+        ("ballot", "string"),
+        ("position", "string"),
+        ("candidate_id", "string"),
+        ("candidate_name", "string"),
+        ("cast_minute", "string"),
+    ],
+}
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Files written by export jobs, removed a day after they were written
+EXPORTS_DIR = Path(__file__).resolve().parent.parent.parent / "exports"
+EXPORT_FILE_MAX_AGE = 24 * 60 * 60
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def election_tally(election_id: str) -> Optional[dict]:
+    """The tally of an election: its snapshot once finished, counted live before that."""
+    election_resp = supabase.table("elections")\
+        .select("id, status")\
+        .eq("id", election_id)\
+        .limit(1)\
+        .execute()
+    if not election_resp.data:
+        return None
+    if election_resp.data[0]["status"] == "finished":
+        snapshot = election_results.get_snapshot(election_id)
+        if snapshot:
+            return snapshot["results"]
+    tally_resp = supabase.rpc("election_final_tally", {"p_election_id": election_id}).execute()
+    return tally_resp.data
+
+
+async def _candidate_rows(tally: dict) -> AsyncIterator[List[tuple]]:
+    yield [
+        (position["name"], candidate["id"], candidate["name"], candidate["vote_count"])
+        for position in tally["positions"]
+        for candidate in position["candidates"]
+    ]
+
+
+async def _position_rows(tally: dict) -> AsyncIterator[List[tuple]]:
+    rows = []
+    for position in tally["positions"]:
+        candidates = position["candidates"]
+        leader = max(candidates, key=lambda c: c["vote_count"]) if candidates else None
+        rows.append((
+            position["name"],
+            len(candidates),
+            sum(c["vote_count"] for c in candidates),
+            leader["name"] if leader else None,
+            leader["vote_count"] if leader else None,
+        ))
+    yield rows
+
+
+async def _program_rows(tally: dict) -> AsyncIterator[List[tuple]]:
+    rows = []
+    for program, counts in sorted(tally["by_program"].items()):
+        eligible = counts["eligible"]
+        turnout = round(counts["voted"] * 100 / eligible, 2) if eligible else None
+        rows.append((program, eligible, counts["voted"], turnout))
+    yield rows
+
+
+def _ballot_token(election_id: str, student_id: str) -> str:
+    digest = hmac.new(settings.SECRET_KEY.encode(), f"{election_id}:{student_id}".encode(), hashlib.sha256)
+    return digest.hexdigest()[:16]
+
+
+def _cast_minute(created_at: str) -> str:
+    cast_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+    if cast_at.tzinfo is None:
+        cast_at = cast_at.replace(tzinfo=timezone.utc)
+    return cast_at.astimezone(timezone.utc).replace(second=0, microsecond=0).isoformat()
+
+
+async def _ledger_rows(election_id: str, tally: dict) -> AsyncIterator[List[tuple]]:
+    candidates = {
+        candidate["id"]: (position["name"], candidate["name"])
+        for position in tally["positions"]
+        for candidate in position["candidates"]
+    }
+    votes = scan_chunks(
+        lambda: supabase.table("votes").select("id, candidate_id, student_id, created_at").eq("election_id", election_id)
+    )
+    async for chunk in votes:
+        rows = []
+        for vote in chunk:
+            position, name = candidates.get(vote["candidate_id"], (None, None))
+            rows.append((
+                _ballot_token(election_id, vote["student_id"]),
+                position,
+                vote["candidate_id"],
+                name,
+                _cast_minute(vote["created_at"]),
+            ))
+        yield rows
+
+
+def dataset_chunks(dataset: str, election_id: str, tally: dict) -> AsyncIterator[List[tuple]]:
+    if dataset == "candidates":
+        return _candidate_rows(tally)
+    if dataset == "positions":
+        return _position_rows(tally)
+    if dataset == "programs":
+        return _program_rows(tally)
+    return _ledger_rows(election_id, tally)
+
+
+async def encode_csv(columns: Sequence[Tuple[str, str]], chunks: AsyncIterator[List[tuple]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    yield buffer.getvalue().encode()
+    async for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+
+
+class _ChunkSink:
+    """Write-only file object that hands the Parquet bytes written so far back to the response."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def writable(self) -> bool:
+        return True
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+async def encode_parquet(columns: Sequence[Tuple[str, str]], chunks: AsyncIterator[List[tuple]]) -> AsyncIterator[bytes]:
+    """Write each chunk as one Parquet row group and stream the file as it grows."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {"string": pa.string(), "int": pa.int64(), "float": pa.float64()}
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    async for rows in chunks:
+        if not rows:
+            continue
+        table = pa.Table.from_arrays(
+            [pa.array([row[index] for row in rows], type=schema.field(index).type) for index in range(len(columns))],
+            schema=schema
+        )
+        writer.write_table(table)
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
+
+
+def encode(format: str, dataset: str, election_id: str, tally: dict) -> AsyncIterator[bytes]:
+    columns = DATASET_COLUMNS[dataset]
+    chunks = dataset_chunks(dataset, election_id, tally)
+    return encode_csv(columns, chunks) if format == "csv" else encode_parquet(columns, chunks)
+
+
+def export_file(file_name: str) -> Optional[Path]:
+    path = EXPORTS_DIR / os.path.basename(file_name)
+    return path if path.is_file() else None
+
+
+def _remove_expired_files() -> None:
+    expired_before = time.time() - EXPORT_FILE_MAX_AGE
+    for path in EXPORTS_DIR.glob("*"):
+        if path.is_file() and path.stat().st_mtime < expired_before:
+            path.unlink(missing_ok=True)
+
+
+def write_export(election_id: str, dataset: str, format: str, progress=None) -> dict:
+    """Background-job entry point: write an export to EXPORTS_DIR and describe the file."""
+    import anyio
+
+    tally = election_tally(election_id)
+    if tally is None:
+        raise ValueError("Election not found")
+
+    EXPORTS_DIR.mkdir(parents=True, exist_ok=True)
+    _remove_expired_files()
+    _, extension = FORMATS[format]
+    file_name = f"{uuid.uuid4().hex}.{extension}"
+    path = EXPORTS_DIR / file_name
+
+    async def write() -> int:
+        written = 0
+        with open(path, "wb") as output:
+            async for data in encode(format, dataset, election_id, tally):
+                output.write(data)
+                written += len(data)
+                if progress:
+                    progress(written)
+        return written
+
+    try:
+        size = anyio.run(write)
+    except Exception:
+        path.unlink(missing_ok=True)
+        raise
+    return {
+        "file": file_name,
+        "download_name": f"election-{election_id}-{dataset}.{extension}",
+        "format": format,
+        "bytes": size
+    }
@@ -0,0 +1,183 @@
+"""
+In-process background jobs. Long admin operations run on a small thread pool
+per worker process while their state (status, progress, result, error) is kept
+in the jobs table, so any worker can answer GET /jobs/{id}.
+"""
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.db.database import supabase
+
+STATUSES = ("queued", "running", "succeeded", "failed")
+# Progress is written to the database at most this often per job
+PROGRESS_INTERVAL = 1.0
+
+_executor = ThreadPoolExecutor(max_workers=settings.JOB_WORKERS, thread_name_prefix="job")
+_pending = 0
+_pending_lock = threading.Lock()
+# Set per process in worker_id(): hostnames and pids repeat across container restarts
+_boot_id: Optional[str] = None
+_boot_pid: Optional[int] = None
+
+
+class JobQueueFull(RuntimeError):
+    """Too many jobs are queued or running in this worker."""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def worker_id() -> str:
+    """hostname:pid:boot, where boot is a uuid drawn once per process."""
+    global _boot_id, _boot_pid
+    # Evaluated per call: gunicorn forks workers after the app is imported
+    if _boot_pid != os.getpid():
+        _boot_id, _boot_pid = uuid.uuid4().hex, os.getpid()
+    return f"{socket.gethostname()}:{_boot_pid}:{_boot_id}"
+
+
+def _update(job_id: str, fields: dict) -> None:
+    try:
+        supabase.table("jobs").update({**fields, "updated_at": _now()}).eq("id", job_id).execute()
+    except Exception as e:
+        logger.error(f"Failed to update job {job_id}: {e}")
+
+
+class Progress:
+    """Callable handed to a job as progress(done, total); throttles the database writes."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self._written_at = 0.0
+
+    def __call__(self, done: int, total: Optional[int] = None) -> None:
+        now = time.monotonic()
+        finished = total is not None and done >= total
+        if not finished and now - self._written_at < PROGRESS_INTERVAL:
+            return
+        self._written_at = now
+        fields = {"progress_done": done}
+        if total is not None:
+            fields["progress_total"] = total
+        _update(self.job_id, fields)
+
+
+def _run(job_id: str, kind: str, func: Callable, args: tuple, kwargs: dict) -> None:
+    global _pending
+    started = time.perf_counter()
+    try:
+        _update(job_id, {"status": "running", "started_at": _now()})
+        result = func(*args, progress=Progress(job_id), **kwargs)
+        _update(job_id, {"status": "succeeded", "result": result, "finished_at": _now()})
+        logger.info(f"Job {job_id} ({kind}) finished in {time.perf_counter() - started:.1f} s")
+    except Exception as e:
+        logger.error(f"Job {job_id} ({kind}) failed: {e}")
+        _update(job_id, {"status": "failed", "error": str(e), "finished_at": _now()})
+    finally:
+        with _pending_lock:
+            _pending -= 1
+
+
+def submit(kind: str, func: Callable, *args, created_by: Optional[str] = None, **kwargs) -> dict:
+    """
+    Record a queued job and run func(*args, progress=..., **kwargs) on the pool.
+    func returns the JSON-serializable result; an exception fails the job.
+    """
+    global _pending
+    with _pending_lock:
+        if _pending >= settings.JOB_MAX_PENDING:
+            raise JobQueueFull(f"{_pending} jobs are already queued or running")
+        _pending += 1
+    try:
+        job_resp = supabase.table("jobs").insert({
+            "kind": kind,
+            "status": "queued",
+            "worker": worker_id(),
+            "created_by": created_by
+        }).execute()
+        job = job_resp.data[0]
+        _executor.submit(_run, job["id"], kind, func, args, kwargs)
+    except Exception:
+        with _pending_lock:
+            _pending -= 1
+        raise
+    return job
+
+
+def reference(job: dict) -> dict:
+    """What an enqueueing endpoint returns: where to poll the job."""
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "status_url": f"{settings.API_V1_STR}/jobs/{job['id']}"
+    }
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    job_resp = supabase.table("jobs")\
+        .select("*")\
+        .eq("id", job_id)\
+        .limit(1)\
+        .execute()
+    return job_resp.data[0] if job_resp.data else None
+
+
+def list_jobs(kind: Optional[str] = None, status: Optional[str] = None, limit: int = 20) -> List[dict]:
+    query = supabase.table("jobs")\
+        .select("id, kind, status, progress_done, progress_total, error, created_by, created_at, finished_at")\
+        .order("created_at", desc=True)\
+        .limit(limit)
+    if kind:
+        query = query.eq("kind", kind)
+    if status:
+        query = query.eq("status", status)
+    return query.execute().data or []
+
+
+def recover_interrupted() -> int:
+    """
+    Fail the unfinished jobs whose worker is gone: one recorded under this
+    process's hostname and pid by an earlier boot (a restarted container gets the
+    same ones back), or any job that has not been updated for JOB_STALE_MINUTES.
+    """
+    host, pid, boot = worker_id().split(":")
+    stale_before = datetime.now(timezone.utc) - timedelta(minutes=settings.JOB_STALE_MINUTES)
+    try:
+        unfinished_resp = supabase.table("jobs")\
+            .select("id, worker, updated_at")\
+            .in_("status", ["queued", "running"])\
+            .execute()
+    except Exception as e:
+        logger.error(f"Could not check for interrupted jobs: {e}")
+        return 0
+
+    recovered = 0
+    for job in unfinished_resp.data or []:
+        # Jobs recorded before the boot id was added have no third part
+        job_host, job_pid, job_boot = (job["worker"].split(":") + ["", ""])[:3]
+        updated_at = datetime.fromisoformat(job["updated_at"].replace("Z", "+00:00"))
+        orphaned = job_host == host and job_pid == pid and job_boot != boot
+        if orphaned or updated_at < stale_before:
+            _update(job["id"], {
+                "status": "failed",
+                "error": "Interrupted: the worker stopped before the job finished",
+                "finished_at": _now()
+            })
+            recovered += 1
+    if recovered:
+        logger.warning(f"Marked {recovered} interrupted jobs as failed")
+    return recovered
+
+
+def shutdown() -> None:
+    """Stop taking jobs and let the running ones finish."""
+    _executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,99 @@
+"""
+Rotating refresh tokens (see sql/008_refresh_token_families.sql).
+
+A refresh token is a JWT naming a token family (one per device login) and its
+generation. It is signed with a key derived from SECRET_KEY, so it is never
+accepted where an access token is expected. Refreshing costs one signature check
+and one rpc: no password hashing and no login_attempts row.
+"""
+import hashlib
+import hmac
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Tuple
+
+from jose import JWTError, jwt
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.db.database import supabase
+
+
+class RefreshTokenError(Exception):
+    """The refresh token cannot be used; the client has to log in with its password."""
+
+
+def _signing_key() -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), b"refresh-token", hashlib.sha256).hexdigest()
+
+
+def _encode(family_id: str, generation: int, user_id: str, user_type: str, expires_at: datetime) -> str:
+    claims = {
+        "fam": family_id,
+        "gen": generation,
+        "sub": str(user_id),
+        "user_type": user_type,
+        "exp": expires_at,
+    }
+    return jwt.encode(claims, _signing_key(), algorithm=settings.ALGORITHM)
+
+
+def _decode(token: str) -> dict:
+    try:
+        return jwt.decode(token, _signing_key(), algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise RefreshTokenError("Invalid or expired refresh token")
+
+
+def issue(user_id: str, user_type: str) -> str:
+    """Open a token family for a password login and return its first refresh token."""
+    family_id = str(uuid.uuid4())
+    expires_at = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    supabase.table("refresh_token_families").insert({
+        "id": family_id,
+        "user_id": str(user_id),
+        "user_type": user_type,
+        "generation": 0,
+        "expires_at": expires_at.isoformat()
+    }).execute()
+    return _encode(family_id, 0, user_id, user_type, expires_at)
+
+
+def rotate(token: str) -> Tuple[str, str, str]:
+    """
+    Spend a refresh token and return (new refresh token, user id, user type). The
+    family keeps its expiry, so a device logs in with its password once per
+    REFRESH_TOKEN_EXPIRE_DAYS however often it refreshes.
+    """
+    claims = _decode(token)
+    rotate_resp = supabase.rpc("rotate_refresh_token", {
+        "p_family_id": claims["fam"],
+        "p_generation": claims["gen"]
+    }).execute()
+    outcome = rotate_resp.data or {}
+    status = outcome.get("status")
+    if status != "rotated":
+        if status == "reused":
+            logger.warning(f"Refresh token reuse for {claims['user_type']} {claims['sub']}; session revoked")
+        raise RefreshTokenError(
+            "Refresh token already used" if status == "superseded" else "Session has ended, please log in again"
+        )
+    expires_at = datetime.fromisoformat(outcome["expires_at"].replace("Z", "+00:00"))
+    new_token = _encode(claims["fam"], outcome["generation"], outcome["user_id"], outcome["user_type"], expires_at)
+    return new_token, outcome["user_id"], outcome["user_type"]
+
+
+def revoke(token: str) -> None:
+    """End the device session of a refresh token (logout)."""
+    claims = _decode(token)
+    supabase.table("refresh_token_families")\
+        .update({"revoked_at": datetime.now(timezone.utc).isoformat()})\
+        .eq("id", claims["fam"])\
+        .execute()
+
+
+def purge_expired() -> None:
+    try:
+        supabase.rpc("purge_expired_refresh_tokens").execute()
+    except Exception as e:
+        logger.error(f"Failed to purge expired refresh tokens: {e}")
@@ -0,0 +1,61 @@
+from typing import Optional
+
+from app.core.cache import TTLCache
+from app.core.logging import logger
+from app.db.database import supabase
+
+# Snapshots never change once written, so they only leave the cache by eviction
+_snapshots = TTLCache(maxsize=256, ttl=24 * 60 * 60)
+
+
+def snapshot_election(election_id: str, include_unvoted: bool = True) -> Optional[dict]:
+    """
+    Store the final results of a finished election (tally, turnout, per-program
+    breakdown and their sha256) and return the snapshot. Repeated calls return
+    the snapshot written first. include_unvoted lists the organization's current
+    candidates even without votes, which is only right as the election finishes.
+    """
+    snapshot_resp = supabase.rpc(
+        "snapshot_election_results",
+        {"p_election_id": election_id, "p_include_unvoted": include_unvoted}
+    ).execute()
+    snapshot = snapshot_resp.data
+    if isinstance(snapshot, list):
+        snapshot = snapshot[0] if snapshot else None
+    if not snapshot or not snapshot.get("election_id"):
+        return None
+    _snapshots.set(election_id, snapshot)
+    return snapshot
+
+
+def finalize_election(election_id: str) -> None:
+    """Snapshot an election that just finished; a failure is retried on first read."""
+    try:
+        snapshot_election(election_id)
+    except Exception as e:
+        logger.error(f"Failed to snapshot results of election {election_id}: {e}")
+
+
+def get_snapshot(election_id: str) -> Optional[dict]:
+    """The results snapshot of a finished election, creating it if it is missing."""
+    snapshot = _snapshots.get(election_id)
+    if snapshot is not None:
+        return snapshot
+
+    snapshot_resp = supabase.table("election_results")\
+        .select("election_id, organization_id, results, results_hash, created_at")\
+        .eq("election_id", election_id)\
+        .limit(1)\
+        .execute()
+    if snapshot_resp.data:
+        snapshot = snapshot_resp.data[0]
+        _snapshots.set(election_id, snapshot)
+        return snapshot
+    # Finished a while ago: the current slate may belong to a newer election
+    return snapshot_election(election_id, include_unvoted=False)
+
+
+def verify_snapshot(election_id: str) -> Optional[dict]:
+    """Recompute the hash of a stored snapshot and recount its candidates against the votes table."""
+    verify_resp = supabase.rpc("verify_election_results", {"p_election_id": election_id}).execute()
+    return verify_resp.data or None
@@ -0,0 +1,47 @@
+from typing import Optional
+
+from app.core.bus import bus
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.database import supabase
+
+PROFILE_COLUMNS = ("id", "student_no", "first_name", "last_name", "program", "year_level", "block")
+
+# Profiles of recently signed-in students by id, kept about as long as their access token
+_profiles = TTLCache(maxsize=20000, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+
+def remember(student: dict) -> dict:
+    """Cache the profile part of a students row (never the password hash)."""
+    profile = {column: student.get(column) for column in PROFILE_COLUMNS}
+    _profiles.set(profile["id"], profile)
+    return profile
+
+
+def get_profile(student_id: str) -> Optional[dict]:
+    """A student's profile, from the cache or the database; None if there is no such student."""
+    profile = _profiles.get(student_id)
+    if profile is not None:
+        return profile
+    student_resp = supabase.table("students")\
+        .select(", ".join(PROFILE_COLUMNS))\
+        .eq("id", student_id)\
+        .limit(1)\
+        .execute()
+    if not student_resp.data:
+        return None
+    return remember(student_resp.data[0])
+
+
+def full_name(profile: dict) -> str:
+    return f"{profile['first_name']} {profile['last_name']}".upper()
+
+
+def _on_students_changed(message: dict) -> None:
+    if message.get("student_id"):
+        _profiles.invalidate(message["student_id"])
+    else:
+        _profiles.clear()
+
+
+bus.subscribe("students", _on_students_changed)
@@ -3,12 +3,10 @@ import os
 import uuid
 from fastapi import UploadFile
 import aiofiles
-from PIL import Image
 import io
 
 # Define your storage settings
 UPLOAD_DIR = "uploads/candidates"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 async def save_upload_file(upload_file: UploadFile) -> str:
     """Save an uploaded file and return the file path."""
@@ -28,6 +26,8 @@ async def save_upload_file(upload_file: UploadFile) -> str:
     
     # Optimize image if it's an image
     if file_extension.lower() in ['.jpg', '.jpeg', '.png']:
+        # PIL is only needed here, so keep it out of application startup
+        from PIL import Image
         # Open and resize image to a reasonable size
         with Image.open(file_path) as img:
             # Resize if the image is too large (e.g., > 1000px)
@@ -42,4 +42,82 @@ async def save_upload_file(upload_file: UploadFile) -> str:
             img.save(file_path, optimize=True, quality=85)
     
     # Return relative path
-    return f"/{UPLOAD_DIR}/{new_filename}"
\ No newline at end of file
+    return f"/{UPLOAD_DIR}/{new_filename}"
+
+# Candidate photos live under backend/uploads/candidates and are served from /uploads
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+THUMBNAIL_SIZE = 256
+
+def ensure_thumbnail(photo_url: str):
+    """Create a small copy of a locally stored candidate photo and return its URL."""
+    if not photo_url or not photo_url.startswith("/uploads/candidates/"):
+        return None
+    filename = os.path.basename(photo_url)
+    source_path = os.path.join(BACKEND_DIR, "uploads", "candidates", filename)
+    thumb_path = os.path.join(BACKEND_DIR, "uploads", "candidates", "thumbs", filename)
+    if not os.path.exists(thumb_path):
+        if not os.path.exists(source_path):
+            return None
+        os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+        try:
+            from PIL import Image
+            with Image.open(source_path) as img:
+                img.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+                img.save(thumb_path, optimize=True, quality=85)
+        except Exception as e:
+            print(f"Failed to create thumbnail for {photo_url}: {e}")
+            return None
+    return f"/uploads/candidates/thumbs/{filename}"
+
+def photo_variants(photo_url: str) -> dict:
+    """URLs of every size available for a candidate photo."""
+    if not photo_url:
+        return {"original": None, "thumbnail": None}
+    return {
+        "original": photo_url,
+        "thumbnail": ensure_thumbnail(photo_url) or photo_url
+    }
+
+# Largest side of a stored candidate photo
+MAX_PHOTO_SIDE = 1000
+
+def save_photo_bytes(data: bytes, extension: str) -> str:
+    """
+    Store candidate photo bytes under uploads/candidates (resized like uploads, with
+    a thumbnail) and return their URL. Raises ValueError if the bytes are not an image.
+    """
+    from PIL import Image
+
+    extension = extension.lower()
+    filename = f"{uuid.uuid4()}{extension}"
+    file_path = os.path.join(BACKEND_DIR, "uploads", "candidates", filename)
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.load()
+            if extension in [".jpg", ".jpeg", ".png"]:
+                if img.width > MAX_PHOTO_SIDE or img.height > MAX_PHOTO_SIDE:
+                    img.thumbnail((MAX_PHOTO_SIDE, MAX_PHOTO_SIDE), Image.LANCZOS)
+                if extension != ".png" and img.mode not in ("RGB", "L"):
+                    img = img.convert("RGB")
+                img.save(file_path, optimize=True, quality=85)
+            else:
+                with open(file_path, "wb") as out_file:
+                    out_file.write(data)
+    except Exception as e:
+        # PIL raises OSError, SyntaxError or DecompressionBombError for bad input
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise ValueError(f"not a readable image ({e})")
+    photo_url = f"/uploads/candidates/{filename}"
+    ensure_thumbnail(photo_url)
+    return photo_url
+
+def remove_photo(photo_url: str) -> None:
+    """Delete a stored candidate photo and its thumbnail."""
+    filename = os.path.basename(photo_url)
+    for path in (
+        os.path.join(BACKEND_DIR, "uploads", "candidates", filename),
+        os.path.join(BACKEND_DIR, "uploads", "candidates", "thumbs", filename)
+    ):
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,26 @@
+# Multi-worker deployment: gunicorn -c gunicorn.conf.py app.main:app
+#
+# Every worker keeps its own in-memory caches. The gunicorn master runs a small
+# broker that relays cache invalidations between workers (see app/core/bus.py),
+# and rate-limit buckets are shared through a SQLite file.
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+keepalive = 5
+
+# Inherited by the workers when they are forked
+os.environ.setdefault("CACHE_BUS_URL", "tcp://127.0.0.1:8765")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "sqlite")
+
+
+def when_ready(server):
+    from urllib.parse import urlparse
+    from app.core.bus import BrokerServer
+
+    bus_url = urlparse(os.environ["CACHE_BUS_URL"])
+    broker = BrokerServer(bus_url.hostname or "127.0.0.1", bus_url.port or 8765)
+    broker.serve_in_thread()
+    server.log.info(f"Cache bus broker listening on {bus_url.hostname}:{bus_url.port}")
@@ -0,0 +1,54 @@
+-- Aggregate turnout statistics for GET /elections/statistics.
+-- Counts are computed in the database so the API never downloads the
+-- students or votes tables to count them.
+
+create index if not exists votes_election_student_idx
+    on public.votes (election_id, student_id);
+
+create index if not exists students_program_idx
+    on public.students (program);
+
+create or replace function public.election_turnout_statistics()
+returns jsonb
+language sql
+stable
+as $$
+    with ongoing as (
+        select e.id, o.name as organization_name
+        from public.elections e
+        join public.organizations o on o.id = e.organization_id
+        where e.status = 'ongoing'
+    ),
+    students_by_program as (
+        select program, count(*) as total
+        from public.students
+        group by program
+    ),
+    candidates_by_org as (
+        select o.name as organization_name, count(*) as total
+        from public.candidates c
+        join public.organizations o on o.id = c.organization_id
+        where c.is_archived = false
+        group by o.name
+    ),
+    voted_by_org as (
+        select og.organization_name, count(distinct v.student_id) as total
+        from ongoing og
+        join public.votes v on v.election_id = og.id
+        group by og.organization_name
+    ),
+    voted_by_program as (
+        select s.program, count(distinct v.student_id) as total
+        from public.votes v
+        join public.students s on s.id = v.student_id
+        where v.election_id in (select id from ongoing)
+        group by s.program
+    )
+    select jsonb_build_object(
+        'total_students', (select count(*) from public.students),
+        'students_by_program', coalesce((select jsonb_object_agg(program, total) from students_by_program), '{}'::jsonb),
+        'candidates_by_org', coalesce((select jsonb_object_agg(organization_name, total) from candidates_by_org), '{}'::jsonb),
+        'voted_by_org', coalesce((select jsonb_object_agg(organization_name, total) from voted_by_org), '{}'::jsonb),
+        'voted_by_program', coalesce((select jsonb_object_agg(program, total) from voted_by_program), '{}'::jsonb)
+    );
+$$;
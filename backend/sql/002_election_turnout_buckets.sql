@@ -0,0 +1,53 @@
+-- Per-minute, per-program turnout buckets for each election.
+-- Incremented once per accepted ballot by record_turnout() and rebuildable
+-- from votes.created_at with rebuild_turnout_buckets().
+
+create table if not exists public.election_turnout_buckets (
+    election_id uuid not null references public.elections (id) on delete cascade,
+    bucket_start timestamptz not null,
+    program text not null,
+    ballots integer not null default 0,
+    primary key (election_id, bucket_start, program)
+);
+
+create or replace function public.record_turnout(
+    p_election_id uuid,
+    p_student_id uuid,
+    p_at timestamptz default now()
+)
+returns void
+language sql
+as $$
+    insert into public.election_turnout_buckets (election_id, bucket_start, program, ballots)
+    select p_election_id, date_trunc('minute', p_at), coalesce(s.program, 'UNKNOWN'), 1
+    from (select 1) as one
+    left join public.students s on s.id = p_student_id
+    on conflict (election_id, bucket_start, program)
+    do update set ballots = public.election_turnout_buckets.ballots + 1;
+$$;
+
+create or replace function public.rebuild_turnout_buckets(p_election_id uuid)
+returns integer
+language plpgsql
+as $$
+declare
+    rebuilt integer;
+begin
+    delete from public.election_turnout_buckets where election_id = p_election_id;
+
+    -- A ballot is counted in the minute of the student's first vote row
+    insert into public.election_turnout_buckets (election_id, bucket_start, program, ballots)
+    select p_election_id, date_trunc('minute', b.voted_at), coalesce(s.program, 'UNKNOWN'), count(*)
+    from (
+        select student_id, min(created_at) as voted_at
+        from public.votes
+        where election_id = p_election_id
+        group by student_id
+    ) b
+    left join public.students s on s.id = b.student_id
+    group by 2, 3;
+
+    get diagnostics rebuilt = row_count;
+    return rebuilt;
+end;
+$$;
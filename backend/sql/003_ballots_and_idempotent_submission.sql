@@ -0,0 +1,85 @@
+-- One ballot per (election, student), enforced by the database, plus an
+-- atomic submit_ballot() that replays the original result for a repeated
+-- idempotency key instead of re-running the checks.
+
+create table if not exists public.ballots (
+    id uuid primary key default gen_random_uuid(),
+    election_id uuid not null references public.elections (id) on delete cascade,
+    student_id uuid not null references public.students (id) on delete cascade,
+    idempotency_key text,
+    created_at timestamptz not null default now(),
+    constraint ballots_election_student_key unique (election_id, student_id)
+);
+
+create unique index if not exists ballots_idempotency_key_idx
+    on public.ballots (idempotency_key)
+    where idempotency_key is not null;
+
+-- Backfill ballots for votes cast before this table existed
+insert into public.ballots (election_id, student_id, created_at)
+select election_id, student_id, min(created_at)
+from public.votes
+group by election_id, student_id
+on conflict (election_id, student_id) do nothing;
+
+create or replace function public.submit_ballot(
+    p_election_id uuid,
+    p_student_id uuid,
+    p_candidate_ids uuid[],
+    p_idempotency_key text default null,
+    p_at timestamptz default now()
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    existing public.ballots%rowtype;
+    election_status text;
+    new_ballot public.ballots%rowtype;
+begin
+    -- A replay returns the original result without re-running any checks
+    if p_idempotency_key is not null then
+        select * into existing from public.ballots where idempotency_key = p_idempotency_key;
+        if found then
+            if existing.election_id <> p_election_id or existing.student_id <> p_student_id then
+                return jsonb_build_object('status', 'key_conflict');
+            end if;
+            return jsonb_build_object('status', 'replayed', 'ballot_id', existing.id, 'submitted_at', existing.created_at);
+        end if;
+    end if;
+
+    select status into election_status from public.elections where id = p_election_id;
+    if not found then
+        return jsonb_build_object('status', 'election_not_found');
+    end if;
+    if election_status <> 'ongoing' then
+        return jsonb_build_object('status', 'election_inactive');
+    end if;
+
+    insert into public.ballots (election_id, student_id, idempotency_key, created_at)
+    values (p_election_id, p_student_id, p_idempotency_key, p_at)
+    on conflict (election_id, student_id) do nothing
+    returning * into new_ballot;
+
+    if not found then
+        -- A concurrent request with the same key won the race: treat this one as its replay
+        select * into existing from public.ballots
+        where election_id = p_election_id and student_id = p_student_id;
+        if p_idempotency_key is not null and existing.idempotency_key = p_idempotency_key then
+            return jsonb_build_object('status', 'replayed', 'ballot_id', existing.id, 'submitted_at', existing.created_at);
+        end if;
+        return jsonb_build_object('status', 'already_voted');
+    end if;
+
+    insert into public.votes (election_id, candidate_id, student_id, created_at)
+    select p_election_id, candidate_id, p_student_id, p_at
+    from unnest(p_candidate_ids) as candidate_id;
+
+    perform public.record_turnout(p_election_id, p_student_id, p_at);
+
+    return jsonb_build_object('status', 'recorded', 'ballot_id', new_ballot.id, 'submitted_at', new_ballot.created_at);
+exception
+    when unique_violation then
+        return jsonb_build_object('status', 'key_conflict');
+end;
+$$;
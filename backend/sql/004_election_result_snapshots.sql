@@ -0,0 +1,185 @@
+-- Immutable final results. When an election finishes its tally, turnout and
+-- per-program breakdown are computed once and stored with a sha256 of the
+-- snapshot, so GET /elections/results never recounts votes for a finished
+-- election and auditors can check the stored figures against the votes table.
+
+create table if not exists public.election_results (
+    election_id uuid primary key references public.elections (id) on delete cascade,
+    organization_id uuid not null references public.organizations (id) on delete cascade,
+    results jsonb not null,
+    results_hash text not null,
+    created_at timestamptz not null default now()
+);
+
+-- Snapshots are write-once: never updated and never deleted directly. Deleting
+-- the election or organization still removes its snapshot through the on delete
+-- cascade, whose delete runs from the foreign key's own trigger (depth > 1).
+create or replace function public.election_results_immutable()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op = 'DELETE' and pg_trigger_depth() > 1 then
+        return old;
+    end if;
+    raise exception 'election_results rows are immutable';
+end;
+$$;
+
+drop trigger if exists election_results_no_update on public.election_results;
+create trigger election_results_no_update
+    before update or delete on public.election_results
+    for each row execute function public.election_results_immutable();
+
+-- The final tally of one election, as stored in election_results.results.
+-- Every candidate that received a vote is listed. With p_include_unvoted (a
+-- snapshot taken as the election finishes) the organization's unarchived
+-- candidates are listed too, with 0 votes if nobody picked them; a snapshot
+-- taken later cannot tell the election's slate from a newer one, so it only
+-- lists candidates that received ballots.
+create or replace function public.election_final_tally(p_election_id uuid, p_include_unvoted boolean default true)
+returns jsonb
+language sql
+stable
+as $$
+    with election as (
+        select e.id, e.organization_id, e.eligible_voters, e.created_at, e.duration_hours
+        from public.elections e
+        where e.id = p_election_id
+    ),
+    ballot_candidates as (
+        -- The unarchived slate is this election's only while no newer election exists
+        select c.id, c.name, c.position
+        from public.candidates c
+        join election e on e.organization_id = c.organization_id
+        where p_include_unvoted
+          and c.is_archived = false
+          and not exists (
+              select 1 from public.elections later
+              where later.organization_id = e.organization_id
+                and later.created_at > e.created_at
+          )
+        union
+        select c.id, c.name, c.position
+        from public.candidates c
+        where c.id in (select candidate_id from public.votes where election_id = p_election_id)
+    ),
+    candidate_votes as (
+        select bc.id, bc.name, bc.position, count(v.id) as vote_count
+        from ballot_candidates bc
+        left join public.votes v on v.candidate_id = bc.id and v.election_id = p_election_id
+        group by bc.id, bc.name, bc.position
+    ),
+    positions as (
+        select position as name,
+               jsonb_agg(
+                   jsonb_build_object('id', id, 'name', name, 'vote_count', vote_count)
+                   order by vote_count desc, name
+               ) as candidates
+        from candidate_votes
+        group by position
+    ),
+    eligible as (
+        -- eligible_voters is "All CCS Students" or "<PROGRAM> Students"
+        select s.program
+        from public.students s, election e
+        where e.eligible_voters is null
+           or e.eligible_voters ilike 'all%'
+           or s.program = upper(split_part(e.eligible_voters, ' ', 1))
+    ),
+    voters as (
+        select distinct v.student_id, s.program
+        from public.votes v
+        left join public.students s on s.id = v.student_id
+        where v.election_id = p_election_id
+    ),
+    programs as (
+        select program,
+               count(*) filter (where source = 'eligible') as eligible,
+               count(*) filter (where source = 'voted') as voted
+        from (
+            select program, 'eligible' as source from eligible
+            union all
+            select program, 'voted' as source from voters
+        ) counted
+        where program is not null
+        group by program
+    )
+    select jsonb_build_object(
+        'election_id', e.id,
+        'organization_id', e.organization_id,
+        'started_at', e.created_at,
+        'duration_hours', e.duration_hours,
+        'positions', coalesce((select jsonb_agg(jsonb_build_object('name', name, 'candidates', candidates) order by name) from positions), '[]'::jsonb),
+        'turnout', jsonb_build_object(
+            'eligible', (select count(*) from eligible),
+            'voted', (select count(*) from voters)
+        ),
+        'by_program', coalesce((select jsonb_object_agg(program, jsonb_build_object('eligible', eligible, 'voted', voted)) from programs), '{}'::jsonb)
+    )
+    from election e;
+$$;
+
+-- Store the snapshot of a finished election, or return the existing one
+create or replace function public.snapshot_election_results(p_election_id uuid, p_include_unvoted boolean default true)
+returns public.election_results
+language plpgsql
+as $$
+declare
+    snapshot public.election_results%rowtype;
+    tally jsonb;
+begin
+    select * into snapshot from public.election_results where election_id = p_election_id;
+    if found then
+        return snapshot;
+    end if;
+
+    tally := public.election_final_tally(p_election_id, p_include_unvoted);
+    if tally is null then
+        return null;
+    end if;
+
+    insert into public.election_results (election_id, organization_id, results, results_hash)
+    values (
+        p_election_id,
+        (tally ->> 'organization_id')::uuid,
+        tally,
+        encode(sha256(convert_to(tally::text, 'UTF8')), 'hex')
+    )
+    on conflict (election_id) do nothing;
+
+    select * into snapshot from public.election_results where election_id = p_election_id;
+    return snapshot;
+end;
+$$;
+
+-- Audit check: the stored hash against the stored results, and every
+-- snapshotted vote count against the votes table
+create or replace function public.verify_election_results(p_election_id uuid)
+returns jsonb
+language sql
+stable
+as $$
+    select jsonb_build_object(
+        'election_id', r.election_id,
+        'results_hash', r.results_hash,
+        'computed_hash', encode(sha256(convert_to(r.results::text, 'UTF8')), 'hex'),
+        'mismatched_candidates', (
+            select count(*)
+            from jsonb_array_elements(r.results -> 'positions') p,
+                 jsonb_array_elements(p -> 'candidates') c
+            where (c ->> 'vote_count')::bigint <> (
+                select count(*) from public.votes v
+                where v.election_id = r.election_id and v.candidate_id = (c ->> 'id')::uuid
+            )
+        ),
+        'created_at', r.created_at
+    )
+    from public.election_results r
+    where r.election_id = p_election_id;
+$$;
+
+-- Backfill elections that finished before snapshots existed, from their ballots only
+select public.snapshot_election_results(id, false)
+from public.elections
+where status = 'finished';
@@ -0,0 +1,288 @@
+-- Materialized eligibility. When an election starts, the ids of the students
+-- allowed to vote in it are written to election_eligible_voters and their
+-- count to elections.eligible_count. submit_ballot() rejects other students,
+-- and turnout denominators come from the count instead of a students scan.
+
+alter table public.elections
+    add column if not exists eligible_count integer;
+
+create table if not exists public.election_eligible_voters (
+    election_id uuid not null references public.elections (id) on delete cascade,
+    student_id uuid not null references public.students (id) on delete cascade,
+    program text,
+    primary key (election_id, student_id)
+);
+
+-- The programs whose students may vote in an election, or null for every student.
+-- An eligible_voters value of "<PROGRAM> Students" names one program; otherwise
+-- the organization decides: ELITES is BSIT, SPECS is BSCS, IMAGES is BSEMC and
+-- the CCS Student Council is open to all students.
+create or replace function public.election_eligible_programs(p_organization_name text, p_eligible_voters text)
+returns text[]
+language sql
+immutable
+as $$
+    select case
+        when upper(split_part(coalesce(p_eligible_voters, ''), ' ', 1)) in ('BSIT', 'BSCS', 'BSEMC')
+            then array[upper(split_part(p_eligible_voters, ' ', 1))]
+        when p_organization_name = 'ELITES' then array['BSIT']
+        when p_organization_name = 'SPECS' then array['BSCS']
+        when p_organization_name = 'IMAGES' then array['BSEMC']
+        else null
+    end;
+$$;
+
+-- Write the eligible voters of an election and return how many there are
+create or replace function public.materialize_election_eligibility(p_election_id uuid)
+returns integer
+language plpgsql
+as $$
+declare
+    programs text[];
+    eligible integer;
+begin
+    select public.election_eligible_programs(o.name, e.eligible_voters) into programs
+    from public.elections e
+    join public.organizations o on o.id = e.organization_id
+    where e.id = p_election_id;
+    if not found then
+        return null;
+    end if;
+
+    delete from public.election_eligible_voters where election_id = p_election_id;
+
+    insert into public.election_eligible_voters (election_id, student_id, program)
+    select p_election_id, s.id, s.program
+    from public.students s
+    where programs is null or s.program = any (programs);
+
+    get diagnostics eligible = row_count;
+    update public.elections set eligible_count = eligible where id = p_election_id;
+    return eligible;
+end;
+$$;
+
+create or replace function public.submit_ballot(
+    p_election_id uuid,
+    p_student_id uuid,
+    p_candidate_ids uuid[],
+    p_idempotency_key text default null,
+    p_at timestamptz default now()
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    existing public.ballots%rowtype;
+    election_status text;
+    election_eligible_count integer;
+    new_ballot public.ballots%rowtype;
+begin
+    -- A replay returns the original result without re-running any checks
+    if p_idempotency_key is not null then
+        select * into existing from public.ballots where idempotency_key = p_idempotency_key;
+        if found then
+            if existing.election_id <> p_election_id or existing.student_id <> p_student_id then
+                return jsonb_build_object('status', 'key_conflict');
+            end if;
+            return jsonb_build_object('status', 'replayed', 'ballot_id', existing.id, 'submitted_at', existing.created_at);
+        end if;
+    end if;
+
+    select status, eligible_count into election_status, election_eligible_count
+    from public.elections where id = p_election_id;
+    if not found then
+        return jsonb_build_object('status', 'election_not_found');
+    end if;
+    if election_status <> 'ongoing' then
+        return jsonb_build_object('status', 'election_inactive');
+    end if;
+    -- Elections started before eligibility was materialized have no eligible_count
+    if election_eligible_count is not null and not exists (
+        select 1 from public.election_eligible_voters
+        where election_id = p_election_id and student_id = p_student_id
+    ) then
+        return jsonb_build_object('status', 'not_eligible');
+    end if;
+
+    insert into public.ballots (election_id, student_id, idempotency_key, created_at)
+    values (p_election_id, p_student_id, p_idempotency_key, p_at)
+    on conflict (election_id, student_id) do nothing
+    returning * into new_ballot;
+
+    if not found then
+        -- A concurrent request with the same key won the race: treat this one as its replay
+        select * into existing from public.ballots
+        where election_id = p_election_id and student_id = p_student_id;
+        if p_idempotency_key is not null and existing.idempotency_key = p_idempotency_key then
+            return jsonb_build_object('status', 'replayed', 'ballot_id', existing.id, 'submitted_at', existing.created_at);
+        end if;
+        return jsonb_build_object('status', 'already_voted');
+    end if;
+
+    insert into public.votes (election_id, candidate_id, student_id, created_at)
+    select p_election_id, candidate_id, p_student_id, p_at
+    from unnest(p_candidate_ids) as candidate_id;
+
+    perform public.record_turnout(p_election_id, p_student_id, p_at);
+
+    return jsonb_build_object('status', 'recorded', 'ballot_id', new_ballot.id, 'submitted_at', new_ballot.created_at);
+exception
+    when unique_violation then
+        return jsonb_build_object('status', 'key_conflict');
+end;
+$$;
+
+-- Final tallies take the eligible count from the materialized voters, when the
+-- election has any
+create or replace function public.election_final_tally(p_election_id uuid, p_include_unvoted boolean default true)
+returns jsonb
+language sql
+stable
+as $$
+    with election as (
+        select e.id, e.organization_id, e.eligible_voters, e.created_at, e.duration_hours,
+               public.election_eligible_programs(o.name, e.eligible_voters) as eligible_programs
+        from public.elections e
+        join public.organizations o on o.id = e.organization_id
+        where e.id = p_election_id
+    ),
+    ballot_candidates as (
+        -- The unarchived slate is this election's only while no newer election exists
+        select c.id, c.name, c.position
+        from public.candidates c
+        join election e on e.organization_id = c.organization_id
+        where p_include_unvoted
+          and c.is_archived = false
+          and not exists (
+              select 1 from public.elections later
+              where later.organization_id = e.organization_id
+                and later.created_at > e.created_at
+          )
+        union
+        select c.id, c.name, c.position
+        from public.candidates c
+        where c.id in (select candidate_id from public.votes where election_id = p_election_id)
+    ),
+    candidate_votes as (
+        select bc.id, bc.name, bc.position, count(v.id) as vote_count
+        from ballot_candidates bc
+        left join public.votes v on v.candidate_id = bc.id and v.election_id = p_election_id
+        group by bc.id, bc.name, bc.position
+    ),
+    positions as (
+        select position as name,
+               jsonb_agg(
+                   jsonb_build_object('id', id, 'name', name, 'vote_count', vote_count)
+                   order by vote_count desc, name
+               ) as candidates
+        from candidate_votes
+        group by position
+    ),
+    materialized as (
+        select ev.program
+        from public.election_eligible_voters ev
+        where ev.election_id = p_election_id
+    ),
+    eligible as (
+        select program from materialized
+        union all
+        -- Elections started before materialization apply the same rule as
+        -- materialize_election_eligibility(), so "All CCS Students" in an
+        -- ELITES election still means the BSIT students only
+        select s.program
+        from public.students s, election e
+        where not exists (select 1 from materialized)
+          and (e.eligible_programs is null or s.program = any (e.eligible_programs))
+    ),
+    voters as (
+        select distinct v.student_id, s.program
+        from public.votes v
+        left join public.students s on s.id = v.student_id
+        where v.election_id = p_election_id
+    ),
+    programs as (
+        select program,
+               count(*) filter (where source = 'eligible') as eligible,
+               count(*) filter (where source = 'voted') as voted
+        from (
+            select program, 'eligible' as source from eligible
+            union all
+            select program, 'voted' as source from voters
+        ) counted
+        where program is not null
+        group by program
+    )
+    select jsonb_build_object(
+        'election_id', e.id,
+        'organization_id', e.organization_id,
+        'started_at', e.created_at,
+        'duration_hours', e.duration_hours,
+        'positions', coalesce((select jsonb_agg(jsonb_build_object('name', name, 'candidates', candidates) order by name) from positions), '[]'::jsonb),
+        'turnout', jsonb_build_object(
+            'eligible', (select count(*) from eligible),
+            'voted', (select count(*) from voters)
+        ),
+        'by_program', coalesce((select jsonb_object_agg(program, jsonb_build_object('eligible', eligible, 'voted', voted)) from programs), '{}'::jsonb)
+    )
+    from election e;
+$$;
+
+-- Statistics report the eligible voters of each ongoing election
+create or replace function public.election_turnout_statistics()
+returns jsonb
+language sql
+stable
+as $$
+    with ongoing as (
+        select e.id, o.name as organization_name
+        from public.elections e
+        join public.organizations o on o.id = e.organization_id
+        where e.status = 'ongoing'
+    ),
+    students_by_program as (
+        select program, count(*) as total
+        from public.students
+        group by program
+    ),
+    candidates_by_org as (
+        select o.name as organization_name, count(*) as total
+        from public.candidates c
+        join public.organizations o on o.id = c.organization_id
+        where c.is_archived = false
+        group by o.name
+    ),
+    voted_by_org as (
+        select og.organization_name, count(distinct v.student_id) as total
+        from ongoing og
+        join public.votes v on v.election_id = og.id
+        group by og.organization_name
+    ),
+    eligible_by_org as (
+        select o.name as organization_name, sum(e.eligible_count) as total
+        from public.elections e
+        join public.organizations o on o.id = e.organization_id
+        where e.status = 'ongoing' and e.eligible_count is not null
+        group by o.name
+    ),
+    voted_by_program as (
+        select s.program, count(distinct v.student_id) as total
+        from public.votes v
+        join public.students s on s.id = v.student_id
+        where v.election_id in (select id from ongoing)
+        group by s.program
+    )
+    select jsonb_build_object(
+        'total_students', (select count(*) from public.students),
+        'students_by_program', coalesce((select jsonb_object_agg(program, total) from students_by_program), '{}'::jsonb),
+        'candidates_by_org', coalesce((select jsonb_object_agg(organization_name, total) from candidates_by_org), '{}'::jsonb),
+        'voted_by_org', coalesce((select jsonb_object_agg(organization_name, total) from voted_by_org), '{}'::jsonb),
+        'eligible_by_org', coalesce((select jsonb_object_agg(organization_name, total) from eligible_by_org), '{}'::jsonb),
+        'voted_by_program', coalesce((select jsonb_object_agg(program, total) from voted_by_program), '{}'::jsonb)
+    );
+$$;
+
+-- Materialize the elections that are still running
+select public.materialize_election_eligibility(id)
+from public.elections
+where status = 'ongoing' and eligible_count is null;
@@ -0,0 +1,28 @@
+-- Background jobs run by the API's in-process worker pool. The row is the
+-- job's durable state: clients poll it through GET /jobs/{id}, and a restarted
+-- worker marks the jobs it was running as failed instead of leaving them running.
+
+create table if not exists public.jobs (
+    id uuid primary key default gen_random_uuid(),
+    kind text not null,
+    status text not null default 'queued'
+        check (status in ('queued', 'running', 'succeeded', 'failed')),
+    progress_done integer not null default 0,
+    progress_total integer,
+    result jsonb,
+    error text,
+    -- "hostname:pid" of the process that owns the job
+    worker text not null,
+    created_by text,
+    created_at timestamptz not null default now(),
+    started_at timestamptz,
+    finished_at timestamptz,
+    updated_at timestamptz not null default now()
+);
+
+create index if not exists jobs_worker_status_idx
+    on public.jobs (worker, status)
+    where status in ('queued', 'running');
+
+create index if not exists jobs_created_at_idx
+    on public.jobs (created_at desc);
@@ -0,0 +1,133 @@
+-- Election deadlines stored once, when the election starts, instead of being
+-- recomputed from created_at + duration_hours by every reader. Expiry becomes
+-- one set-based UPDATE over the ongoing elections whose deadline has passed.
+
+alter table public.elections
+    add column if not exists ends_at timestamptz;
+
+-- Elections already running or finished get the deadline they had. A created_at
+-- without time zone is UTC (Supabase sessions run in UTC), as the API reads it.
+update public.elections
+set ends_at = created_at::timestamptz + make_interval(hours => duration_hours)
+where ends_at is null and status in ('ongoing', 'finished');
+
+create index if not exists elections_ongoing_ends_at_idx
+    on public.elections (ends_at)
+    where status = 'ongoing';
+
+-- Every way of starting an election (insert as ongoing, or a status change to
+-- ongoing) fixes the deadline from the start time and the duration
+create or replace function public.set_election_deadline()
+returns trigger
+language plpgsql
+as $$
+begin
+    if new.status = 'ongoing' then
+        if tg_op = 'INSERT' then
+            new.ends_at := coalesce(new.ends_at, coalesce(new.created_at::timestamptz, now()) + make_interval(hours => new.duration_hours));
+        elsif old.status is distinct from 'ongoing' then
+            -- A not_started election runs from the moment it is started
+            new.ends_at := now() + make_interval(hours => new.duration_hours);
+        end if;
+    end if;
+    return new;
+end;
+$$;
+
+drop trigger if exists elections_set_deadline on public.elections;
+create trigger elections_set_deadline
+    before insert or update of status on public.elections
+    for each row execute function public.set_election_deadline();
+
+-- Finish every ongoing election past its deadline and deactivate its
+-- organization; returns the finished elections so the API can snapshot them
+create or replace function public.finish_expired_elections()
+returns table (election_id uuid, organization_id uuid)
+language sql
+as $$
+    with finished as (
+        update public.elections
+        set status = 'finished'
+        where status = 'ongoing' and ends_at < now()
+        returning id, organization_id
+    ), deactivated as (
+        update public.organizations o
+        set is_active = false
+        from finished f
+        where o.id = f.organization_id
+    )
+    select id, organization_id from finished;
+$$;
+
+create or replace function public.submit_ballot(
+    p_election_id uuid,
+    p_student_id uuid,
+    p_candidate_ids uuid[],
+    p_idempotency_key text default null,
+    p_at timestamptz default now()
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    existing public.ballots%rowtype;
+    election_status text;
+    election_ends_at timestamptz;
+    election_eligible_count integer;
+    new_ballot public.ballots%rowtype;
+begin
+    -- A replay returns the original result without re-running any checks
+    if p_idempotency_key is not null then
+        select * into existing from public.ballots where idempotency_key = p_idempotency_key;
+        if found then
+            if existing.election_id <> p_election_id or existing.student_id <> p_student_id then
+                return jsonb_build_object('status', 'key_conflict');
+            end if;
+            return jsonb_build_object('status', 'replayed', 'ballot_id', existing.id, 'submitted_at', existing.created_at);
+        end if;
+    end if;
+
+    select status, ends_at, eligible_count into election_status, election_ends_at, election_eligible_count
+    from public.elections where id = p_election_id;
+    if not found then
+        return jsonb_build_object('status', 'election_not_found');
+    end if;
+    -- Past its deadline an election is closed even before the expiry sweep has run
+    if election_status <> 'ongoing' or election_ends_at <= p_at then
+        return jsonb_build_object('status', 'election_inactive');
+    end if;
+    -- Elections started before eligibility was materialized have no eligible_count
+    if election_eligible_count is not null and not exists (
+        select 1 from public.election_eligible_voters
+        where election_id = p_election_id and student_id = p_student_id
+    ) then
+        return jsonb_build_object('status', 'not_eligible');
+    end if;
+
+    insert into public.ballots (election_id, student_id, idempotency_key, created_at)
+    values (p_election_id, p_student_id, p_idempotency_key, p_at)
+    on conflict (election_id, student_id) do nothing
+    returning * into new_ballot;
+
+    if not found then
+        -- A concurrent request with the same key won the race: treat this one as its replay
+        select * into existing from public.ballots
+        where election_id = p_election_id and student_id = p_student_id;
+        if p_idempotency_key is not null and existing.idempotency_key = p_idempotency_key then
+            return jsonb_build_object('status', 'replayed', 'ballot_id', existing.id, 'submitted_at', existing.created_at);
+        end if;
+        return jsonb_build_object('status', 'already_voted');
+    end if;
+
+    insert into public.votes (election_id, candidate_id, student_id, created_at)
+    select p_election_id, candidate_id, p_student_id, p_at
+    from unnest(p_candidate_ids) as candidate_id;
+
+    perform public.record_turnout(p_election_id, p_student_id, p_at);
+
+    return jsonb_build_object('status', 'recorded', 'ballot_id', new_ballot.id, 'submitted_at', new_ballot.created_at);
+exception
+    when unique_violation then
+        return jsonb_build_object('status', 'key_conflict');
+end;
+$$;
@@ -0,0 +1,74 @@
+-- Rotating refresh tokens. A password login opens one family per device; the
+-- refresh token carries the family id and its generation, so the whole
+-- revocation state of a device session is this one small row. Each refresh
+-- bumps the generation, which makes the previous token unusable.
+
+create table if not exists public.refresh_token_families (
+    id uuid primary key,
+    user_id uuid not null,
+    user_type text not null check (user_type in ('student', 'admin')),
+    generation integer not null default 0,
+    expires_at timestamptz not null,
+    revoked_at timestamptz,
+    refreshed_at timestamptz,
+    created_at timestamptz not null default now()
+);
+
+create index if not exists refresh_token_families_expires_at_idx
+    on public.refresh_token_families (expires_at);
+
+create or replace function public.rotate_refresh_token(p_family_id uuid, p_generation integer)
+returns jsonb
+language plpgsql
+as $$
+declare
+    family public.refresh_token_families%rowtype;
+begin
+    update public.refresh_token_families
+    set generation = generation + 1, refreshed_at = now()
+    where id = p_family_id
+      and generation = p_generation
+      and revoked_at is null
+      and expires_at > now()
+    returning * into family;
+    if found then
+        return jsonb_build_object(
+            'status', 'rotated',
+            'generation', family.generation,
+            'user_id', family.user_id,
+            'user_type', family.user_type,
+            'expires_at', family.expires_at
+        );
+    end if;
+
+    select * into family from public.refresh_token_families where id = p_family_id;
+    if not found then
+        return jsonb_build_object('status', 'unknown');
+    end if;
+    if family.revoked_at is not null then
+        return jsonb_build_object('status', 'revoked');
+    end if;
+    if family.expires_at <= now() then
+        return jsonb_build_object('status', 'expired');
+    end if;
+    -- Two tabs of one browser refreshing together: the loser just retries with the stored token
+    if family.generation = p_generation + 1 and family.refreshed_at > now() - interval '30 seconds' then
+        return jsonb_build_object('status', 'superseded');
+    end if;
+    -- An older token came back: it was copied, so end the session on every device holding it
+    update public.refresh_token_families set revoked_at = now() where id = p_family_id;
+    return jsonb_build_object('status', 'reused');
+end;
+$$;
+
+create or replace function public.purge_expired_refresh_tokens()
+returns integer
+language sql
+as $$
+    with purged as (
+        delete from public.refresh_token_families
+        where expires_at < now() - interval '1 day'
+        returning 1
+    )
+    select count(*)::integer from purged;
+$$;
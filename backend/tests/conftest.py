@@ -0,0 +1,240 @@
+"""
+Fixtures that run the API against the in-memory PostgREST in fake_postgrest.py.
+
+`make_api(size)` seeds a database whose row counts scale with size (size students,
+size // 20 active and archived candidates per organization, one vote per student
+in each ongoing election it can vote in) and returns a TestClient for it. Sizes
+come from QUERY_TEST_SIZES ("20,200" by default); keep the largest under
+SCAN_CHUNK_SIZE students, since chunked scans legitimately add a call per chunk.
+
+With QUERY_SNAPSHOT=path the per-route call counts and timings of the run are
+written there as JSON, for `python -m app.db.query_count before.json after.json`.
+"""
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("SUPABASE_URL", "http://postgrest.test")
+os.environ.setdefault("SUPABASE_KEY", "test.key.signature")
+# X-DB-Calls is off by default outside the tests
+os.environ.setdefault("QUERY_COUNT_ENABLED", "true")
+
+import httpx
+from fastapi.testclient import TestClient
+from supabase import create_client
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db import database, query_count
+from app.main import app
+from fake_postgrest import Database, InMemoryPostgREST
+
+ORGANIZATIONS = ["CCS Student Council", "ELITES", "SPECS", "IMAGES"]
+PROGRAMS = ["BSIT", "BSCS", "BSEMC"]
+# Voters of each organization when its eligible_voters is a program
+ORGANIZATION_PROGRAMS = {"ELITES": "BSIT", "SPECS": "BSCS", "IMAGES": "BSEMC"}
+POSITIONS = ["PRESIDENT", "VICE PRESIDENT", "SECRETARY", "TREASURER", "AUDITOR"]
+
+
+def query_test_sizes():
+    return [int(size) for size in os.getenv("QUERY_TEST_SIZES", "20,200").split(",")]
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.isoformat()
+
+
+def _turnout_statistics(db: Database, params: dict) -> dict:
+    students = db.tables.get("students", [])
+    programs = {student["id"]: student["program"] for student in students}
+    voted_by_org, voted_by_program = {}, {}
+    for election in db.tables.get("elections", []):
+        if election["status"] != "ongoing":
+            continue
+        name = db.by_id("organizations", election["organization_id"])["name"]
+        voters = {vote["student_id"] for vote in db.tables.get("votes", []) if vote["election_id"] == election["id"]}
+        voted_by_org[name] = len(voters)
+        for student_id in voters:
+            voted_by_program.setdefault(programs[student_id], set()).add(student_id)
+    return {
+        "total_students": len(students),
+        "students_by_program": {p: sum(1 for s in students if s["program"] == p) for p in PROGRAMS},
+        "candidates_by_org": {},
+        "voted_by_org": voted_by_org,
+        "voted_by_program": {program: len(voters) for program, voters in voted_by_program.items()},
+        "eligible_by_org": {}
+    }
+
+
+def _election_final_tally(db: Database, params: dict) -> dict:
+    """Votes per current candidate of the election's organization, positions by name."""
+    election = db.by_id("elections", params["p_election_id"])
+    votes = {}
+    for vote in db.tables.get("votes", []):
+        if vote["election_id"] == election["id"]:
+            votes[vote["candidate_id"]] = votes.get(vote["candidate_id"], 0) + 1
+    positions = {}
+    for candidate in db.tables.get("candidates", []):
+        if candidate["organization_id"] == election["organization_id"] and not candidate["is_archived"]:
+            positions.setdefault(candidate["position"], []).append(
+                {"id": candidate["id"], "name": candidate["name"], "vote_count": votes.get(candidate["id"], 0)}
+            )
+    return {
+        "positions": [
+            {"name": name, "candidates": sorted(candidates, key=lambda c: -c["vote_count"])}
+            for name, candidates in sorted(positions.items())
+        ],
+        "turnout": {},
+        "by_program": {}
+    }
+
+
+def _snapshot_election_results(db: Database, params: dict) -> dict:
+    election = db.by_id("elections", params["p_election_id"])
+    snapshot = {
+        "election_id": election["id"],
+        "organization_id": election["organization_id"],
+        "results": {"positions": [], "turnout": {}, "by_program": {}},
+        "results_hash": "0" * 64,
+        "created_at": _timestamp(datetime.now(timezone.utc))
+    }
+    db.tables.setdefault("election_results", []).append(snapshot)
+    return snapshot
+
+
+def seed(size: int) -> Database:
+    """Four organizations and their elections, with data proportional to size."""
+    rng = random.Random(size)
+    now = datetime.now(timezone.utc)
+    db = Database()
+    db.rpcs["finish_expired_elections"] = lambda db, params: []
+    db.rpcs["election_turnout_statistics"] = _turnout_statistics
+    db.rpcs["snapshot_election_results"] = _snapshot_election_results
+    db.rpcs["election_final_tally"] = _election_final_tally
+
+    students = db.insert("students", [
+        {
+            "student_no": f"2024-{index:05d}",
+            "first_name": f"STUDENT{index}",
+            "last_name": "TEST",
+            "program": PROGRAMS[index % len(PROGRAMS)],
+            "year_level": str(1 + index % 4),
+            "block": "A",
+            "password_hash": "x"
+        }
+        for index in range(size)
+    ])
+
+    # CCS Student Council and ELITES are voting, SPECS and IMAGES have finished
+    statuses = {"CCS Student Council": "ongoing", "ELITES": "ongoing", "SPECS": "finished", "IMAGES": "finished"}
+    db.ongoing_election_ids = []
+    for name in ORGANIZATIONS:
+        organization = db.insert("organizations", [{"name": name, "is_active": statuses[name] == "ongoing"}])[0]
+        partylists = db.insert("partylist", [
+            {"name": f"{name} PARTY {letter}", "organization_id": organization["id"]} for letter in "AB"
+        ])
+        for archived in (False, True):
+            db.insert("candidates", [
+                {
+                    "name": f"{name} CANDIDATE {index:04d}{' (ARCHIVED)' if archived else ''}",
+                    "position": POSITIONS[index % len(POSITIONS)],
+                    "organization_id": organization["id"],
+                    "partylist_id": partylists[index % 2]["id"],
+                    "photo_url": None,
+                    "is_archived": archived,
+                    "created_at": _timestamp(now - timedelta(days=400 if archived else 1, seconds=index))
+                }
+                for index in range(max(1, size // 20))
+            ])
+
+        started = now - timedelta(hours=2 if statuses[name] == "ongoing" else 30)
+        election = db.insert("elections", [{
+            "organization_id": organization["id"],
+            "status": statuses[name],
+            "duration_hours": 8,
+            "eligible_voters": ORGANIZATION_PROGRAMS.get(name, "All CCS Students"),
+            "eligible_count": None,
+            "created_at": _timestamp(started),
+            "ends_at": _timestamp(started + timedelta(hours=8))
+        }])[0]
+        if statuses[name] == "finished":
+            continue
+        db.ongoing_election_ids.append(election["id"])
+
+        candidates = [c for c in db.tables["candidates"] if c["organization_id"] == organization["id"] and not c["is_archived"]]
+        voters = [s for s in students if name not in ORGANIZATION_PROGRAMS or s["program"] == ORGANIZATION_PROGRAMS[name]]
+        db.insert("votes", [
+            {
+                "election_id": election["id"],
+                "student_id": student["id"],
+                "candidate_id": rng.choice(candidates)["id"],
+                "created_at": _timestamp(started + timedelta(minutes=rng.randrange(60)))
+            }
+            for student in voters
+        ])
+        db.insert("election_turnout_buckets", [
+            {
+                "election_id": election["id"],
+                "bucket_start": _timestamp((started + timedelta(minutes=minute)).replace(second=0, microsecond=0)),
+                "program": program,
+                "ballots": rng.randrange(1, 5)
+            }
+            for minute in range(max(1, size // 10))
+            for program in PROGRAMS
+        ])
+    # SPECS already has its snapshot; IMAGES is snapshotted lazily on first read
+    specs = next(e for e in db.tables["elections"] if db.by_id("organizations", e["organization_id"])["name"] == "SPECS")
+    _snapshot_election_results(db, {"p_election_id": specs["id"]})
+    return db
+
+
+def clear_caches() -> None:
+    """Drop every in-process cache so each request reads the freshly seeded database."""
+    from app.api.endpoints import elections, votes
+    from app.services import analytics, ballot_validation, ballots, eligibility, results, student_profiles
+
+    for cache in (
+        elections._statistics_cache,
+        votes._submission_results,
+        analytics._crosstabs,
+        eligibility._eligible,
+        eligibility._not_materialized,
+        results._snapshots,
+        student_profiles._profiles,
+    ):
+        cache.clear()
+    ballots.invalidate_all()
+    ballot_validation.invalidate()
+
+
+@pytest.fixture
+def make_api(monkeypatch):
+    """Returns make(size) -> (TestClient, Database) with the app reading that database."""
+
+    def make(size: int):
+        db = seed(size)
+        client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+        rest_url = str(client.postgrest.session.base_url)
+        client.postgrest.session = httpx.Client(base_url=rest_url, transport=InMemoryPostgREST(db))
+        monkeypatch.setattr(database, "_client", client)
+        clear_caches()
+        return TestClient(app), db
+
+    yield make
+    clear_caches()
+
+
+@pytest.fixture(scope="session")
+def admin_headers():
+    return {"Authorization": f"Bearer {create_access_token('admin-test', 'admin')}"}
+
+
+def pytest_sessionfinish(session, exitstatus):
+    path = os.getenv("QUERY_SNAPSHOT")
+    if path:
+        with open(path, "w") as output:
+            json.dump(query_count.snapshot(), output, indent=2)
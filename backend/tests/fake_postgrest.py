@@ -0,0 +1,246 @@
+"""
+An in-memory PostgREST for tests: an httpx transport that answers the requests
+the Supabase client sends from Python lists of rows, so endpoints run unchanged.
+
+Supported: select with embedded to-one resources (partylist(name),
+organizations(name)), eq/neq/gt/gte/lt/lte/in/is/like/ilike filters, or=(...)
+with nested and(...), order, limit/offset, single objects, count=exact,
+insert/update/delete and rpc handlers registered by name. Every request is
+counted with query_count.record, like the pooled transport in production.
+"""
+import json
+import re
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qsl
+
+import httpx
+
+from app.db import query_count
+
+_OPERATORS = ("eq", "neq", "gt", "gte", "lt", "lte", "in", "is", "like", "ilike")
+
+
+def _coerce(value):
+    """Compare timestamps as datetimes and numbers as numbers; everything else as text."""
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return value
+    text = str(value)
+    if re.match(r"^\d{4}-\d{2}-\d{2}", text):
+        try:
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+        except ValueError:
+            return text
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def _unquote(text: str) -> str:
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        return text[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return text
+
+
+def _split_top(text: str) -> List[str]:
+    """Split on commas outside parentheses and double quotes."""
+    parts, depth, quoted, current = [], 0, False, ""
+    for index, char in enumerate(text):
+        if char == '"' and (index == 0 or text[index - 1] != "\\"):
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        if char == "," and depth == 0 and not quoted:
+            parts.append(current)
+            current = ""
+        else:
+            current += char
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _matches(row: dict, column: str, condition: str) -> bool:
+    negate = condition.startswith("not.")
+    if negate:
+        condition = condition[4:]
+    operator, _, operand = condition.partition(".")
+    value = row.get(column)
+    if operator == "in":
+        wanted = [_unquote(item) for item in _split_top(operand.strip("()"))]
+        result = str(value).lower() in [item.lower() for item in wanted] if isinstance(value, bool) \
+            else str(value) in wanted
+    elif operator == "is":
+        result = value is None if operand == "null" else value is (operand == "true")
+    elif operator in ("like", "ilike"):
+        pattern = "^" + re.escape(_unquote(operand)).replace("\\*", ".*").replace("%", ".*") + "$"
+        result = value is not None and re.match(pattern, str(value), re.I if operator == "ilike" else 0) is not None
+    else:
+        operand = _unquote(operand)
+        if isinstance(value, bool):
+            operand = operand == "true"
+        elif value is None:
+            return negate if operator != "eq" else False
+        left, right = _coerce(value), _coerce(operand)
+        if type(left) is not type(right):
+            left, right = str(value), operand
+        result = {
+            "eq": left == right,
+            "neq": left != right,
+            "gt": left > right,
+            "gte": left >= right,
+            "lt": left < right,
+            "lte": left <= right,
+        }[operator]
+    return not result if negate else result
+
+
+def _logic(row: dict, expression: str, conjunction: str) -> bool:
+    """Evaluate the inside of or=(...) / and(...)."""
+    results = []
+    for term in _split_top(expression):
+        if term.startswith(("and(", "or(")):
+            inner_conjunction, _, rest = term.partition("(")
+            results.append(_logic(row, rest[:-1], inner_conjunction))
+        else:
+            column, _, condition = term.partition(".")
+            results.append(_matches(row, column, condition))
+    return all(results) if conjunction == "and" else any(results)
+
+
+class Database:
+    """Tables as lists of rows, plus rpc handlers called as handler(db, params)."""
+
+    def __init__(self):
+        self.tables: Dict[str, List[dict]] = {}
+        self.rpcs: Dict[str, Callable[["Database", dict], object]] = {}
+        self.requests: List[str] = []
+
+    def insert(self, table: str, rows: List[dict]) -> List[dict]:
+        stored = []
+        for row in rows:
+            row = {"id": str(uuid.uuid4()), "created_at": datetime.now(timezone.utc).isoformat(), **row}
+            self.tables.setdefault(table, []).append(row)
+            stored.append(row)
+        return stored
+
+    def by_id(self, table: str, row_id) -> Optional[dict]:
+        for row in self.tables.get(table, []):
+            if row.get("id") == row_id:
+                return row
+        return None
+
+
+class InMemoryPostgREST(httpx.BaseTransport):
+    def __init__(self, db: Database):
+        self.db = db
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            return self._handle(request)
+        finally:
+            query_count.record(time.perf_counter() - started)
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.split("/rest/v1/", 1)[-1]
+        self.db.requests.append(f"{request.method} {path}?{request.url.query.decode()}")
+        body = json.loads(request.content) if request.content else None
+        if path.startswith("rpc/"):
+            handler = self.db.rpcs.get(path[4:])
+            if handler is None:
+                return httpx.Response(404, json={"message": f"function {path[4:]} not found"})
+            return httpx.Response(200, json=handler(self.db, body or {}))
+
+        rows = self.db.tables.setdefault(path, [])
+        params = parse_qsl(request.url.query.decode(), keep_blank_values=True)
+        if request.method == "POST":
+            inserted = self.db.insert(path, body if isinstance(body, list) else [body])
+            return httpx.Response(201, json=inserted)
+
+        matched = self._filter(rows, params)
+        if request.method == "PATCH":
+            for row in matched:
+                row.update(body)
+            return httpx.Response(200, json=matched)
+        if request.method == "DELETE":
+            self.db.tables[path] = [row for row in rows if row not in matched]
+            return httpx.Response(200, json=matched)
+
+        total = len(matched)
+        matched = self._order(matched, dict(params).get("order"))
+        offset = int(dict(params).get("offset", 0))
+        limit = dict(params).get("limit")
+        matched = matched[offset:offset + int(limit) if limit is not None else None]
+        shaped = [self._select(path, row, dict(params).get("select", "*")) for row in matched]
+
+        headers = {}
+        if "count=exact" in request.headers.get("prefer", ""):
+            headers["Content-Range"] = f"{offset}-{offset + len(shaped) - 1 if shaped else 0}/{total}"
+        if "vnd.pgrst.object" in request.headers.get("accept", ""):
+            if len(shaped) != 1:
+                return httpx.Response(406, json={
+                    "code": "PGRST116",
+                    "message": "JSON object requested, multiple (or no) rows returned",
+                    "details": f"The result contains {len(shaped)} rows",
+                    "hint": None
+                }, headers=headers)
+            return httpx.Response(200, json=shaped[0], headers=headers)
+        return httpx.Response(200, json=shaped, headers=headers)
+
+    def _filter(self, rows: List[dict], params) -> List[dict]:
+        filters = [(key, value) for key, value in params if key not in ("select", "order", "limit", "offset")]
+        matched = []
+        for row in rows:
+            keep = True
+            for key, value in filters:
+                if key in ("or", "and"):
+                    keep = _logic(row, value[1:-1], key)
+                elif "." not in key:
+                    keep = _matches(row, key, value)
+                if not keep:
+                    break
+            if keep:
+                matched.append(row)
+        return matched
+
+    @staticmethod
+    def _order(rows: List[dict], order: Optional[str]) -> List[dict]:
+        if not order:
+            return list(rows)
+        ordered = list(rows)
+        # Stable sorts applied from the last key to the first
+        for term in reversed(order.split(",")):
+            column, *modifiers = term.split(".")
+            descending = "desc" in modifiers
+            ordered.sort(key=lambda row: (row.get(column) is None, _coerce(row.get(column))), reverse=descending)
+        return ordered
+
+    def _select(self, table: str, row: dict, select: str) -> dict:
+        shaped = {}
+        for item in _split_top(select.replace(" ", "")):
+            if "(" in item:
+                name, _, columns = item.partition("(")
+                name = name.split("!")[0].split(":")[-1]
+                shaped[name] = self._embed(row, name, columns[:-1])
+            elif item == "*":
+                shaped.update(row)
+            else:
+                shaped[item] = row.get(item)
+        return shaped
+
+    def _embed(self, row: dict, name: str, columns: str) -> Optional[dict]:
+        """A to-one embed through the <name>_id (or singular <name>_id) foreign key."""
+        for foreign_key in (f"{name}_id", f"{name[:-1]}_id" if name.endswith("s") else None):
+            if foreign_key and foreign_key in row:
+                target = self.db.by_id(name, row[foreign_key])
+                return self._select(name, target, columns) if target is not None else None
+        return None
@@ -0,0 +1,129 @@
+"""
+election_final_tally() (sql/005_election_eligibility.sql) against a real Postgres.
+
+Set TEST_DATABASE_URL to a scratch database to run these; they need psycopg
+(v3) and are skipped otherwise. Everything runs in one transaction that is
+rolled back, over the minimal tables the migration's functions read.
+"""
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+psycopg = pytest.importorskip("psycopg")
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+SQL_DIR = Path(__file__).resolve().parent.parent / "sql"
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+BASE_TABLES = """
+create extension if not exists pgcrypto;
+create table if not exists public.organizations (
+    id uuid primary key default gen_random_uuid(),
+    name text not null,
+    is_active boolean default false
+);
+create table if not exists public.students (
+    id uuid primary key default gen_random_uuid(),
+    program text
+);
+create table if not exists public.elections (
+    id uuid primary key default gen_random_uuid(),
+    organization_id uuid references public.organizations (id) on delete cascade,
+    status text,
+    eligible_voters text,
+    duration_hours integer,
+    created_at timestamptz not null default now()
+);
+create table if not exists public.candidates (
+    id uuid primary key default gen_random_uuid(),
+    name text,
+    position text,
+    organization_id uuid references public.organizations (id),
+    is_archived boolean default false
+);
+create table if not exists public.votes (
+    id uuid primary key default gen_random_uuid(),
+    election_id uuid references public.elections (id) on delete cascade,
+    candidate_id uuid references public.candidates (id),
+    student_id uuid references public.students (id),
+    created_at timestamptz not null default now()
+);
+create table if not exists public.ballots (
+    id uuid primary key default gen_random_uuid(),
+    election_id uuid references public.elections (id) on delete cascade,
+    student_id uuid references public.students (id),
+    idempotency_key text unique,
+    created_at timestamptz not null default now(),
+    unique (election_id, student_id)
+);
+"""
+
+
+@pytest.fixture
+def cursor():
+    with psycopg.connect(DATABASE_URL) as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(BASE_TABLES)
+            cursor.execute((SQL_DIR / "005_election_eligibility.sql").read_text())
+            # Only the students seeded by the test count
+            cursor.execute(
+                "delete from public.votes; delete from public.ballots; "
+                "delete from public.election_eligible_voters; delete from public.students"
+            )
+            yield cursor
+        connection.rollback()
+
+
+def _election(cursor, organization: str, eligible_voters: str) -> str:
+    cursor.execute("insert into public.organizations (name) values (%s) returning id", (organization,))
+    organization_id = cursor.fetchone()[0]
+    cursor.execute(
+        "insert into public.elections (organization_id, status, eligible_voters, duration_hours) "
+        "values (%s, 'finished', %s, 8) returning id",
+        (organization_id, eligible_voters)
+    )
+    return cursor.fetchone()[0]
+
+
+def _tally(cursor, election_id: str) -> dict:
+    cursor.execute("select public.election_final_tally(%s)", (election_id,))
+    tally = cursor.fetchone()[0]
+    return tally if isinstance(tally, dict) else json.loads(tally)
+
+
+def _seed_students(cursor) -> None:
+    for program, count in (("BSIT", 3), ("BSCS", 2), ("BSEMC", 1)):
+        for _ in range(count):
+            cursor.execute("insert into public.students (program) values (%s)", (program,))
+
+
+def test_all_students_in_a_program_organization_counts_its_program_only(cursor):
+    # The admin dashboard creates elections with "All CCS Students" by default
+    _seed_students(cursor)
+    election_id = _election(cursor, "ELITES", "All CCS Students")
+
+    tally = _tally(cursor, election_id)
+
+    assert tally["turnout"]["eligible"] == 3
+    assert set(tally["by_program"]) == {"BSIT"}
+
+
+def test_all_students_in_the_student_council_counts_everyone(cursor):
+    _seed_students(cursor)
+    election_id = _election(cursor, "CCS Student Council", "All CCS Students")
+
+    assert _tally(cursor, election_id)["turnout"]["eligible"] == 6
+
+
+def test_materialized_voters_take_precedence(cursor):
+    _seed_students(cursor)
+    election_id = _election(cursor, "SPECS", "All CCS Students")
+    cursor.execute("select public.materialize_election_eligibility(%s)", (election_id,))
+
+    tally = _tally(cursor, election_id)
+
+    assert tally["turnout"]["eligible"] == 2
+    assert set(tally["by_program"]) == {"BSCS"}
@@ -0,0 +1,53 @@
+"""
+Database calls per request for the read routes, against the in-memory PostgREST.
+
+Each route is requested at every size in QUERY_TEST_SIZES: its X-DB-Calls must
+stay within the route's budget (QUERY_BUDGETS / QUERY_BUDGET_DEFAULT) and must
+not change with the size of the data, which is what a per-row query in a loop
+breaks. With QUERY_BASELINE=before.json (a QUERY_SNAPSHOT of an earlier run) the
+run also fails when a route makes more calls than it did then.
+"""
+import json
+import os
+
+import pytest
+
+from app.db import query_count
+from conftest import query_test_sizes
+
+API = "/api/v1"
+
+# Route as query_count names it, and the URL to request on a seeded database
+ROUTES = [
+    ("GET /api/v1/candidates/", lambda db: f"{API}/candidates/"),
+    ("GET /api/v1/candidates/recent", lambda db: f"{API}/candidates/recent"),
+    ("GET /api/v1/partylists/candidates", lambda db: f"{API}/partylists/candidates"),
+    ("GET /api/v1/archives/candidates", lambda db: f"{API}/archives/candidates"),
+    ("GET /api/v1/students", lambda db: f"{API}/students"),
+    ("GET /api/v1/organizations/", lambda db: f"{API}/organizations/"),
+    ("GET /api/v1/elections", lambda db: f"{API}/elections"),
+    ("GET /api/v1/elections/statistics", lambda db: f"{API}/elections/statistics"),
+    ("GET /api/v1/elections/results", lambda db: f"{API}/elections/results"),
+    ("GET /api/v1/elections/status/{organization_name}", lambda db: f"{API}/elections/status/ELITES"),
+    ("GET /api/v1/elections/{election_id}/ballot", lambda db: f"{API}/elections/{db.ongoing_election_ids[0]}/ballot"),
+    ("GET /api/v1/elections/{election_id}/turnout", lambda db: f"{API}/elections/{db.ongoing_election_ids[0]}/turnout"),
+]
+
+
+@pytest.mark.parametrize("route, url", ROUTES, ids=[route for route, _ in ROUTES])
+def test_database_calls_do_not_grow_with_data(route, url, make_api, admin_headers):
+    calls = {}
+    for size in query_test_sizes():
+        client, db = make_api(size)
+        response = client.get(url(db), headers=admin_headers)
+        assert response.status_code == 200, response.text
+        calls[size] = int(response.headers["X-DB-Calls"])
+
+    assert max(calls.values()) <= query_count.budget_for(route), f"{route} over budget: {calls}"
+    assert len(set(calls.values())) == 1, f"{route} calls grow with the data: {calls}"
+
+
+@pytest.mark.skipif(not os.getenv("QUERY_BASELINE"), reason="QUERY_BASELINE is not set")
+def test_no_route_makes_more_calls_than_baseline():
+    with open(os.environ["QUERY_BASELINE"]) as baseline:
+        assert query_count.compare(json.load(baseline), query_count.snapshot()) == 0
@@ -0,0 +1,46 @@
+"""
+Import time of app.main, measured in fresh interpreters against IMPORT_TIME_BUDGET_MS
+(see app/core/startup.py; `python -m app.core.startup` shows which modules are slow).
+"""
+import json
+import subprocess
+import sys
+
+from app.core.config import settings
+from app.core.startup import BACKEND_DIR
+
+# Modules app.main must leave to first use
+DEFERRED_MODULES = ["PIL", "supabase", "pandas", "pyarrow"]
+
+IMPORT_APP = f"""
+import json, sys, time
+started = time.perf_counter()
+import app.main
+from app.db import database
+print(json.dumps({{
+    "ms": (time.perf_counter() - started) * 1000,
+    "loaded": [name for name in {DEFERRED_MODULES!r} if name in sys.modules],
+    "client": database._client is not None
+}}))
+"""
+
+
+def _import_app() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_APP], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_time_within_budget():
+    # Best of three, so a busy CI machine does not fail the budget on one slow run
+    timings = [_import_app()["ms"] for _ in range(3)]
+    assert min(timings) <= settings.IMPORT_TIME_BUDGET_MS, \
+        f"importing app.main took {min(timings):.0f} ms (budget {settings.IMPORT_TIME_BUDGET_MS} ms)"
+
+
+def test_import_defers_heavy_modules_and_database():
+    imported = _import_app()
+    assert imported["loaded"] == []
+    assert imported["client"] is False
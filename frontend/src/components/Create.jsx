@@ -46,17 +46,25 @@ const Create = () => {
   // Add this function to fetch all candidates for validation
   const fetchExistingCandidates = useCallback(async () => {
     try {
-      const response = await fetch(`${API_BASE_URL}/candidates`, {
-        headers: {
-          'Authorization': `Bearer ${localStorage.getItem('token')}`
+      // The list is paginated; follow X-Next-Cursor until the last page
+      const candidates = [];
+      let cursor = null;
+      do {
+        const query = `?fields=id,position,partylist_id,group&limit=200${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`;
+        const response = await fetch(`${API_BASE_URL}/candidates/${query}`, {
+          headers: {
+            'Authorization': `Bearer ${localStorage.getItem('token')}`
+          }
+        });
+        
+        if (!response.ok) {
+          throw new Error('Failed to fetch candidates for validation');
         }
-      });
-      
-      if (!response.ok) {
-        throw new Error('Failed to fetch candidates for validation');
-      }
+        
+        candidates.push(...await response.json());
+        cursor = response.headers.get('X-Next-Cursor');
+      } while (cursor);
       
-      const candidates = await response.json();
       setExistingCandidates(candidates);
     } catch (error) {
       console.error("Error fetching candidates for validation:", error);
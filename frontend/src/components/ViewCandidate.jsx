@@ -7,6 +7,7 @@ import {
   FaEye, FaChevronLeft, FaChevronRight, FaExclamationTriangle,
   FaEllipsisV, FaInfoCircle
 } from "react-icons/fa";
+import { waitForJob } from "../services/api";
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000/api/v1';
 
@@ -80,17 +81,25 @@ const ViewCandidate = () => {
   const loadCandidates = async () => {
     try {
       setLoading(true);
-      const response = await fetch(`${API_BASE_URL}/candidates/`, {
-        headers: {
-          'Authorization': `Bearer ${localStorage.getItem('token')}`
+      // The list is paginated; follow X-Next-Cursor until the last page
+      const data = [];
+      let cursor = null;
+      do {
+        const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+        const response = await fetch(`${API_BASE_URL}/candidates/${query}`, {
+          headers: {
+            'Authorization': `Bearer ${localStorage.getItem('token')}`
+          }
+        });
+        
+        if (!response.ok) {
+          throw new Error('Failed to load candidates');
         }
-      });
-      
-      if (!response.ok) {
-        throw new Error('Failed to load candidates');
-      }
+        
+        data.push(...await response.json());
+        cursor = response.headers.get('X-Next-Cursor');
+      } while (cursor);
       
-      const data = await response.json();
       const formattedCandidates = data.map(c => ({
         id: c.id,
         name: c.name.toUpperCase(), // Ensure name is uppercase
@@ -325,8 +334,12 @@ const ViewCandidate = () => {
         throw new Error('Failed to archive all candidates');
       }
       
-      setCandidates([]);
+      // The archive runs as a background job; report it once the job finishes
+      const { job_id } = await response.json();
       setIsArchiveConfirmOpen(false);
+      await waitForJob(job_id);
+      
+      setCandidates([]);
       
       setToastType("success");
       setToastMessage("All candidates have been archived successfully!");
@@ -338,8 +351,9 @@ const ViewCandidate = () => {
       
     } catch (error) {
       console.error("Error archiving all candidates:", error);
+      setIsArchiveConfirmOpen(false);
       setToastType("error");
-      setToastMessage("Failed to archive all candidates");
+      setToastMessage(`Failed to archive all candidates: ${error.message}`);
       setShowSuccessToast(true);
       setTimeout(() => setShowSuccessToast(false), 3000);
     }
@@ -3,6 +3,7 @@ import { FaUsers, FaUserCheck, FaUserGraduate, FaChartBar, FaRegClock, FaAngleRi
 import { useNavigate } from "react-router-dom";
 import Header from "./header";
 import axios from 'axios';
+import { waitForJob } from "../services/api";
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000/api/v1';
 
@@ -807,6 +808,20 @@ const confirmCreateNewElection = async () => {
     );
     if (res.status !== 200 && res.status !== 201) throw new Error("Failed to create new election");
     
+    // The previous candidates are archived by a background job
+    try {
+      await waitForJob(res.data.archive_job.job_id);
+    } catch (jobErr) {
+      setErrorMessage(`New election created, but archiving the previous candidates failed: ${jobErr.message}`);
+      setShowError(true);
+      setIsModalOpen(false);
+      setShowCreateConfirmation(false);
+      setPendingCreateOrg(null);
+      await fetchData();
+      setTimeout(() => setShowError(false), 5000);
+      return;
+    }
+    
     setSuccessMessage("New election created and previous candidates archived");
     setShowSuccess(true);
     setIsModalOpen(false);
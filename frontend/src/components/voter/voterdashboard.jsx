@@ -13,12 +13,12 @@ const VoterDashboard = () => {
   const navigate = useNavigate();
   
   // Memoized helper functions
-  const getPhilippinesTime = useCallback(() => {
-    return new Date(new Date().toLocaleString("en-US", {timeZone: "Asia/Manila"}));
-  }, []);
+  // end_time comes from the API as an absolute UTC timestamp, so deadlines are compared
+  // against the real clock; only the displayed dates are formatted in Asia/Manila
+  const getCurrentTime = useCallback(() => new Date(), []);
   
   // State management
-  const [currentTime, setCurrentTime] = useState(getPhilippinesTime());
+  const [currentTime, setCurrentTime] = useState(getCurrentTime());
   const [animatedCards, setAnimatedCards] = useState(false);
   const [showTooltip, setShowTooltip] = useState(false);
   const [tooltipContent, setTooltipContent] = useState("");
@@ -388,14 +388,14 @@ const VoterDashboard = () => {
     
     if (hasOngoingElections && !loading) {
       intervalId = setInterval(() => {
-        const philippinesTime = getPhilippinesTime();
-        setCurrentTime(philippinesTime);
+        const now = getCurrentTime();
+        setCurrentTime(now);
         
         // Check if any elections have ended
         setFilteredElections(prevElections => {
           let hasChanges = false;
           const updatedElections = prevElections.map(election => {
-            if (election.status === "ongoing" && election.endTime && philippinesTime >= election.endTime) {
+            if (election.status === "ongoing" && election.endTime && now >= election.endTime) {
               hasChanges = true;
               return { ...election, status: "finished" };
             }
@@ -410,13 +410,13 @@ const VoterDashboard = () => {
     return () => {
       if (intervalId) clearInterval(intervalId);
     };
-  }, [filteredElections, loading, getPhilippinesTime]);
+  }, [filteredElections, loading, getCurrentTime]);
 
   // Memoized time calculations
   const timeHelpers = useMemo(() => ({
     getRemainingTime: (endTime) => {
-      const philippinesTime = getPhilippinesTime();
-      const timeDiff = endTime - philippinesTime;
+      const now = getCurrentTime();
+      const timeDiff = endTime - now;
       
       if (timeDiff <= 0) return "Voting has ended";
       
@@ -438,7 +438,7 @@ const VoterDashboard = () => {
         timeZone: 'Asia/Manila'
       });
     }
-  }), [getPhilippinesTime]);
+  }), [getCurrentTime]);
 
   // Animate cards on initial load
   useEffect(() => {
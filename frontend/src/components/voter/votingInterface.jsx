@@ -417,6 +417,8 @@ const VotingInterface = () => {
   const [submitSuccess, setSubmitSuccess] = useState(false);
   const [error, setError] = useState(null);
   const [positions, setPositions] = useState([]);
+  // One idempotency key per ballot so retries and double-taps replay the first submission
+  const idempotencyKeyRef = useRef(null);
   const [electionInfo, setElectionInfo] = useState(null);
   const [loading, setLoading] = useState(true);
   
@@ -611,22 +613,26 @@ const VotingInterface = () => {
           }
         }
         
-        // 4. Get candidates for this organization
-        const candidatesResponse = await fetch(`${API_BASE_URL}/candidates`, {
+        // 4. Get the ballot: every active candidate of this election, grouped by position
+        const ballotResponse = await fetch(`${API_BASE_URL}/elections/${electionDbId}/ballot`, {
           headers: {
             'Authorization': `Bearer ${localStorage.getItem('token')}`
           }
         });
         
-        if (!candidatesResponse.ok) {
+        if (!ballotResponse.ok) {
           throw new Error("Failed to fetch candidates");
         }
         
-        const allCandidates = await candidatesResponse.json();
+        const ballot = await ballotResponse.json();
         
-        // Filter candidates for this organization only
-        const orgCandidates = allCandidates.filter(candidate => 
-          candidate.group === orgName
+        const orgCandidates = ballot.positions.flatMap(position =>
+          position.candidates.map(candidate => ({
+            ...candidate,
+            position: position.name,
+            group: orgName,
+            photo_url: candidate.photo.original
+          }))
         );
         
         if (orgCandidates.length === 0) {
@@ -834,11 +840,16 @@ const VotingInterface = () => {
         });
       }
       
+      if (!idempotencyKeyRef.current) {
+        idempotencyKeyRef.current = crypto.randomUUID();
+      }
+      
       // Submit votes to the backend
       const response = await fetch(`${API_BASE_URL}/votes/submit`, {
         method: 'POST',
         headers: {
-          'Content-Type': 'application/json'
+          'Content-Type': 'application/json',
+          'Idempotency-Key': idempotencyKeyRef.current
         },
         body: JSON.stringify({
           election_id: electionDbId,
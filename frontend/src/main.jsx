@@ -2,6 +2,10 @@ import { StrictMode } from 'react'
 import { createRoot } from 'react-dom/client'
 import './index.css'
 import App from './App.jsx'
+import { scheduleTokenRefresh } from './services/api'
+
+// Keep a returning session's access token fresh
+scheduleTokenRefresh()
 
 createRoot(document.getElementById('root')).render(
   <StrictMode>
@@ -23,8 +23,57 @@ export async function fetchData(endpoint, options = {}) {
   return data;
 }
 
+// Access and refresh tokens from /auth/login or /auth/refresh
+const storeTokens = (data) => {
+  localStorage.setItem('token', data.access_token);
+  if (data.refresh_token) {
+    localStorage.setItem('refresh_token', data.refresh_token);
+    localStorage.setItem('token_expires_at', String(Date.now() + data.expires_in * 1000));
+  }
+};
+
+// Renew the access token a minute before it expires, so every request that reads
+// localStorage('token') finds a valid one without logging in again
+let refreshTimer = null;
+
+export const scheduleTokenRefresh = () => {
+  clearTimeout(refreshTimer);
+  const expiresAt = Number(localStorage.getItem('token_expires_at'));
+  if (!localStorage.getItem('refresh_token') || !expiresAt) return;
+  refreshTimer = setTimeout(refreshAccessToken, Math.max(expiresAt - Date.now() - 60 * 1000, 0));
+};
+
+export const refreshAccessToken = async () => {
+  const refreshToken = localStorage.getItem('refresh_token');
+  if (!refreshToken) return false;
+  
+  try {
+    const response = await fetch(`${API_URL}/auth/refresh`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    });
+    if (!response.ok) {
+      // Another tab may have refreshed first and stored the new tokens
+      if (localStorage.getItem('refresh_token') !== refreshToken) {
+        scheduleTokenRefresh();
+        return true;
+      }
+      return false;
+    }
+    storeTokens(await response.json());
+    scheduleTokenRefresh();
+    return true;
+  } catch (error) {
+    // Offline: try again shortly
+    clearTimeout(refreshTimer);
+    refreshTimer = setTimeout(refreshAccessToken, 30 * 1000);
+    return false;
+  }
+};
+
 // Generic fetch function for authenticated requests
-export const fetchWithAuth = async (endpoint, options = {}) => {
+export const fetchWithAuth = async (endpoint, options = {}, retried = false) => {
   const token = localStorage.getItem('token');
   
   if (!token) {
@@ -40,6 +89,10 @@ export const fetchWithAuth = async (endpoint, options = {}) => {
     },
   });
   
+  if (response.status === 401 && !retried && await refreshAccessToken()) {
+    return fetchWithAuth(endpoint, options, true);
+  }
+  
   if (!response.ok) {
     try {
       const error = await response.json();
@@ -52,6 +105,17 @@ export const fetchWithAuth = async (endpoint, options = {}) => {
   return response.json();
 };
 
+// Poll a background job (GET /jobs/{id}) until it finishes; resolves with the
+// finished job and rejects with the job's error if it failed
+export const waitForJob = async (jobId, intervalMs = 1000) => {
+  for (;;) {
+    const job = await fetchWithAuth(`/jobs/${jobId}`);
+    if (job.status === 'succeeded') return job;
+    if (job.status === 'failed') throw new Error(job.error || 'Background job failed');
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+};
+
 // Login function
 export const login = async (credentials, role) => {
   console.log("Login attempt:", credentials, role);
@@ -97,7 +161,8 @@ export const login = async (credentials, role) => {
     }
     
     // Store auth data in localStorage
-    localStorage.setItem('token', data.access_token);
+    storeTokens(data);
+    scheduleTokenRefresh();
     localStorage.setItem('user_type', data.user_type);
     localStorage.setItem('user_id', data.user_id);
     localStorage.setItem('full_name', data.full_name);
@@ -119,7 +184,19 @@ export const login = async (credentials, role) => {
 
 // Logout function
 export const logout = () => {
+  const refreshToken = localStorage.getItem('refresh_token');
+  if (refreshToken) {
+    // End the session on the server too; the local logout does not wait for it
+    fetch(`${API_URL}/auth/logout`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    }).catch(() => {});
+  }
+  clearTimeout(refreshTimer);
   localStorage.removeItem('token');
+  localStorage.removeItem('refresh_token');
+  localStorage.removeItem('token_expires_at');
   localStorage.removeItem('user_type');
   localStorage.removeItem('user_id');
   localStorage.removeItem('full_name');